@@ -188,16 +188,15 @@ def create_jira_tickets():
         if not all([jira_url, jira_username, jira_api_token, jira_project_key]):
             return jsonify({'error': 'Jira configuration not found. Please set environment variables (JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_PROJECT_KEY).'}), 500
 
-        # Initialize the ticket creator
+        # Initialize the ticket creator (custom field ids come from the shared field cache,
+        # emptied first when a refresh is requested so the constructor rediscovers them once)
+        if data.get('refresh_fields'):
+            from utils.jira_field_cache import JiraFieldCache
+            JiraFieldCache().invalidate(jira_url, jira_project_key)
         jira_creator = JiraTicketCreator(jira_url, jira_username, jira_api_token, jira_project_key)
 
         # Optionally override discovered custom field IDs from environment
-        custom_priority_field = os.getenv("JIRA_CUSTOM_FIELD_PRIORITY")
-        severity_field = os.getenv("JIRA_CUSTOM_FIELD_SEVERITY")
-        if custom_priority_field:
-            jira_creator.custom_fields['custom_priority'] = custom_priority_field
-        if severity_field:
-            jira_creator.custom_fields['severity'] = severity_field
+        jira_creator.apply_custom_field_overrides()
 
         created_tickets = jira_creator.bulk_create_tickets_from_json(test_cases)
 
@@ -3,6 +3,7 @@ Centralized configuration for the test automation framework.
 Reads from environment variables with sensible defaults.
 """
 import os
+import tempfile
 
 
 class Config:
@@ -11,26 +12,127 @@ class Config:
     CATALOG_URL_FR = os.getenv("CATALOG_URL_FR", "https://catalog.data.gov.tn/fr/dataset/")
     CATALOG_URL_AR = os.getenv("CATALOG_URL_AR", "https://catalog.data.gov.tn/ar/dataset/")
 
+    # Offline replay (--replay): saved portal pages are served from this directory
+    REPLAY_DIR = os.getenv("REPLAY_DIR", os.path.dirname(os.path.abspath(__file__)))
+    REPLAY_LATENCY = float(os.getenv("REPLAY_LATENCY", 0.0))
+
+    # Record-and-replay HTTP cache proxy (--http-cache record|replay)
+    HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache"))
+    HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", 24 * 3600))
+    HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+    # Requests with an Authorization header or a cookie whose name contains one of these
+    # (case-insensitive) are logged-in traffic: never stored in or served from the cache
+    HTTP_CACHE_CREDENTIAL_COOKIES = tuple(
+        name.strip().lower() for name in os.getenv("HTTP_CACHE_CREDENTIAL_COOKIES", "auth,sess,ckan").split(",")
+        if name.strip()
+    )
+
     # Grid Configuration
     HUB_HOST = os.getenv("HUB_HOST", "localhost")
     HUB_PORT = os.getenv("HUB_PORT", "4444")
     REMOTE_URL = f"http://{HUB_HOST}:{HUB_PORT}/wd/hub"
+    GRID_STATUS_URL = f"http://{HUB_HOST}:{HUB_PORT}/status"
+    # Sessions each grid node runs at once (NODE_MAX_SESSION in docker-compose.yml) and nodes per browser
+    GRID_NODE_MAX_SESSION = int(os.getenv("GRID_NODE_MAX_SESSION", 4))
+    GRID_NODES_PER_BROWSER = int(os.getenv("GRID_NODES_PER_BROWSER", 1))
+
+    # Per-test duration history used to hand tests to xdist workers longest-first
+    TEST_DURATIONS_FILE = os.getenv("TEST_DURATIONS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".test_durations.json"))
+    TEST_DURATION_SMOOTHING = float(os.getenv("TEST_DURATION_SMOOTHING", 0.3))
+    # Set by run_parallel_cross_browser.py in each shard's pytest process ("chrome1"...); the
+    # runner then does the run-wide cleanup, report merging and duration history itself
+    TEST_SHARD_ID = os.getenv("TEST_SHARD_ID", "")
 
     # Timeouts
     IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", 10))
     EXPLICIT_WAIT = int(os.getenv("EXPLICIT_WAIT", 15))
     PAGE_LOAD_TIMEOUT = int(os.getenv("PAGE_LOAD_TIMEOUT", 30))
+    # Set once per driver; async monitoring scripts end themselves before their own deadline,
+    # which is capped just below this (30s is also the WebDriver default)
+    SCRIPT_TIMEOUT = int(os.getenv("SCRIPT_TIMEOUT", 30))
 
     # Rate limiting and delays for government websites with anti-bot measures
     REQUEST_DELAY = float(os.getenv("REQUEST_DELAY", 2.0))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", 2))
     RETRY_DELAY = float(os.getenv("RETRY_DELAY", 1.0))
+    RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 8.0))
+    RETRY_TIME_BUDGET = float(os.getenv("RETRY_TIME_BUDGET", 30.0))
+
+    # Shared token-bucket rate limits per host (coordinated across xdist workers via files
+    # in RATE_LIMIT_DIR). Hosts not listed get one request every REQUEST_DELAY seconds;
+    # local replay servers are never limited.
+    RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR", os.path.join(tempfile.gettempdir(), "datagovtn_rate_limit"))
+    RATE_LIMIT_EXEMPT_HOSTS = ("127.0.0.1", "localhost")
+    # Set for the session by --http-cache replay: no request reaches the network then
+    RATE_LIMIT_DISABLED = False
+    RATE_LIMITS = {
+        "data.gov.tn": {
+            "burst": float(os.getenv("PORTAL_RATE_BURST", 3)),
+            "refill_per_second": float(os.getenv("PORTAL_RATE_REFILL", 0.5)),
+        },
+        "catalog.data.gov.tn": {
+            "burst": float(os.getenv("CATALOG_RATE_BURST", 4)),
+            "refill_per_second": float(os.getenv("CATALOG_RATE_REFILL", 1.0)),
+        },
+    }
+
+    # Settle detection after monitored interactions: the page counts as settled once it has been
+    # quiet (no DOM mutations, no finished requests) for SETTLE_QUIET_TIME seconds
+    SETTLE_QUIET_TIME = float(os.getenv("SETTLE_QUIET_TIME", 0.1))
+    SETTLE_TIMEOUT = float(os.getenv("SETTLE_TIMEOUT", 3.0))
 
     # Performance threshold
     PERFORMANCE_THRESHOLD = float(os.getenv("PERFORMANCE_THRESHOLD", 10.0))
+    # Read browser timing entries (TTFB, DCL, load, FCP, LCP) after every page-object navigation
+    CAPTURE_NAVIGATION_METRICS = os.getenv("CAPTURE_NAVIGATION_METRICS", "true").lower() == "true"
+    # Time every WebDriver command and sleep per test (pytest-html breakdown + reports/webdriver_trace);
+    # off by default as it patches time.sleep and WebDriverWait for the whole process, --trace-webdriver turns it on
+    TRACE_WEBDRIVER_COMMANDS = os.getenv("TRACE_WEBDRIVER_COMMANDS", "false").lower() == "true"
+
+    # Jira failure tickets are created by a background pool; a failure whose fingerprint (normalized
+    # traceback, whichever test raised it) is already in the index gets a comment on its issue instead
+    JIRA_DISPATCH_WORKERS = int(os.getenv("JIRA_DISPATCH_WORKERS", 4))
+    JIRA_DEDUPLICATE_FAILURES = os.getenv("JIRA_DEDUPLICATE_FAILURES", "true").lower() == "true"
+    JIRA_FINGERPRINT_INDEX = os.getenv("JIRA_FINGERPRINT_INDEX", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jira_fingerprints.json"))
+    # Set by run_tests_with_jira.py, which files the tickets from the result stream itself
+    JIRA_REPORTER_DISABLED = os.getenv("JIRA_REPORTER_DISABLED", "false").lower() == "true"
+
+    # Discovered Jira custom field ids, cached per Jira URL and project for JIRA_FIELD_CACHE_TTL seconds
+    JIRA_FIELD_CACHE = os.getenv("JIRA_FIELD_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jira_field_cache.json"))
+    JIRA_FIELD_CACHE_TTL = float(os.getenv("JIRA_FIELD_CACHE_TTL", 24 * 3600))
+
+    # Screenshots are written by a background pool; identical frames are stored once and the
+    # least recently used files are evicted beyond SCREENSHOT_MAX_BYTES (split evenly between xdist workers)
+    SCREENSHOT_WORKERS = int(os.getenv("SCREENSHOT_WORKERS", 2))
+    SCREENSHOT_MAX_BYTES = int(os.getenv("SCREENSHOT_MAX_BYTES", 200 * 1024 * 1024))
+    # Downsample wider screenshots to this many pixels (0 keeps full size; needs Pillow)
+    SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", 0))
+
+    # Performance baseline store: timings are compared against the last PERF_BASELINE_WINDOW
+    # samples of earlier runs; PERFORMANCE_THRESHOLD only applies until PERF_BASELINE_MIN_SAMPLES exist
+    PERF_BASELINE_DB = os.getenv("PERF_BASELINE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".perf_baseline.sqlite3"))
+    PERF_BASELINE_WINDOW = int(os.getenv("PERF_BASELINE_WINDOW", 30))
+    PERF_BASELINE_MIN_SAMPLES = int(os.getenv("PERF_BASELINE_MIN_SAMPLES", 10))
+    PERF_REGRESSION_ALPHA = float(os.getenv("PERF_REGRESSION_ALPHA", 0.05))
+    PERF_REGRESSION_MIN_EFFECT = float(os.getenv("PERF_REGRESSION_MIN_EFFECT", 0.2))
 
     # Browser Defaults
     DEFAULT_BROWSER = "chrome"
     HEADLESS = os.getenv("HEADLESS", "false").lower() == "true"
     WINDOW_WIDTH = int(os.getenv("WINDOW_WIDTH", 1920))
     WINDOW_HEIGHT = int(os.getenv("WINDOW_HEIGHT", 1080))
+
+    # Driver pool: a warm driver is quit and relaunched after this many tests
+    DRIVER_POOL_MAX_USES = int(os.getenv("DRIVER_POOL_MAX_USES", 25))
+
+
+def worker_name() -> str:
+    """
+    Name of this test process in per-process report files: the xdist worker
+    ("gw0", "gw1"...) or "main", prefixed by the shard id inside a shard
+    ("chrome1", "chrome1_gw0")
+    """
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if Config.TEST_SHARD_ID:
+        return f"{Config.TEST_SHARD_ID}_{worker}" if worker else Config.TEST_SHARD_ID
+    return worker or "main"
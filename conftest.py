@@ -9,26 +9,166 @@ from selenium import webdriver
 project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
-from config import Config
+from config import Config, worker_name
 
 def pytest_addoption(parser):
     parser.addoption("--browser", action="store", default=Config.DEFAULT_BROWSER, help="Browser: chrome, firefox, edge")
     parser.addoption("--remote", action="store_true", default=False, help="Run on Docker Selenium Grid")
     parser.addoption("--headless", action="store_true", default=False, help="Run in headless mode")
+    parser.addoption("--no-driver-pool", action="store_true", default=False, help="Launch a fresh browser for every test instead of reusing pooled drivers")
+    parser.addoption("--replay", action="store_true", default=False, help="Serve saved portal pages from a local replay server instead of data.gov.tn")
+    parser.addoption("--replay-latency", action="store", type=float, default=None, help="Artificial latency in seconds added to every replayed response")
+    parser.addoption("--no-lpt-schedule", action="store_true", default=False, help="Use xdist's own load scheduling instead of handing out tests longest-first")
+    parser.addoption("--http-cache", action="store", default="off", choices=["off", "record", "replay"], help="Route browsers through the caching proxy: record fills the cache, replay serves only from it")
+    parser.addoption("--result-stream", action="store", default=None, help="Append one JSON line per finished test to this file while the run is in progress")
+    parser.addoption("--trace-webdriver", action="store_true", default=False, help="Time every WebDriver command and sleep per test into reports/webdriver_trace (same as TRACE_WEBDRIVER_COMMANDS=true)")
+
+
+def pytest_configure(config):
+    """
+    Turn on WebDriver command tracing for --trace-webdriver, and register the
+    JSONL result stream plugin for --result-stream (on the xdist controller only).
+    """
+    if config.getoption("--trace-webdriver"):
+        Config.TRACE_WEBDRIVER_COMMANDS = True
+    path = config.getoption("--result-stream")
+    if path and not hasattr(config, "workerinput"):
+        from utils.result_stream import ResultStreamPlugin
+        config.pluginmanager.register(ResultStreamPlugin(path, config.getoption("--browser")), "result_stream")
+
+def _runs_whole_session(config) -> bool:
+    """
+    True in the process that owns the run: the xdist controller, or the only
+    process without xdist - but not a run_parallel_cross_browser.py shard,
+    whose runner does the run-wide steps once for all shards.
+    """
+    return not hasattr(config, "workerinput") and not Config.TEST_SHARD_ID
+
+
+def pytest_sessionstart(session):
+    """
+    Zero the shared rate-limit counters and remove stale UI documentation
+    shards and WebDriver traces once per run (on the xdist controller only).
+    """
+    if _runs_whole_session(session.config):
+        from utils.rate_limiter import get_rate_limiter
+        from utils.ui_documentation import remove_shards
+        from utils.command_tracer import remove_traces
+        get_rate_limiter().reset_counters()
+        remove_shards()
+        remove_traces()
+
+
+# Setup + call + teardown seconds per test of this run (complete on the xdist controller),
+# the same definition as the "duration" of the result stream
+_test_durations = {}
+# Page-object retry totals of this run, merged from the teardown report of every test
+_retry_totals = None
+
+
+def pytest_runtest_logreport(report):
+    """Accumulate per-test durations and page-object retry totals for the summary."""
+    global _retry_totals
+    _test_durations[report.nodeid] = _test_durations.get(report.nodeid, 0.0) + report.duration
+    for name, value in report.user_properties:
+        if name == "retries":
+            from utils.retry_policy import RetryCounters
+            _retry_totals = _retry_totals or RetryCounters()
+            _retry_totals.merge(value)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Hand tests to xdist workers longest-first, unless --no-lpt-schedule or another --dist mode."""
+    if config.getvalue("dist") != "load" or config.getoption("--no-lpt-schedule"):
+        return None
+    from utils.duration_scheduler import LPTScheduling
+    return LPTScheduling(config, log)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    """With --remote, '-n auto' starts one worker per grid slot for the browser."""
+    if config.getoption("--remote"):
+        from utils.duration_scheduler import grid_worker_count
+        return grid_worker_count()
+    return None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Finish pending screenshot writes, then merge the UI documentation shards
+    and the WebDriver timelines of all workers into one report each and
+    update the test duration history (controller only).
+    """
+    from utils.screenshot_writer import close_screenshot_writer
+    close_screenshot_writer()
+
+    if _runs_whole_session(session.config):
+        from utils.ui_documentation import merge_shards
+        from utils.command_tracer import merge_timelines
+        from utils.duration_scheduler import DurationHistory
+        if _test_durations:
+            DurationHistory(browser=session.config.getoption("--browser").lower()).update(_test_durations)
+        report_path = merge_shards(test_session_name="session_final")
+        if report_path:
+            print(f"\nUI Documentation Report generated: {report_path}")
+        timeline_path = merge_timelines()
+        if timeline_path:
+            print(f"WebDriver timeline (open in Perfetto): {timeline_path}")
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report how long all workers spent waiting on the shared rate limiter and retrying."""
+    from utils.rate_limiter import get_rate_limiter
+    stats = get_rate_limiter().shared_stats()
+    if stats:
+        terminalreporter.section("rate limiting")
+        for host, counters in sorted(stats.items()):
+            terminalreporter.write_line(
+                f"{host}: {counters['requests']} requests, {counters['throttled_requests']} throttled, "
+                f"{counters['throttled_seconds']:.1f}s waiting"
+            )
+
+    if _retry_totals and _retry_totals.retried_calls:
+        failures = ", ".join(f"{count} {name}" for name, count in sorted(_retry_totals.failure_classes.items()))
+        terminalreporter.section("retries")
+        terminalreporter.write_line(
+            f"{_retry_totals.retried_calls} of {_retry_totals.calls} page-object calls retried, "
+            f"{_retry_totals.retries} retries, {_retry_totals.gave_up} gave up, "
+            f"{_retry_totals.slept_seconds:.1f}s backing off"
+        )
+        terminalreporter.write_line(f"failures: {failures}")
+
+@pytest.fixture(scope="session", autouse=True)
+def replay_server(request):
+    """
+    With --replay, starts the offline replay server and points Config's portal
+    URLs at it for the whole session. Yields None otherwise.
+    """
+    if not request.config.getoption("--replay"):
+        yield None
+        return
+
+    from utils.replay_server import ReplayServer
+    server = ReplayServer(latency=request.config.getoption("--replay-latency")).start()
+    original_urls = {name: getattr(Config, name) for name in ("BASE_URL", "CATALOG_URL_FR", "CATALOG_URL_AR")}
+    for name, url in original_urls.items():
+        setattr(Config, name, server.local_url(url))
+    yield server
+    for name, url in original_urls.items():
+        setattr(Config, name, url)
+    server.stop()
 
 @pytest.fixture(scope="session")
 def base_url():
     return Config.BASE_URL
 
-@pytest.fixture(scope="function")
-def browser(request):
+def create_driver(browser_name: str, headless: bool, use_remote: bool, proxy_address: str = None):
     """
-    Initializes the WebDriver based on CLI options and Config.
+    Launches a new WebDriver for the given browser configuration,
+    optionally routed through the HTTP cache proxy at proxy_address.
     """
-    browser_name = request.config.getoption("--browser").lower()
-    use_remote = request.config.getoption("--remote")
-    headless = request.config.getoption("--headless") or Config.HEADLESS
-    
     driver = None
     options = None
 
@@ -52,6 +192,11 @@ def browser(request):
         options.add_argument(f"--window-size={Config.WINDOW_WIDTH},{Config.WINDOW_HEIGHT}")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
+        if proxy_address:
+            from selenium.webdriver.common.proxy import Proxy, ProxyType
+            options.proxy = Proxy({"proxyType": ProxyType.MANUAL, "httpProxy": proxy_address, "sslProxy": proxy_address})
+            # The proxy terminates HTTPS with its own self-signed certificate
+            options.accept_insecure_certs = True
 
     if use_remote:
         # Docker Execution
@@ -72,8 +217,167 @@ def browser(request):
             raise ValueError(f"Unsupported browser: {browser_name}")
 
     driver.implicitly_wait(0)
+    driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+    return driver
+
+
+@pytest.fixture(scope="session")
+def http_cache_proxy(request):
+    """
+    With --http-cache record|replay, starts the caching proxy that every browser
+    is routed through. Yields None when the cache is off.
+    """
+    mode = request.config.getoption("--http-cache")
+    if mode == "off":
+        yield None
+        return
+    if request.config.getoption("--remote"):
+        raise pytest.UsageError("--http-cache runs a proxy on this machine and cannot be combined with --remote")
+
+    from utils.http_cache_proxy import CachingProxy, REPLAY
+    proxy = CachingProxy(mode=mode).start()
+    # Replayed pages never reach the portal, so there is nothing to throttle
+    Config.RATE_LIMIT_DISABLED = mode == REPLAY
+    yield proxy
+    Config.RATE_LIMIT_DISABLED = False
+    proxy.stop()
+    stats_path = proxy.cache.write_stats(f"reports/http_cache/url_stats_{worker_name()}.json")
+    print(f"\nHTTP cache ({mode}): {proxy.cache.summary()} - per-URL stats in {stats_path}")
+
+
+@pytest.fixture(scope="session")
+def driver_pool(http_cache_proxy):
+    """
+    Session-scoped pool of warm drivers. Each xdist worker is its own process,
+    so every worker gets its own pool.
+    """
+    from utils.driver_pool import DriverPool
+    from utils.command_tracer import span
+    proxy_address = http_cache_proxy.proxy_address if http_cache_proxy else None
+
+    def launch(browser_name, headless, use_remote):
+        with span(f"launch {browser_name}", "fixture"):
+            return create_driver(browser_name, headless, use_remote, proxy_address)
+
+    pool = DriverPool(launch)
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture(scope="session")
+def command_tracer():
+    """This worker's WebDriver command tracer (None unless --trace-webdriver or TRACE_WEBDRIVER_COMMANDS)."""
+    from utils.command_tracer import get_command_tracer
+    return get_command_tracer()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Trace each test from fixture setup to teardown."""
+    from utils.command_tracer import get_command_tracer
+    tracer = get_command_tracer()
+    if tracer is None:
+        yield
+        return
+    item.command_trace = tracer.start_test(item.nodeid)
+    yield
+    tracer.finish_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Show every fixture setup (driver launch, login, cookie loading) as a span on the timeline."""
+    from utils.command_tracer import span
+    with span(f"fixture {fixturedef.argname}", "fixture", fixturedef.scope):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    from utils.command_tracer import span
+    with span("test body", "test"):
+        yield
+
+
+@pytest.fixture(scope="function")
+def browser(request, driver_pool, http_cache_proxy, command_tracer):
+    """
+    Provides a WebDriver based on CLI options and Config.
+    Drivers come from the session pool and are reset after each test,
+    unless --no-driver-pool asks for a fresh browser per test.
+    Tests marked browserless get an HttpBrowser (requests + lxml) instead.
+    Every WebDriver command and sleep of the test is traced (see command_tracer).
+    """
+    from utils.command_tracer import span
+    proxy_address = http_cache_proxy.proxy_address if http_cache_proxy else None
+    if request.node.get_closest_marker("browserless"):
+        from utils.http_browser import HttpBrowser
+        driver = HttpBrowser(proxy_address)
+        release = driver.quit
+    else:
+        browser_name = request.config.getoption("--browser").lower()
+        use_remote = request.config.getoption("--remote")
+        headless = request.config.getoption("--headless") or Config.HEADLESS
+
+        if request.config.getoption("--no-driver-pool"):
+            with span(f"launch {browser_name}", "fixture"):
+                driver = create_driver(browser_name, headless, use_remote, proxy_address)
+            release = driver.quit
+        else:
+            driver = driver_pool.acquire(browser_name, headless, use_remote)
+            release = lambda: driver_pool.release(driver)
+
+    if command_tracer:
+        command_tracer.attach(driver)
     yield driver
-    driver.quit()
+    with span("release driver", "fixture"):
+        release()
+
+@pytest.fixture(scope="function")
+def viewport_matrix(browser):
+    """
+    Checks every responsive breakpoint against one loaded page:
+
+        viewport_matrix.check_all(lambda viewport, layout: ..., {"name": locator})
+
+    Chromium browsers switch viewports with device emulation, others by resizing.
+    Each check gets one LayoutSnapshot (utils.layout_probe) of the page.
+    """
+    from utils.viewport_emulation import ViewportMatrix
+    return ViewportMatrix(browser)
+
+
+@pytest.fixture(scope="session")
+def performance_store():
+    """SQLite store of performance samples plus the id of this run (shared by xdist workers)."""
+    from utils.performance_baseline import PerformanceBaselineStore, new_run_id
+    store = PerformanceBaselineStore()
+    yield store, new_run_id()
+    store.close()
+
+
+@pytest.fixture(scope="function")
+def performance_baseline(request, performance_store):
+    """
+    Records the timings of a performance or stress test and compares them with
+    the rolling baseline of earlier runs on the same browser:
+
+        performance_baseline.record(response_time, query="education")
+        performance_baseline.assert_no_regression()
+
+    Samples are written to the store when the test finishes, unless it failed:
+    timings of a broken run must not become part of later baselines.
+    """
+    from utils.performance_baseline import PerformanceRecorder
+    store, run_id = performance_store
+    recorder = PerformanceRecorder(store, request.node.nodeid, request.config.getoption("--browser").lower(), run_id)
+    yield recorder
+    report = getattr(request.node, "report", None)  # set by pytest_runtest_makereport
+    if report is not None and report.failed:
+        print(f"Not recording the timings of failed test {request.node.nodeid} in the baseline")
+        return
+    recorder.flush()
+
 
 @pytest.fixture(scope="session")
 def authenticated_cookies():
@@ -107,17 +411,20 @@ def logged_in_browser(browser, authenticated_cookies):
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
 
-    # Load the pre-authenticated cookies into the Selenium browser
-    success = load_cookies_into_selenium(browser)
-    if not success:
-        pytest.fail("Could not load authentication cookies into browser")
+    from utils.command_tracer import span
+
+    with span("load authentication cookies", "fixture"):
+        # Load the pre-authenticated cookies into the Selenium browser
+        success = load_cookies_into_selenium(browser)
+        if not success:
+            pytest.fail("Could not load authentication cookies into browser")
 
-    # Navigate to a page that requires authentication to verify session is working
-    browser.get("https://data.gov.tn/fr/user/profile")
+        # Navigate to a page that requires authentication to verify session is working
+        browser.get("https://data.gov.tn/fr/user/profile")
 
-    # Give time for the page to load with the loaded cookies
-    import time
-    time.sleep(2)
+        # Give time for the page to load with the loaded cookies
+        import time
+        time.sleep(2)
 
     print("Browser initialized with authenticated session from captchabypasser.")
 
@@ -133,116 +440,93 @@ def pytest_runtest_makereport(item, call):
     # Store the report on the item object
     setattr(item, "report", report)
 
+    if report.when == "teardown":
+        # Hand this test's retry totals to the controller, which sums them for the summary
+        from utils.retry_policy import take_retry_counters
+        counters = take_retry_counters()
+        if counters.calls:
+            report.user_properties.append(("retries", counters.as_dict()))
+
     if report.when == "call" and report.failed:
         driver = item.funcargs.get("browser")
         if driver:
             timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
             # Clean filename
             node_id = report.nodeid.replace("::", "_").replace("/", "_").replace("\\", "_")
-            file_name = f"reports/screenshots/{node_id}_{timestamp}.png"
-
-            os.makedirs(os.path.dirname(file_name), exist_ok=True)
             try:
-                driver.save_screenshot(file_name)
+                from utils.screenshot_writer import get_screenshot_writer
+                file_name = get_screenshot_writer().capture(driver, f"{node_id}_{timestamp}")
+                report.screenshot = file_name
                 print(f"\nScreenshot saved: {file_name}")
             except Exception as e:
                 print(f"Failed to save screenshot: {e}")
 
+    trace = getattr(item, "command_trace", None)
+    if report.when == "call" and trace is not None:
+        report.sections.append(("WebDriver time breakdown", trace.summary_text()))
+        try:
+            from pytest_html import extras
+            report.extras = getattr(report, "extras", []) + [extras.html(trace.to_html())]
+        except ImportError:
+            pass
+
+@pytest.fixture(scope="session")
+def jira_dispatcher():
+    """
+    Background Jira ticket queue shared by all tests of this worker. Tickets are
+    created while the next tests run; the session waits for them at the end.
+    """
+    from utils.jira_dispatch import JiraDispatcher
+
+    def connect():
+        from jira_automation_enhanced import JiraTicketCreator
+        jira_creator = JiraTicketCreator.from_env()
+        if jira_creator is None:
+            raise RuntimeError("Jira configuration not found. Please set JIRA_URL, JIRA_USERNAME, "
+                               "JIRA_API_TOKEN and JIRA_PROJECT_KEY")
+        return jira_creator
+
+    dispatcher = JiraDispatcher(connect)
+    yield dispatcher
+    dispatcher.close()
+    if any(dispatcher.stats.values()):
+        print(f"\nJira: {dispatcher.stats['created']} tickets created, {dispatcher.stats['commented']} "
+              f"recurring failures commented, {dispatcher.stats['failed']} failed")
+
+
 @pytest.fixture(scope="function")
-def jira_reporter(request):
+def jira_reporter(request, jira_dispatcher):
     """
     Fixture to automatically create a Jira ticket if a test fails.
     To use, add @pytest.mark.usefixtures("jira_reporter") to your test.
+    Does nothing under run_tests_with_jira.py, which reports every failure itself.
     """
     yield
 
     # This code runs after the test has finished
     report = getattr(request.node, "report", None)
-    if report and report.failed:
-        print("\nTest failed, creating Jira ticket...")
-        try:
-            from jira_automation_enhanced import JiraTicketCreator
-            import os
-
-            # Get Jira configuration
-            jira_url = os.getenv("JIRA_URL")
-            jira_username = os.getenv("JIRA_USERNAME")
-            jira_api_token = os.getenv("JIRA_API_TOKEN")
-            jira_project_key = os.getenv("JIRA_PROJECT_KEY")
-
-            if not all([jira_url, jira_username, jira_api_token, jira_project_key]):
-                print("Jira configuration not found. Please set environment variables.")
-                return
-
-            # Initialize Jira ticket creator
-            jira_creator = JiraTicketCreator(jira_url, jira_username, jira_api_token, jira_project_key)
-
-            # Optionally override discovered custom field IDs from environment
-            custom_priority_field = os.getenv("JIRA_CUSTOM_FIELD_PRIORITY")
-            severity_field = os.getenv("JIRA_CUSTOM_FIELD_SEVERITY")
-            if custom_priority_field:
-                jira_creator.custom_fields['custom_priority'] = custom_priority_field
-            if severity_field:
-                jira_creator.custom_fields['severity'] = severity_field
-
-            # Create a single ticket for the failed test
-            failure = {
-                'test_name': request.node.nodeid,
-                'error': report.longreprtext,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            summary = f"Test Failure: {failure['test_name']}"
-            description = f"""
-h2. Automated Test Failure Report
-
-h3. Test Details
-*Test Case:* {failure['test_name']}
-*Time of Failure:* {failure['timestamp']}
-
-h3. Error Message
-{{code:python}}
-{failure['error']}
-{{code}}
-
-h3. Environment
-*Browser:* {request.config.getoption("--browser")}
-*Platform:* {os.getenv("PLATFORM", "N/A")}
-
-h3. Automation Info
-This ticket was automatically generated by the test automation pipeline.
-            """.strip()
-
-            priority, severity = jira_creator._determine_priority_and_severity(failure['error'])
-
-            ticket = jira_creator.create_jira_ticket(
-                summary=summary,
-                description=description,
-                issue_type="Bug",
-                labels=['automated-test-failure', 'qa', 'selenium', 'regression'],
-                priority=priority,
-                severity=severity
-            )
-
-            if ticket:
-                print(f"Created Jira ticket {ticket['key']} for test: {failure['test_name']}")
-            else:
-                print(f"Failed to create Jira ticket for test: {failure['test_name']}")
-
-        except ImportError as e:
-            print(f"Error importing Jira automation: {e}")
-        except Exception as e:
-            print(f"Error creating Jira ticket: {e}")
+    if report and report.failed and not Config.JIRA_REPORTER_DISABLED:
+        if not all(os.getenv(name) for name in ("JIRA_URL", "JIRA_USERNAME", "JIRA_API_TOKEN", "JIRA_PROJECT_KEY")):
+            print("Jira configuration not found. Please set environment variables.")
+            return
+        print("\nTest failed, queued Jira ticket...")
+        jira_dispatcher.submit({
+            'test_name': request.node.nodeid,
+            'error': report.longreprtext,
+            'timestamp': datetime.now().isoformat(),
+            'browser': request.config.getoption("--browser"),
+            'platform': os.getenv("PLATFORM", "N/A")
+        })
 
 
 @pytest.fixture(scope="session")
 def ui_documentation():
     from utils.ui_documentation import UIDocumentationSystem
+    # Each xdist worker streams to its own shard; pytest_sessionfinish merges them
     doc_system = UIDocumentationSystem()
     yield doc_system
-    # This runs after ALL tests finish, guaranteed
-    report_path = doc_system.generate_report("session_final")
-    print(f"\nUI Documentation Report generated: {report_path}")
+    # This runs after ALL tests of this worker finish, guaranteed
+    doc_system.close()
 
 
 @pytest.fixture(scope="function")
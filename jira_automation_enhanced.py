@@ -10,8 +10,13 @@ from datetime import datetime
 from typing import Dict, List, Optional, Union
 from pathlib import Path
 import sys
+import threading
 from jira import JIRA
 
+# Statuses whose issues get a new ticket instead of a comment when their failure recurs
+# (besides any status in Jira's "done" category)
+CLOSED_STATUSES = ("Resolved", "Closed", "Done")
+
 class JiraTicketCreator:
     def __init__(self, jira_url: str, username: str, api_token: str, project_key: str):
         """
@@ -29,61 +34,104 @@ class JiraTicketCreator:
 
         # Connect to Jira using the official client
         self.jira = JIRA(server=jira_url, basic_auth=self.auth)
+        # One rediscovery when concurrent ticket creations all hit stale field ids
+        self._refresh_lock = threading.Lock()
+        # JIRA_CUSTOM_FIELD_* ids applied over the discovered ones, kept across refreshes
+        self._field_overrides: Dict[str, str] = {}
 
-        # Discover custom fields (can be disabled via env to avoid /field calls in tests)
+        # Discover custom fields (can be disabled via env to avoid /field calls in tests);
+        # discovered ids are cached on disk per Jira URL and project for JIRA_FIELD_CACHE_TTL
         skip_discovery = os.getenv("JIRA_SKIP_FIELD_DISCOVERY", "").lower() in ("1", "true", "yes")
         if skip_discovery:
             self.custom_fields = {}
         else:
-            self.custom_fields = self._discover_custom_fields()
+            self.custom_fields = self._cached_custom_fields()
+
+    @classmethod
+    def from_env(cls) -> Optional["JiraTicketCreator"]:
+        """
+        Build a creator from JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN and JIRA_PROJECT_KEY,
+        applying the JIRA_CUSTOM_FIELD_* overrides. Returns None if the configuration is missing.
+        """
+        jira_url = os.getenv("JIRA_URL")
+        jira_username = os.getenv("JIRA_USERNAME")
+        jira_api_token = os.getenv("JIRA_API_TOKEN")
+        jira_project_key = os.getenv("JIRA_PROJECT_KEY")
+        if not all([jira_url, jira_username, jira_api_token, jira_project_key]):
+            return None
+
+        jira_creator = cls(jira_url, jira_username, jira_api_token, jira_project_key)
+        jira_creator.apply_custom_field_overrides()
+        return jira_creator
 
-    def _discover_custom_fields(self):
-        """Discover custom fields in the project"""
+    def apply_custom_field_overrides(self):
+        """
+        Override discovered custom field ids with JIRA_CUSTOM_FIELD_PRIORITY and
+        JIRA_CUSTOM_FIELD_SEVERITY, if set. The overrides survive refresh_custom_fields.
+        """
+        custom_priority_field = os.getenv("JIRA_CUSTOM_FIELD_PRIORITY")
+        severity_field = os.getenv("JIRA_CUSTOM_FIELD_SEVERITY")
+        if custom_priority_field:
+            self._field_overrides['custom_priority'] = custom_priority_field
+        if severity_field:
+            self._field_overrides['severity'] = severity_field
+        self.custom_fields.update(self._field_overrides)
+
+    def _cached_custom_fields(self) -> Dict[str, str]:
+        """Custom field ids from the field cache, discovering them on a miss"""
+        from utils.jira_field_cache import JiraFieldCache
         try:
-            # Get all fields first to identify custom ones
-            all_jira_fields = self.jira.fields()
-            custom_fields = {}
-
-            # Look for custom fields that match our requirements
-            for field in all_jira_fields:
-                field_id = field['id']
-                field_name = field['name'].lower()
-
-                if 'severity' in field_name:
-                    custom_fields['severity'] = field_id
-                elif 'priority' in field_name and 'custom' in field_name:
-                    custom_fields['custom_priority'] = field_id
-
-            # If the project has existing issues, we can double-check the actual field IDs
-            try:
-                issues = self.jira.search_issues(f"project={self.project_key}", maxResults=1)
-                if issues:
-                    sample_issue = issues[0]
-                    all_fields = sample_issue.raw['fields']
-                    for field_id in all_fields.keys():
-                        if field_id.startswith('customfield_'):
-                            # Get field name via field metadata
-                            try:
-                                field_meta = self.jira.field(field_id)
-                                field_name = field_meta['name'].lower()
-                                if 'severity' in field_name:
-                                    custom_fields['severity'] = field_id
-                                elif 'priority' in field_name and 'custom' in field_name:
-                                    custom_fields['custom_priority'] = field_id
-                            except:
-                                # If the field info can't be retrieved, skip it
-                                pass
-            except:
-                pass
-
-            return custom_fields
+            return dict(JiraFieldCache().get_or_discover(self.jira_url, self.project_key,
+                                                         self._discover_custom_fields))
         except Exception as e:
+            # Not cached, so the next connection tries again
             print(f"Error discovering custom fields: {e}")
             return {}
 
+    def refresh_custom_fields(self):
+        """
+        Drop the cached field ids of this Jira and project and discover them again,
+        keeping the overrides applied by apply_custom_field_overrides
+        """
+        from utils.jira_field_cache import JiraFieldCache
+        JiraFieldCache().invalidate(self.jira_url, self.project_key)
+        self.custom_fields = {**self._cached_custom_fields(), **self._field_overrides}
+
+    def _discover_custom_fields(self) -> Dict[str, str]:
+        """Discover custom fields in the project (raises if Jira cannot be queried)"""
+        custom_fields = {}
+
+        def match(field_id: str, field_name: str):
+            field_name = field_name.lower()
+            if 'severity' in field_name:
+                custom_fields['severity'] = field_id
+            elif 'priority' in field_name and 'custom' in field_name:
+                custom_fields['custom_priority'] = field_id
+
+        # Get all fields first to identify custom ones
+        all_jira_fields = self.jira.fields()
+        field_names = {field['id']: field['name'] for field in all_jira_fields}
+        for field in all_jira_fields:
+            match(field['id'], field['name'])
+
+        # If the project has existing issues, prefer the custom fields actually used on them
+        # (names come from the field list above, so this costs one search, not one call per field)
+        try:
+            issues = self.jira.search_issues(f"project={self.project_key}", maxResults=1)
+            if issues:
+                for field_id in issues[0].raw['fields'].keys():
+                    if field_id.startswith('customfield_') and field_id in field_names:
+                        match(field_id, field_names[field_id])
+        except Exception:
+            pass
+
+        return custom_fields
+
     def parse_test_report(self, report_path: str) -> List[Dict]:
         """
-        Parse pytest HTML report to extract failed tests
+        Parse pytest HTML report to extract failed tests. Prefer the
+        --result-stream JSONL file: this scrapes HTML, which is slow on
+        self-contained reports and depends on the pytest-html version.
         
         Args:
             report_path: Path to the HTML test report
@@ -125,7 +173,8 @@ class JiraTicketCreator:
         return failures
 
     def create_jira_ticket(self, summary: str, description: str, issue_type: str = "Bug",
-                          labels: List[str] = None, priority: str = "Moyenne", severity: str = "Majeure") -> Optional[Dict]:
+                          labels: List[str] = None, priority: str = "Moyenne", severity: str = "Majeure",
+                          retry_on_stale_fields: bool = True) -> Optional[Dict]:
         """
         Create a Jira ticket for a test failure or test case
 
@@ -136,6 +185,7 @@ class JiraTicketCreator:
             labels: List of labels to apply to the ticket
             priority: Priority level (Basse, Moyenne, Haute) - defaults to Moyenne
             severity: Severity level (Triviale, Mineure, Majeure, Critique) - defaults to Majeure
+            retry_on_stale_fields: If Jira rejects a custom field id, rediscover the ids and try once more
 
         Returns:
             Created issue data or None if creation failed
@@ -166,6 +216,8 @@ class JiraTicketCreator:
             fields["priority"] = {"name": priority}
 
         # Add custom fields if they exist
+        custom_fields_used = self.custom_fields
+        custom_field_ids = set()
         if issue_type.lower() == "bug":
             # Resolve custom priority/severity field ids (discovered, env, or hardcoded fallback)
             custom_priority_field = (
@@ -181,8 +233,10 @@ class JiraTicketCreator:
 
             if custom_priority_field and priority:
                 fields[custom_priority_field] = {"value": priority}
+                custom_field_ids.add(custom_priority_field)
             if custom_severity_field and severity:
                 fields[custom_severity_field] = {"value": severity}
+                custom_field_ids.add(custom_severity_field)
         else:
             print(f"Note: Custom Priority/Severity fields not available for issue type '{issue_type}'. Using standard fields only.")
 
@@ -199,12 +253,24 @@ class JiraTicketCreator:
             print(f"Fields tried: {list(fields.keys())}")
 
             # Print the specific error response
+            stale_fields = False
             if hasattr(e, 'response') and e.response is not None:
                 try:
                     error_response = e.response.json()
                     print(f"Jira error details: {error_response}")
+                    stale_fields = bool(set(error_response.get('errors', {})) & custom_field_ids)
                 except:
                     print(f"Could not parse Jira error response: {e.response.text}")
+
+            # A rejected custom field means the field ids are out of date: rediscover them
+            # (unless another thread already did) and try once more with the fresh ids
+            if stale_fields and retry_on_stale_fields:
+                with self._refresh_lock:
+                    if self.custom_fields is custom_fields_used:
+                        print("Jira rejected the custom field ids, rediscovering them")
+                        self.refresh_custom_fields()
+                return self.create_jira_ticket(summary, description, issue_type, labels, priority, severity,
+                                               retry_on_stale_fields=False)
             return None
 
     def _determine_priority_and_severity(self, error_message: str) -> (str, str):
@@ -237,22 +303,9 @@ class JiraTicketCreator:
         # Default to medium priority and major severity
         return "Moyenne", "Majeure"
 
-    def create_tickets_for_failures(self, report_path: str) -> List[Dict]:
-        """
-        Parse test report and create Jira tickets for all failures
-
-        Args:
-            report_path: Path to the test report
-
-        Returns:
-            List of created ticket information
-        """
-        failures = self.parse_test_report(report_path)
-        created_tickets = []
-
-        for failure in failures:
-            summary = f"Test Failure: {failure['test_name']}"
-            description = f"""
+    def failure_description(self, failure: Dict) -> str:
+        """Jira description of a test failure (test_name, error, timestamp, optional browser/platform/screenshot)"""
+        return f"""
 h2. Automated Test Failure Report
 
 h3. Test Details
@@ -265,37 +318,81 @@ h3. Error Message
 {{code}}
 
 h3. Environment
-*Browser:* {os.getenv("BROWSER", "N/A")}
-*Platform:* {os.getenv("PLATFORM", "N/A")}
+*Browser:* {failure.get('browser') or os.getenv("BROWSER", "N/A")}
+*Platform:* {failure.get('platform') or os.getenv("PLATFORM", "N/A")}
+*Screenshot:* {failure.get('screenshot') or "N/A"}
 
 h3. Automation Info
 This ticket was automatically generated by the test automation pipeline.
-            """.strip()
+        """.strip()
+
+    def create_failure_ticket(self, failure: Dict) -> Optional[Dict]:
+        """Open a Bug for a test failure, with priority and severity derived from the error"""
+        priority, severity = self._determine_priority_and_severity(failure['error'])
+        return self.create_jira_ticket(
+            summary=f"Test Failure: {failure['test_name']}",
+            description=self.failure_description(failure),
+            issue_type="Bug",
+            labels=['automated-test-failure', 'qa', 'selenium', 'regression'],
+            priority=priority,
+            severity=severity
+        )
+
+    def add_failure_comment(self, issue_key: str, failure: Dict, occurrence: int) -> Optional[bool]:
+        """
+        Record a recurring failure on its existing issue. A resolved or closed
+        issue is left alone: the failure came back, so it needs a new ticket.
 
-            # Determine priority and severity based on the failure
-            priority, severity = self._determine_priority_and_severity(failure['error'])
+        Returns:
+            True if the comment was added, None if the issue no longer exists or is
+            resolved/closed, False on other errors
+        """
+        body = f"""
+h3. Failure recurred (occurrence {occurrence})
+*Test Case:* {failure['test_name']}
+*Time of Failure:* {failure['timestamp']}
+*Browser:* {failure.get('browser') or os.getenv("BROWSER", "N/A")}
 
-            ticket = self.create_jira_ticket(
-                summary=summary,
-                description=description,
-                issue_type="Bug",
-                labels=['automated-test-failure', 'qa', 'selenium', 'regression'],
-                priority=priority,
-                severity=severity
-            )
+{{code:python}}
+{failure['error']}
+{{code}}
+        """.strip()
+        try:
+            status = self.jira.issue(issue_key, fields="status").fields.status
+            if status.statusCategory.key == "done" or status.name in CLOSED_STATUSES:
+                print(f"Jira issue {issue_key} is {status.name}, a new ticket will be created")
+                return None
+            self.jira.add_comment(issue_key, body)
+            return True
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 404:
+                print(f"Jira issue {issue_key} no longer exists, a new ticket will be created")
+                return None
+            print(f"Error commenting on Jira ticket {issue_key}: {e}")
+            return False
 
-            if ticket:
-                created_tickets.append({
-                    'test_name': failure['test_name'],
-                    'jira_key': ticket['key'],
-                    'jira_url': f"{self.jira_url}/browse/{ticket['key']}",
-                    'timestamp': failure['timestamp']
-                })
-                print(f"Created Jira ticket {ticket['key']} for test: {failure['test_name']}")
-            else:
-                print(f"Failed to create Jira ticket for test: {failure['test_name']}")
+    def create_tickets_for_failures(self, report_path: str) -> List[Dict]:
+        """
+        Report all failures of a finished run to Jira concurrently. Failures
+        already reported (same normalized error, in any test) get a comment on
+        their existing issue instead of a new ticket.
 
-        return created_tickets
+        Args:
+            report_path: Path to a --result-stream JSONL file, or (legacy) to the pytest-html report
+
+        Returns:
+            List of created or updated ticket information
+        """
+        from utils.jira_dispatch import JiraDispatcher
+        from utils.result_stream import read_results
+
+        dispatcher = JiraDispatcher(lambda: self)
+        try:
+            if str(report_path).endswith(".jsonl"):
+                return dispatcher.dispatch_results(read_results(report_path))
+            return dispatcher.dispatch_all(self.parse_test_report(report_path))
+        finally:
+            dispatcher.close()
 
     def bulk_create_tickets_from_json(self, json_data: Union[List[Dict], str, Path]) -> List[Dict]:
         """
@@ -398,44 +495,49 @@ This ticket was automatically generated from an LLM-based test case.
             } for tc in test_cases]
 
 
+DEFAULT_REPORT_PATH = "reports/report.html"
+DEFAULT_RESULT_STREAM = "reports/results.jsonl"
+
+
+def default_report_path() -> str:
+    """
+    The result stream every pytest run writes (--result-stream in pytest.ini's
+    addopts), or the pytest HTML report for runs made without it
+    """
+    return DEFAULT_RESULT_STREAM if os.path.exists(DEFAULT_RESULT_STREAM) else DEFAULT_REPORT_PATH
+
+
 def main():
     """Main function to run the Jira ticket creator from the command line."""
     import argparse
 
     parser = argparse.ArgumentParser(description="Create Jira tickets from test reports or JSON files.")
-    parser.add_argument("--report-path", help="Path to the pytest HTML report.", default="reports/report.html")
+    parser.add_argument("--report-path", help=f"Path to the pytest HTML report or a --result-stream JSONL file (default: {DEFAULT_RESULT_STREAM}, or {DEFAULT_REPORT_PATH} if there is none).")
     parser.add_argument("--json-path", help="Path to a JSON file with LLM-generated test cases.")
     parser.add_argument("--all", action="store_true", help="Process both the report and JSON file if they exist.")
+    parser.add_argument("--refresh-jira-fields", action="store_true", help="Rediscover Jira custom field ids instead of using the cached ones.")
 
     args = parser.parse_args()
+    if args.report_path is None:
+        args.report_path = default_report_path()
 
-    # Configuration from environment variables
-    jira_url = os.getenv("JIRA_URL")
-    jira_username = os.getenv("JIRA_USERNAME")
-    jira_api_token = os.getenv("JIRA_API_TOKEN")
-    jira_project_key = os.getenv("JIRA_PROJECT_KEY")
+    if args.refresh_jira_fields:
+        from utils.jira_field_cache import JiraFieldCache
+        JiraFieldCache().invalidate()
 
-    if not all([jira_url, jira_username, jira_api_token, jira_project_key]):
+    # Initialize the ticket creator from the environment
+    jira_creator = JiraTicketCreator.from_env()
+    if jira_creator is None:
         print("Error: Missing Jira configuration. Please set JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, and JIRA_PROJECT_KEY environment variables.")
         sys.exit(1)
 
-    # Initialize the ticket creator
-    jira_creator = JiraTicketCreator(jira_url, jira_username, jira_api_token, jira_project_key)
-
-    # Optionally override discovered custom field IDs from environment
-    custom_priority_field = os.getenv("JIRA_CUSTOM_FIELD_PRIORITY")
-    severity_field = os.getenv("JIRA_CUSTOM_FIELD_SEVERITY")
-    if custom_priority_field:
-        jira_creator.custom_fields['custom_priority'] = custom_priority_field
-    if severity_field:
-        jira_creator.custom_fields['severity'] = severity_field
-
-
     if args.all or args.report_path:
         if os.path.exists(args.report_path):
             print(f"Processing test report: {args.report_path}")
-            created_tickets = jira_creator.create_tickets_for_failures(args.report_path)
-            print(f"Created {len(created_tickets)} Jira tickets from test failures.")
+            tickets = jira_creator.create_tickets_for_failures(args.report_path)
+            created = sum(1 for ticket in tickets if ticket['action'] == 'created')
+            print(f"Created {created} Jira tickets from test failures, "
+                  f"commented on {len(tickets) - created} existing tickets.")
         else:
             print(f"Test report not found at {args.report_path}")
 
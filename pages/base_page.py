@@ -1,63 +1,121 @@
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, WebDriverException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 import logging
 import time
+import weakref
+from urllib.parse import urlparse
 from utils.standard_monitor import create_standard_monitor
+from utils.rate_limiter import get_rate_limiter
+from utils.retry_policy import RetryPolicy, RetryStats, RetryCounters, TRANSIENT, record_retry_stats
+from utils.performance_probe import PerformanceProbe
+from utils.command_tracer import traced
 from config import Config
 
+# Host each driver last navigated to, shared by every page object wrapping that driver
+_driver_hosts = weakref.WeakKeyDictionary()
+
+# Whether clicking the element requests a document from the server: a real link, or a
+# submit button of a form. In-page anchors, javascript: links and plain buttons do not.
+_NAVIGATES_ON_CLICK_JS = """
+const el = arguments[0];
+const link = el.closest('a[href]');
+if (link) {
+    const href = link.getAttribute('href').trim().toLowerCase();
+    return !(href === '' || href.startsWith('#') || href.startsWith('javascript:'));
+}
+const control = el.closest('button, input');
+return !!(control && control.form && (control.type === 'submit' || control.type === 'image'));
+"""
+
+# Keys that submit the form of a text field
+_SUBMIT_KEYS = ("\n", Keys.ENTER, Keys.RETURN)
+
 
 class BasePage:
     """Base class for all Page Objects containing common methods."""
 
     def __init__(self, driver: WebDriver, timeout: int = 10):
         self.driver = driver
+        if getattr(driver, "static_document", False):
+            # HttpBrowser documents never change after loading: check once instead of polling
+            timeout = 0
         self.timeout = timeout
-        self.wait = WebDriverWait(driver, timeout, ignored_exceptions=[StaleElementReferenceException])
+        self.wait = WebDriverWait(driver, timeout, poll_frequency=0.01 if timeout == 0 else 0.5,
+                                  ignored_exceptions=[StaleElementReferenceException])
         # Initialize monitoring if available (will be set up via pytest fixtures)
         self._ui_monitor = None
         self._doc_system = None
         self._standard_monitor = None
-        # Rate limiting
-        self._last_request_time = 0
+        # Retry handling
+        self._retry_policy = RetryPolicy()
+        self.retry_counters = RetryCounters()
+        # Browser-side timings, captured after each navigation; navigation_metrics is
+        # the capture of the latest navigation (None if it was not captured)
+        self.performance = PerformanceProbe(driver)
+        self.navigation_metrics = None
 
-    def _rate_limit(self):
-        """Enforce rate limiting to avoid being blocked by government websites"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-
-        if time_since_last_request < Config.REQUEST_DELAY:
-            sleep_time = Config.REQUEST_DELAY - time_since_last_request
-            time.sleep(sleep_time)
+    def _rate_limit(self, url: str = None):
+        """
+        Enforce rate limiting to avoid being blocked by government websites.
+        Draws from the shared per-host token bucket, so all page objects and
+        xdist workers respect the same budget. Only operations that reach the
+        portal (navigation, navigating clicks, form submits) are charged; element
+        lookups stay in the browser. Without a url, the host the driver is
+        currently on is charged.
+        """
+        if url:
+            host = urlparse(url).hostname
+            _driver_hosts[self.driver] = host
+        else:
+            host = _driver_hosts.get(self.driver, urlparse(Config.BASE_URL).hostname)
 
-        self._last_request_time = time.time()
+        get_rate_limiter().acquire(host)
 
         # Additional delay to reduce bot detection - only for sensitive operations
         # Don't apply to every action to avoid excessive delays
         # This is handled separately in sensitive methods like login
 
-    def _retry_with_backoff(self, func, *args, **kwargs):
-        """Execute a function with retry logic for handling connection issues"""
-        for attempt in range(Config.MAX_RETRIES):
-            try:
-                self._rate_limit()
-                return func(*args, **kwargs)
-            except Exception as e:
-                if attempt == Config.MAX_RETRIES - 1:  # Last attempt
-                    raise e
-                time.sleep(Config.RETRY_DELAY)
-                # Log retry attempt
-                logging.info(f"Retry attempt {attempt + 1}/{Config.MAX_RETRIES} for {func.__name__}")
-        return None
+    def _retry_with_backoff(self, func, *args, url: str = None, navigates: bool = False, **kwargs):
+        """
+        Execute a function with retry logic for handling connection issues.
+        Network failures back off exponentially with jitter, stale elements are
+        retried right away and locator misses fail immediately. The outcome of
+        every call is added to self.retry_counters and to the totals reported in
+        the terminal summary. Calls that navigate (a url is given, or
+        navigates=True) are charged to the rate limiter.
+        """
+        stats = RetryStats(function=func.__name__)
+        navigates = navigates or url is not None
 
+        def _before_attempt(previous_failure):
+            # Re-querying a stale element never reaches the server, so only charge
+            # the rate limiter for the first attempt and for network retries
+            if navigates and previous_failure in (None, TRANSIENT):
+                self._rate_limit(url)
+
+        try:
+            return self._retry_policy.run(lambda: func(*args, **kwargs), stats, before_attempt=_before_attempt)
+        finally:
+            self.retry_counters.add(stats)
+            record_retry_stats(stats)
+
+    @traced("page")
     def open_url(self, url: str):
         """Navigates to the specified URL with rate limiting."""
         def _open():
             self.driver.get(url)
-        self._retry_with_backoff(_open)
+        self._retry_with_backoff(_open, url=url)
+        self._capture_navigation_metrics()
 
+    def _capture_navigation_metrics(self):
+        """Record browser timing entries for the page just loaded, when enabled"""
+        self.navigation_metrics = self.performance.capture() if Config.CAPTURE_NAVIGATION_METRICS else None
+
+    @traced("page")
     def find(self, locator: tuple):
         """Finds a visible element with automatic monitoring."""
         def _find():
@@ -68,14 +126,19 @@ class BasePage:
             return element
         return self._retry_with_backoff(_find)
 
+    @traced("page")
     def find_all(self, locator: tuple):
-        """Finds all present elements (visible or not) with rate limiting."""
+        """Finds all present elements (visible or not) with retries."""
         def _find_all():
             return self.wait.until(EC.presence_of_all_elements_located(locator))
         return self._retry_with_backoff(_find_all)
 
-    def click(self, locator: tuple):
-        """Clicks on a clickable element with rate limiting and retries."""
+    @traced("page")
+    def click(self, locator: tuple, navigates: bool = None):
+        """
+        Clicks on a clickable element with retries. Clicks that load a page are
+        rate limited; navigates=None detects them (links and submit buttons).
+        """
         def _click():
             element = self.wait.until(EC.element_to_be_clickable(locator))
             
@@ -83,13 +146,23 @@ class BasePage:
             if self._standard_monitor:
                 self._record_ui_change(locator, "click", {"action": "click"}, {"action": "clicked"})
             
+            if self._navigates_on_click(element) if navigates is None else navigates:
+                self._rate_limit()
             element.click()
             return element
         
         return self._retry_with_backoff(_click)
 
+    def _navigates_on_click(self, element) -> bool:
+        """Whether clicking the element loads a page (assumed when it cannot be checked)"""
+        try:
+            return bool(self.driver.execute_script(_NAVIGATES_ON_CLICK_JS, element))
+        except WebDriverException:
+            return True
+
+    @traced("page")
     def input_text(self, locator: tuple, text: str):
-        """Sends text to an element with rate limiting and retries."""
+        """Sends text to an element with retries; text ending in Enter submits the form and is rate limited."""
         def _input_text():
             element = self.find(locator)
             
@@ -100,6 +173,8 @@ class BasePage:
                                      {"action": "text_entered", "text": text})
             
             element.clear()
+            if text.endswith(_SUBMIT_KEYS):
+                self._rate_limit()
             element.send_keys(text)
             return element
         
@@ -113,6 +188,7 @@ class BasePage:
         """Returns the current URL."""
         return self.driver.current_url
 
+    @traced("page")
     def safe_open_url(self, url: str, fallback_url: str = "about:blank"):
         """
         Safely opens a URL with retry mechanism and fallback for fragile websites.
@@ -121,7 +197,8 @@ class BasePage:
         try:
             def _open_url():
                 self.driver.get(url)
-            self._retry_with_backoff(_open_url)
+            self._retry_with_backoff(_open_url, url=url)
+            self._capture_navigation_metrics()
             return True
         except Exception as e:
             # Log the error and try fallback
@@ -132,6 +209,7 @@ class BasePage:
             except:
                 raise e  # If fallback also fails, raise original error
     
+    @traced("page")
     def safe_navigate(self, navigation_func, fallback_url: str = "about:blank"):
         """
         Safely executes a navigation function with retry and fallback.
@@ -140,7 +218,7 @@ class BasePage:
         try:
             def _navigate():
                 return navigation_func()
-            result = self._retry_with_backoff(_navigate)
+            result = self._retry_with_backoff(_navigate, navigates=True)
             return True, result
         except Exception as e:
             logging.warning(f"Navigation failed: {str(e)}, trying fallback {fallback_url}")
@@ -243,11 +321,9 @@ class BasePage:
         monitor = UIStateMonitor(self.driver)
         results = monitor.monitor_loading_states()
         
-        # Check if all loading indicators have disappeared
-        all_disappeared = all(
-            result.get('disappeared', result.get('appearance', {}).get('disappeared', True)) 
-            for result in results.values() 
-            if isinstance(result, dict) and 'error' not in result
-        )
+        # Every result carries an 'error' key (None when the indicator was watched); if no
+        # indicator could be watched at all, nothing is known to have disappeared
+        watched = [result for result in results.values() if isinstance(result, dict) and not result.get('error')]
+        all_disappeared = bool(watched) and all(result['disappeared'] for result in watched)
         
         return all_disappeared, results
\ No newline at end of file
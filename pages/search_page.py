@@ -1,10 +1,81 @@
+from dataclasses import dataclass, field
 from typing import List, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
 from pages.base_page import BasePage
+from utils.ui_monitor import IS_DISPLAYED_JS
 from config import Config
 
+# Reads every result card plus the "next page" link in one round trip.
+# arguments: result item selector, heading link selector, next-page CSS selectors, next-page XPath
+_RESULTS_SNAPSHOT_JS = IS_DISPLAYED_JS + """
+    var itemSelector = arguments[0], headingSelector = arguments[1];
+    var nextSelectors = arguments[2], nextXPath = arguments[3];
+
+    function text(el) {
+        return el ? el.textContent.replace(/\\s+/g, ' ').trim() : '';
+    }
+
+    var results = Array.prototype.map.call(document.querySelectorAll(itemSelector), function (item, index) {
+        var link = item.querySelector(headingSelector);
+        var description = item.querySelector('.dataset-content > div, .dataset-content > p, .notes');
+        var organization = item.querySelector('.dataset-organization, .dataset-org, .organization');
+        // A resource can be matched by both selectors ("csv" attribute, "CSV" text):
+        // keep the first spelling of each format, compared case-insensitively
+        var seen = {};
+        var formats = Array.prototype.map.call(
+            item.querySelectorAll('.dataset-resources [data-format], .dataset-resources li'),
+            function (el) { return el.getAttribute('data-format') || text(el); }
+        ).filter(function (format) {
+            var key = format && format.toLowerCase();
+            if (!key || seen[key]) { return false; }
+            seen[key] = true;
+            return true;
+        });
+        return {
+            index: index,
+            title: text(link),
+            url: link ? link.href : null,
+            formats: formats,
+            organization: organization ? text(organization) : null,
+            description: text(description)
+        };
+    });
+
+    var candidates = [];
+    nextSelectors.forEach(function (selector) {
+        candidates.push.apply(candidates, document.querySelectorAll(selector));
+    });
+    var found = document.evaluate(nextXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < found.snapshotLength; i++) {
+        candidates.push(found.snapshotItem(i));
+    }
+    var next = candidates.find(function (el) { return el.href && isDisplayed(el); });
+
+    return {results: results, next_page_url: next ? next.href : null};
+"""
+
+
+@dataclass
+class SearchResult:
+    """One result card of the search page, read in a single snapshot"""
+    index: int
+    title: str
+    url: Optional[str]
+    formats: List[str] = field(default_factory=list)
+    organization: Optional[str] = None
+    description: str = ""
+
+
+@dataclass
+class ResultsSnapshot:
+    """All result cards of the current results page plus its next-page link"""
+    results: List[SearchResult]
+    next_page_url: Optional[str] = None
+
+
 class SearchPage(BasePage):
     """
     Page de recherche des jeux de données CKAN.
@@ -21,7 +92,17 @@ class SearchPage(BasePage):
     FILTER_CATEGORY = (By.CSS_SELECTOR, "select[name='groups'], .filter-category select")
     FILTER_ORG = (By.CSS_SELECTOR, "select[name='organization'], .filter-org select")
 
+    # Pagination
+    NEXT_PAGE_CSS_SELECTORS = [".pagination .next a", ".pager-next a", "[rel='next']"]
+    NEXT_PAGE_XPATH = "//a[contains(text(), 'Next') or contains(text(), 'Suivant') or contains(text(), 'Page Suivante') or contains(@title, 'Next')]"
+
+    def __init__(self, driver: WebDriver, timeout: int = 10):
+        super().__init__(driver, timeout)
+        # Results of the page currently loaded, cleared whenever this page object navigates
+        self._snapshot: Optional[ResultsSnapshot] = None
+
     def open(self) -> None:
+        self._snapshot = None
         success = self.safe_open_url(Config.CATALOG_URL_FR)
         if success:
             # Verify page load by checking search input if we successfully loaded the real page
@@ -33,35 +114,56 @@ class SearchPage(BasePage):
 
     def search(self, query: str) -> None:
         """Enters query and submits search."""
+        self._snapshot = None
         self.input_text(self.SEARCH_INPUT, query)
+        previous_url = self.driver.current_url
+        previous_document = self.driver.find_element(By.TAG_NAME, "html")
         # Using specific find for form to submit
         self.driver.find_element(*self.SEARCH_FORM).submit()
 
-        # Wait for either results or 'no results' message
+        # The old catalog page still has results right after the submit: wait until it
+        # has been replaced, then for either results or 'no results' message
+        self.wait.until(
+            lambda d: EC.staleness_of(previous_document)(d) or d.current_url != previous_url
+        )
         self.wait.until(
             lambda d: self.has_results() or self.has_no_results_message()
         )
+        # The form submit is a navigation too: record the results page timings
+        self._capture_navigation_metrics()
 
-    def get_results_titles(self) -> List[str]:
-        """Extracts titles from result cards."""
-        titles = []
+    def get_results_snapshot(self, refresh: bool = True) -> ResultsSnapshot:
+        """
+        Reads all result cards and the next-page link with one execute_script call.
+        With refresh=False, the snapshot taken since this page object last
+        navigated is reused when there is one.
+        """
+        if self._snapshot is not None and not refresh:
+            return self._snapshot
+        raw = self.driver.execute_script(
+            _RESULTS_SNAPSHOT_JS, self.RESULT_ITEMS[1], self.DATASET_HEADING_LINK[1],
+            self.NEXT_PAGE_CSS_SELECTORS, self.NEXT_PAGE_XPATH
+        )
+        self._snapshot = ResultsSnapshot(
+            results=[SearchResult(**result) for result in raw["results"]],
+            next_page_url=raw["next_page_url"]
+        )
+        return self._snapshot
+
+    def get_results(self, refresh: bool = True) -> List[SearchResult]:
+        """Returns the result cards (title, dataset URL, formats, organization, description)."""
         try:
-            items = self.find_all(self.RESULT_ITEMS)
-            for item in items:
-                title_el = item.find_element(*self.DATASET_HEADING_LINK)
-                titles.append(title_el.text.strip())
-        except Exception:
-            # Return empty list if no items found or stale elements
+            return self.get_results_snapshot(refresh).results
+        except WebDriverException:
             return []
-        return titles
+
+    def get_results_titles(self) -> List[str]:
+        """Extracts titles from result cards."""
+        return [result.title for result in self.get_results()]
 
     def get_results_count(self) -> int:
         """Returns the number of search results."""
-        try:
-            items = self.find_all(self.RESULT_ITEMS)
-            return len(items)
-        except Exception:
-            return 0
+        return len(self.get_results())
 
     def has_results(self) -> bool:
         """Check if any result items exist."""
@@ -96,62 +198,52 @@ class SearchPage(BasePage):
         except Exception:
             return False
 
-    def open_result_by_index(self, index: int):
+    def open_result_by_index(self, index: int) -> bool:
         """
-        Opens the dataset result at the specified index.
+        Opens the dataset result at the specified index by clicking its title link,
+        so the page's own click handlers run as for a user.
+        Returns False if that result has no link to open.
         """
-        result_items = self.find_all(self.RESULT_ITEMS)
-        if index >= len(result_items):
-            raise IndexError(f"Index {index} is out of range. Only {len(result_items)} results available.")
+        results = self.get_results()
+        if index >= len(results):
+            raise IndexError(f"Index {index} is out of range. Only {len(results)} results available.")
+        url = results[index].url
+        if url is None:
+            return False
 
-        # Find the link in the specific result item
-        result_item = result_items[index]
-        link = result_item.find_element(*self.DATASET_HEADING_LINK)
-        link.click()
+        def _click_result():
+            item = self.driver.find_elements(*self.RESULT_ITEMS)[index]
+            item.find_element(*self.DATASET_HEADING_LINK).click()
+
+        self._snapshot = None
+        self._retry_with_backoff(_click_result, url=url)
+        return True
 
     def has_next_page(self) -> bool:
         """
         Check if there is a next page link available.
         """
-        next_page_selectors = [
-            (By.CSS_SELECTOR, ".pagination .next a"),
-            (By.CSS_SELECTOR, ".pager-next a"),
-            (By.CSS_SELECTOR, "[rel='next']"),
-            (By.XPATH, "//a[contains(text(), 'Next') or contains(text(), 'Suivant') or contains(text(), 'Page Suivante') or contains(@title, 'Next')]")
-        ]
-
-        for selector in next_page_selectors:
-            try:
-                elements = self.driver.find_elements(*selector)
-                for element in elements:
-                    if element.is_displayed():
-                        return True
-            except Exception:
-                continue
-        return False
+        try:
+            return self.get_results_snapshot().next_page_url is not None
+        except WebDriverException:
+            return False
 
     def go_to_next_page(self) -> bool:
         """
         Navigate to the next page if available.
         Returns True if navigation was successful, False otherwise.
         """
-        next_page_selectors = [
-            (By.CSS_SELECTOR, ".pagination .next a"),
-            (By.CSS_SELECTOR, ".pager-next a"),
-            (By.CSS_SELECTOR, "[rel='next']"),
-            (By.XPATH, "//a[contains(text(), 'Next') or contains(text(), 'Suivant') or contains(text(), 'Page Suivante') or contains(@title, 'Next')]")
-        ]
-
-        for selector in next_page_selectors:
-            try:
-                elements = self.driver.find_elements(*selector)
-                for element in elements:
-                    if element.is_displayed():
-                        element.click()
-                        # Wait a bit for page to load
-                        import time
-                        time.sleep(1)
-                        return True
-            except Exception:
-                continue
-        return False
\ No newline at end of file
+        try:
+            next_page_url = self.get_results_snapshot().next_page_url
+        except WebDriverException:
+            return False
+        if next_page_url is None:
+            return False
+
+        self._snapshot = None
+        try:
+            self.open_url(next_page_url)
+            self.wait.until(lambda d: self.has_results() or self.has_no_results_message())
+        except Exception:
+            return False
+        return True
@@ -1,68 +1,262 @@
+"""
+Grid-capacity-aware cross-browser runner.
+
+Splits the cross-browser tests of each browser into shards (longest-first
+packing from the recorded test durations), one shard per grid slot of that
+browser, and starts a shard only when the Selenium Grid /status endpoint shows
+a free slot for its browser. Shard output is streamed line by line as it runs,
+and each shard's queue wait (time before a slot was free) and execution time
+are reported at the end and written to tests/cross_browser/reports/shard_metrics.json.
+
+Each shard is its own pytest process, named by TEST_SHARD_ID so its UI
+documentation and WebDriver trace files do not collide with the other shards'.
+The run-wide steps conftest does for a single run - resetting the rate-limit
+counters, removing stale reports, merging them and updating the duration
+history - happen here once, before the first and after the last shard.
+"""
+
+import os
+import sys
+import json
+import time
 import subprocess
 import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-import sys
+from typing import Dict, List, Optional
+from utils.duration_scheduler import DurationHistory, lpt_partition, grid_worker_count
+from utils.grid_status import query_grid_capacity
+from utils.rate_limiter import get_rate_limiter
+from utils.result_stream import read_results
+from utils.ui_documentation import remove_shards, merge_shards
+from utils.command_tracer import remove_traces, merge_timelines
+
+TEST_TARGET = "tests/cross_browser/test_smoke_cross_browser.py"
+BROWSERS = ["chrome", "firefox", "edge"]
+REPORTS_DIR = Path("tests/cross_browser/reports")
+POLL_INTERVAL = 1.0
+
+_print_lock = threading.Lock()
+
+
+@dataclass
+class Shard:
+    browser: str
+    index: int
+    tests: List[str]
+    estimate: float
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    returncode: Optional[int] = None
+    process: Optional[subprocess.Popen] = None
+    reader: Optional[threading.Thread] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.browser}#{self.index}"
+
+    @property
+    def shard_id(self) -> str:
+        return f"{self.browser}{self.index}"
+
+    @property
+    def report_file(self) -> str:
+        return f"{self.browser}_report_shard{self.index}.html"
+
+    @property
+    def results_file(self) -> Path:
+        return REPORTS_DIR / f"{self.browser}_results_shard{self.index}.jsonl"
+
+    @property
+    def queue_wait(self) -> float:
+        return (self.started_at or time.monotonic()) - self.queued_at
+
+    @property
+    def execution_time(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at if self.started_at else 0.0
+
+
+def collect_tests(target: str) -> List[str]:
+    """Node ids pytest collects for the target (addopts cleared so no report is written)"""
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", target, "--collect-only", "-q", "-o", "addopts="],
+        capture_output=True, text=True
+    )
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+
+def plan_shards(browser: str, tests: List[str], slots: int) -> List[Shard]:
+    """Longest-first packing of the tests into at most `slots` shards"""
+    history = DurationHistory(browser=browser)
+    durations = {nodeid: history.estimate(nodeid) for nodeid in tests}
+    bins, _ = lpt_partition(durations, min(slots, len(tests)))
+    return [
+        Shard(browser=browser, index=index, tests=shard_tests,
+              estimate=sum(durations[nodeid] for nodeid in shard_tests))
+        for index, shard_tests in enumerate(bins, start=1) if shard_tests
+    ]
+
+
+def _stream_output(shard: Shard):
+    """Echo the shard's output as it arrives, prefixed with the shard label"""
+    for line in shard.process.stdout:
+        with _print_lock:
+            print(f"[{shard.label}] {line}", end="", flush=True)
+
 
-def run_browser_tests(browser_name, report_file):
-    """Run tests for a specific browser"""
+def start_shard(shard: Shard):
     cmd = [
-        sys.executable, "-m", "pytest", 
-        "tests/cross_browser/test_smoke_cross_browser.py",
-        "-v", "--remote", f"--browser={browser_name}", 
-        "--tb=short", 
-        f"--html=tests/cross_browser/reports/{report_file}", 
-        "--self-contained-html"
+        sys.executable, "-m", "pytest",
+        *shard.tests,
+        "-v", "--remote", f"--browser={shard.browser}",
+        "--tb=short",
+        f"--html={REPORTS_DIR / shard.report_file}",
+        "--self-contained-html",
+        f"--result-stream={shard.results_file}"
     ]
-    
-    print(f"Starting {browser_name} tests...")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        print(f"{browser_name} tests completed successfully")
-    else:
-        print(f"{browser_name} tests failed:")
-        print(result.stdout)
-        print(result.stderr)
-    
-    return result.returncode
+    shard.started_at = time.monotonic()
+    print(f"Starting {shard.label}: {len(shard.tests)} tests, ~{shard.estimate:.0f}s expected, "
+          f"queued {shard.queue_wait:.1f}s")
+    shard.process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+        env={**os.environ, "PYTHONUNBUFFERED": "1", "TEST_SHARD_ID": shard.shard_id}
+    )
+    shard.reader = threading.Thread(target=_stream_output, args=(shard,), daemon=True)
+    shard.reader.start()
+
+
+def grid_slots() -> Dict[str, int]:
+    """Total slots per browser from the grid, or the configured NODE_MAX_SESSION capacity if it is unreachable"""
+    capacity = query_grid_capacity()
+    if capacity is None:
+        print(f"Selenium Grid status unavailable, assuming {grid_worker_count()} slots per browser")
+        return {browser: grid_worker_count() for browser in BROWSERS}
+    return {browser: capacity[browser].total if browser in capacity else 0 for browser in BROWSERS}
+
+
+def free_slots(slots: Dict[str, int], running: List[Shard]) -> Dict[str, int]:
+    """Free slots per browser right now, never more than our share of the total"""
+    ours = {browser: sum(1 for shard in running if shard.browser == browser) for browser in slots}
+    capacity = query_grid_capacity()
+    return {
+        browser: min(capacity[browser].free if capacity and browser in capacity else total - ours[browser],
+                     total - ours[browser])
+        for browser, total in slots.items()
+    }
+
+
+def prepare_run():
+    """What conftest's sessionstart does for a single run, once for all shards"""
+    get_rate_limiter().reset_counters()
+    remove_shards()
+    remove_traces()
+    for path in REPORTS_DIR.glob("*_results_shard*.jsonl"):
+        path.unlink()
+
+
+def finish_run(shards: List[Shard]):
+    """
+    What conftest's sessionfinish does for a single run, once for all shards:
+    fold each browser's test durations (setup + call + teardown, from the shards'
+    result streams) into the duration history, then merge the UI documentation and WebDriver timelines
+    """
+    measured: Dict[str, Dict[str, float]] = {}
+    for shard in shards:
+        durations = measured.setdefault(shard.browser, {})
+        for result in read_results(str(shard.results_file)):
+            durations[result["nodeid"]] = durations.get(result["nodeid"], 0.0) + result["duration"]
+    for browser, durations in measured.items():
+        if durations:
+            DurationHistory(browser=browser).update(durations)
+
+    report_path = merge_shards(test_session_name="session_final")
+    if report_path:
+        print(f"UI Documentation Report generated: {report_path}")
+    timeline_path = merge_timelines()
+    if timeline_path:
+        print(f"WebDriver timeline (open in Perfetto): {timeline_path}")
+
+
+def print_metrics(shards: List[Shard]):
+    print("\nShard metrics (queue wait = waiting for a free grid slot):")
+    print(f"{'shard':<12}{'tests':>6}{'expected':>10}{'queued':>10}{'executed':>10}  result")
+    for shard in shards:
+        result = "passed" if shard.returncode == 0 else f"failed ({shard.returncode})"
+        print(f"{shard.label:<12}{len(shard.tests):>6}{shard.estimate:>9.1f}s{shard.queue_wait:>9.1f}s"
+              f"{shard.execution_time:>9.1f}s  {result}")
+
+    for browser in sorted({shard.browser for shard in shards}):
+        own = [shard for shard in shards if shard.browser == browser]
+        print(f"{browser}: queued {sum(s.queue_wait for s in own):.1f}s in total, "
+              f"executed {sum(s.execution_time for s in own):.1f}s in total")
+
+    metrics_path = REPORTS_DIR / "shard_metrics.json"
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        json.dump([{
+            "shard": shard.label, "browser": shard.browser, "tests": shard.tests,
+            "expected_seconds": shard.estimate, "queue_wait_seconds": shard.queue_wait,
+            "execution_seconds": shard.execution_time, "returncode": shard.returncode,
+            "report": str(REPORTS_DIR / shard.report_file)
+        } for shard in shards], f, indent=2)
+    print(f"Shard metrics saved to {metrics_path}")
+
 
 def main():
     # Create reports directory if it doesn't exist
-    reports_dir = Path("tests/cross_browser/reports")
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Define test configurations
-    browsers = [
-        ("chrome", "chrome_report.html"),
-        ("firefox", "firefox_report.html"), 
-        ("edge", "edge_report.html")
-    ]
-    
-    # Create threads for parallel execution
-    threads = []
-    results = {}
-    
-    for browser_name, report_file in browsers:
-        thread = threading.Thread(
-            target=lambda b=browser_name, r=report_file: results.update({b: run_browser_tests(b, r)})
-        )
-        threads.append(thread)
-        thread.start()
-    
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
-    
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    tests = collect_tests(TEST_TARGET)
+    if not tests:
+        print(f"No tests collected from {TEST_TARGET}")
+        return 1
+
+    slots = grid_slots()
+    shards: List[Shard] = []
+    for browser in BROWSERS:
+        if not slots[browser]:
+            print(f"No {browser} node on the grid, skipping {browser}")
+            continue
+        shards.extend(plan_shards(browser, tests, slots[browser]))
+    if not shards:
+        return 1
+    prepare_run()
+
+    # Longest shards first so the slowest work starts as soon as possible
+    queue = sorted(shards, key=lambda shard: -shard.estimate)
+    running: List[Shard] = []
+    while queue or running:
+        for shard in list(running):
+            if shard.process.poll() is not None:
+                shard.finished_at = time.monotonic()
+                shard.reader.join()
+                shard.returncode = shard.process.returncode
+                running.remove(shard)
+                print(f"{shard.label} finished in {shard.execution_time:.1f}s "
+                      f"({'passed' if shard.returncode == 0 else 'failed'})")
+
+        if queue:
+            free = free_slots(slots, running)
+            for shard in list(queue):
+                if free[shard.browser] > 0:
+                    free[shard.browser] -= 1
+                    queue.remove(shard)
+                    start_shard(shard)
+                    running.append(shard)
+
+        if queue or running:
+            time.sleep(POLL_INTERVAL)
+
     print("\nAll parallel cross-browser tests completed!")
     print("Reports are available in the reports folder:")
-    print("- chrome_report.html")
-    print("- firefox_report.html") 
-    print("- edge_report.html")
-    
+    for shard in shards:
+        print(f"- {shard.report_file}")
+    print_metrics(shards)
+    finish_run(shards)
+
     # Return appropriate exit code
-    return_codes = list(results.values())
-    return max(return_codes) if return_codes else 0
+    return max(shard.returncode for shard in shards)
 
 if __name__ == "__main__":
     exit_code = main()
-    sys.exit(exit_code)
\ No newline at end of file
+    sys.exit(exit_code)
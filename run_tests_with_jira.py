@@ -1,5 +1,7 @@
 """
-Script to run tests and automatically create Jira tickets for failures
+Script to run tests and automatically create Jira tickets for failures.
+Failures are read from the --result-stream JSONL file while pytest is still
+running, so tickets are filed as tests fail instead of after the whole suite.
 """
 import subprocess
 import sys
@@ -7,63 +9,70 @@ import os
 from pathlib import Path
 import argparse
 
+RESULTS_PATH = "reports/results.jsonl"
+
+
 def run_tests_and_create_jira_tickets():
-    """Run pytest and automatically create Jira tickets for failures"""
-    
+    """Run pytest and create Jira tickets for failures as they are reported"""
+
     parser = argparse.ArgumentParser(description="Run tests and create Jira tickets for failures.")
     parser.add_argument("test_path", nargs='?', default="tests/", help="Path to the test file or directory to run.")
+    parser.add_argument("--refresh-jira-fields", action="store_true", help="Rediscover Jira custom field ids instead of using the cached ones.")
     args = parser.parse_args()
 
     print(f"Running tests in: {args.test_path}")
-    
-    # Run pytest with HTML report
-    result = subprocess.run([
+
+    # A stale stream from the previous run must not be ingested again
+    Path(RESULTS_PATH).unlink(missing_ok=True)
+
+    jira_configured = all(os.getenv(name) for name in ("JIRA_URL", "JIRA_USERNAME", "JIRA_API_TOKEN", "JIRA_PROJECT_KEY"))
+
+    # Run pytest with HTML report and the JSONL result stream. Failures are reported
+    # from the stream below, so the jira_reporter fixture must not report them again.
+    env = {**os.environ, "JIRA_REPORTER_DISABLED": "true"} if jira_configured else None
+    process = subprocess.Popen([
         sys.executable, "-m", "pytest", args.test_path,
-        "--html=reports/report.html", 
+        "--html=reports/report.html",
         "--self-contained-html",
+        f"--result-stream={RESULTS_PATH}",
         "-v"
-    ], capture_output=True, text=True)
-    
-    print("Test execution completed.")
-    print(f"Return code: {result.returncode}")
-    
-    # Check if there are any failures before proceeding
-    if "failed" in result.stdout or result.returncode != 0:
-        print("Test failures detected. Creating Jira tickets...")
-        
+    ], env=env)
+
+    if not jira_configured:
+        print("Jira configuration not found. Please set environment variables.")
+        print("Set: JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_PROJECT_KEY")
+    else:
         # Import and run the Jira automation
         try:
             from jira_automation_enhanced import JiraTicketCreator
-            import os
-            
-            # Get Jira configuration
-            jira_url = os.getenv("JIRA_URL")
-            jira_username = os.getenv("JIRA_USERNAME") 
-            jira_api_token = os.getenv("JIRA_API_TOKEN")
-            jira_project_key = os.getenv("JIRA_PROJECT_KEY")
-            
-            if not all([jira_url, jira_username, jira_api_token, jira_project_key]):
-                print("Jira configuration not found. Please set environment variables.")
-                print("Set: JIRA_URL, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_PROJECT_KEY")
-                return
-            
-            # Initialize Jira ticket creator
-            jira_creator = JiraTicketCreator(jira_url, jira_username, jira_api_token, jira_project_key)
-            
-            # Create tickets for failures
-            report_path = "reports/report.html"
-            if os.path.exists(report_path):
-                created_tickets = jira_creator.create_tickets_for_failures(report_path)
-                print(f"Created {len(created_tickets)} Jira tickets for test failures")
+            from utils.jira_dispatch import JiraDispatcher
+            from utils.result_stream import follow_results
+            if args.refresh_jira_fields:
+                from utils.jira_field_cache import JiraFieldCache
+                JiraFieldCache().invalidate()
+
+            # Connects to Jira on the first failure only
+            dispatcher = JiraDispatcher(JiraTicketCreator.from_env)
+            try:
+                tickets = dispatcher.dispatch_results(follow_results(RESULTS_PATH, process=process))
+            finally:
+                dispatcher.close()
+            created = sum(1 for ticket in tickets if ticket['action'] == 'created')
+            if tickets or dispatcher.stats['failed']:
+                print(f"Created {created} Jira tickets for test failures, "
+                      f"commented on {len(tickets) - created} existing tickets")
             else:
-                print(f"Report not found at {report_path}")
-                
+                print("No test failures detected. No Jira tickets created.")
+
         except ImportError as e:
             print(f"Error importing Jira automation: {e}")
         except Exception as e:
             print(f"Error creating Jira tickets: {e}")
-    else:
-        print("No test failures detected. No Jira tickets created.")
+
+    returncode = process.wait()
+    print("Test execution completed.")
+    print(f"Return code: {returncode}")
+    return returncode
 
 if __name__ == "__main__":
-    run_tests_and_create_jira_tickets()
\ No newline at end of file
+    sys.exit(run_tests_and_create_jira_tickets())
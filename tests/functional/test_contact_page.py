@@ -7,6 +7,7 @@ from config import Config
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_contact_page_load_success(auto_setup_monitoring, browser):
     """Test that Contact page loads successfully with robust monitoring."""
@@ -65,6 +66,7 @@ def test_contact_form_fields_interactions(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_navigate_to_contact_from_home(auto_setup_monitoring, browser):
     """Test navigation from home page to Contact with monitoring."""
@@ -138,6 +140,7 @@ def test_contact_form_submission_robust(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_contact_page_elements_verification(auto_setup_monitoring, browser):
     """Comprehensive verification of contact page elements."""
@@ -7,6 +7,7 @@ from config import Config
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_faq_page_load_success(auto_setup_monitoring, browser):
     """Test that FAQ page loads successfully with robust monitoring."""
@@ -58,6 +59,7 @@ def test_faq_search_functionality(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_faq_questions_and_answers_retrieval(auto_setup_monitoring, browser):
     """Test retrieving FAQ questions and answers with error handling."""
@@ -102,6 +104,7 @@ def test_faq_questions_and_answers_retrieval(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_navigate_to_faq_from_home(auto_setup_monitoring, browser):
     """Test navigation from home page to FAQ with monitoring."""
@@ -131,6 +134,7 @@ def test_navigate_to_faq_from_home(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_faq_page_elements_verification(auto_setup_monitoring, browser):
     """Comprehensive verification of FAQ page elements."""
@@ -0,0 +1,33 @@
+"""
+Loading indicator checks of BasePage, on inline pages so they do not depend on the portal
+"""
+import pytest
+from pages.base_page import BasePage
+
+SPINNER_PAGE = "data:text/html,<html><body><div class='spinner'>Chargement...</div></body></html>"
+TRANSIENT_SPINNER_PAGE = (
+    "data:text/html,<html><body><div class='spinner' id='s'>Chargement...</div>"
+    "<script>setTimeout(function () { document.getElementById('s').remove(); }, 500);</script>"
+    "</body></html>"
+)
+
+
+@pytest.mark.functional
+@pytest.mark.usefixtures("jira_reporter")
+def test_visible_loading_indicator_is_not_reported_as_gone(browser):
+    browser.get(SPINNER_PAGE)
+
+    all_disappeared, results = BasePage(browser).wait_for_loading_indicators_to_disappear()
+
+    assert not all_disappeared, f"Spinner is still on the page but was reported gone: {results}"
+    assert results["('css selector', '.spinner')"]["visible_at_end"]
+
+
+@pytest.mark.functional
+@pytest.mark.usefixtures("jira_reporter")
+def test_removed_loading_indicator_is_reported_as_gone(browser):
+    browser.get(TRANSIENT_SPINNER_PAGE)
+
+    all_disappeared, results = BasePage(browser).wait_for_loading_indicators_to_disappear()
+
+    assert all_disappeared, f"Spinner was removed but is reported as visible: {results}"
@@ -9,6 +9,7 @@ from config import Config
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_about_page_load(auto_setup_monitoring, browser):
     """Test that the About page loads successfully."""
@@ -36,6 +37,7 @@ def test_about_page_load(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_terms_page_load(auto_setup_monitoring, browser):
     """Test that the Terms of Use page loads successfully."""
@@ -66,6 +68,7 @@ def test_terms_page_load(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_licenses_page_load(auto_setup_monitoring, browser):
     """Test that the Licenses page loads successfully."""
@@ -96,6 +99,7 @@ def test_licenses_page_load(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_useful_links_page_load(auto_setup_monitoring, browser):
     """Test that the Useful Links page loads successfully."""
@@ -126,6 +130,7 @@ def test_useful_links_page_load(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_data_requests_page_load(auto_setup_monitoring, browser):
     """Test that the Data Requests page loads successfully."""
@@ -156,6 +161,7 @@ def test_data_requests_page_load(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_static_pages_content_verification(auto_setup_monitoring, browser):
     """Verify that static pages have expected content structure."""
@@ -192,6 +198,7 @@ def test_static_pages_content_verification(auto_setup_monitoring, browser):
 
 
 @pytest.mark.functional
+@pytest.mark.browserless
 @pytest.mark.usefixtures("jira_reporter")
 def test_multiple_static_pages_load(auto_setup_monitoring, browser):
     """Test loading multiple static pages in sequence."""
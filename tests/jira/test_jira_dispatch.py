@@ -0,0 +1,115 @@
+import pytest
+
+from config import Config
+from jira_automation_enhanced import JiraTicketCreator
+from utils.jira_dispatch import JiraDispatcher, FingerprintIndex, failure_fingerprint
+from utils.jira_stub_server import JiraStubServer
+
+OUTAGE = """
+    def test_search(browser):
+>       search.search("budget")
+E       selenium.common.exceptions.TimeoutException: Message: timed out after 15.2s waiting for 0x7f3a2c
+tests/functional/test_search_basic.py:18: TimeoutException
+"""
+
+MISSING_TITLE = """
+    def test_dataset_title(browser):
+>       assert dataset.get_title()
+E       AssertionError: Dataset title is empty
+tests/functional/test_dataset_details.py:30: AssertionError
+"""
+
+
+def _failure(test_name, error):
+    return {'test_name': test_name, 'error': error, 'timestamp': "2026-01-01T00:00:00"}
+
+
+@pytest.fixture
+def jira_stub():
+    server = JiraStubServer(project_key="QA").start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def jira_dispatcher(jira_stub, tmp_path, monkeypatch):
+    """Dispatcher filing tickets on the stand-in server, with its own fingerprint index and field cache"""
+    monkeypatch.setattr(Config, "JIRA_FIELD_CACHE", str(tmp_path / "field_cache.json"))
+    dispatcher = JiraDispatcher(
+        lambda: JiraTicketCreator(jira_stub.url, "qa-bot", "token", "QA"),
+        index=FingerprintIndex(str(tmp_path / "fingerprints.json")),
+        deduplicate=True
+    )
+    yield dispatcher
+    dispatcher.close()
+
+
+@pytest.mark.jira
+def test_duplicate_failures_share_one_issue(jira_stub, jira_dispatcher):
+    """Failures with the same normalized traceback open one issue; later occurrences are comments"""
+    failures = [_failure(f"tests/functional/test_search_basic.py::test_search[{i}]",
+                         OUTAGE.replace("15.2s", f"{15 + i}.{i}s").replace("0x7f3a2c", hex(0x7f3a00 + i)))
+                for i in range(5)]
+    failures.append(_failure("tests/functional/test_dataset_details.py::test_dataset_title", MISSING_TITLE))
+
+    tickets = jira_dispatcher.dispatch_all(failures)
+
+    assert len(tickets) == 6
+    assert len(jira_stub.issues) == 2
+    assert sorted(len(issue["comments"]) for issue in jira_stub.issues.values()) == [0, 4]
+    assert jira_dispatcher.stats == {"created": 2, "commented": 4, "failed": 0}
+
+
+@pytest.mark.jira
+def test_known_failure_in_a_later_run_is_a_comment(jira_stub, jira_dispatcher):
+    """The fingerprint index outlives the dispatcher, so the next run comments instead of filing again"""
+    jira_dispatcher.dispatch_all([_failure("tests/functional/test_search_basic.py::test_search", OUTAGE)])
+    next_run = JiraDispatcher(jira_dispatcher.creator_factory, index=jira_dispatcher.index, deduplicate=True)
+    try:
+        tickets = next_run.dispatch_all([_failure("tests/functional/test_search_basic.py::test_search", OUTAGE)])
+    finally:
+        next_run.close()
+
+    assert [ticket['action'] for ticket in tickets] == ["commented"]
+    assert len(jira_stub.issues) == 1
+    assert jira_dispatcher.index.lookup(failure_fingerprint(OUTAGE))["occurrences"] == 2
+
+
+@pytest.mark.jira
+def test_recurring_failure_of_a_closed_issue_opens_a_new_one(jira_stub, jira_dispatcher):
+    [first] = jira_dispatcher.dispatch_all([_failure("tests/functional/test_search_basic.py::test_search", OUTAGE)])
+    jira_stub.set_status(first['jira_key'], "Closed")
+
+    [second] = jira_dispatcher.dispatch_all([_failure("tests/functional/test_search_basic.py::test_search", OUTAGE)])
+
+    assert second['action'] == "created"
+    assert second['jira_key'] != first['jira_key']
+    assert len(jira_stub.issues) == 2
+    assert all(not issue["comments"] for issue in jira_stub.issues.values())
+
+
+@pytest.mark.jira
+def test_stale_custom_field_ids_are_rediscovered(jira_stub, jira_dispatcher):
+    """A ticket rejected for an unknown custom field is retried once with freshly discovered ids"""
+    creator = jira_dispatcher.creator
+    creator.custom_fields = {"severity": "customfield_99999", "custom_priority": "customfield_10038"}
+
+    [ticket] = jira_dispatcher.dispatch_all([_failure("tests/functional/test_search_basic.py::test_search", OUTAGE)])
+
+    assert ticket['action'] == "created"
+    assert creator.custom_fields["severity"] == "customfield_10037"
+    assert jira_stub.count("POST", r"/issue$") == 2
+    assert "customfield_10037" in jira_stub.issues[ticket['jira_key']]["fields"]
+
+
+@pytest.mark.jira
+def test_custom_field_overrides_survive_rediscovery(jira_dispatcher, monkeypatch):
+    """JIRA_CUSTOM_FIELD_* overrides still apply after the field ids are rediscovered"""
+    monkeypatch.setenv("JIRA_CUSTOM_FIELD_SEVERITY", "customfield_20001")
+    creator = jira_dispatcher.creator
+    creator.apply_custom_field_overrides()
+
+    creator.refresh_custom_fields()
+
+    assert creator.custom_fields["severity"] == "customfield_20001"
+    assert creator.custom_fields["custom_priority"] == "customfield_10038"
@@ -2,10 +2,13 @@ import pytest
 from pages.home_page import HomePage
 from pages.search_page import SearchPage
 
+# Limit these tests enforced before the baseline store; still applied while it fills up
+PAGINATION_FALLBACK_THRESHOLD = 15.0
+
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_pagination_performance(browser, base_url):
+def test_search_pagination_performance(browser, base_url, performance_baseline):
     """Test the performance of search result pagination"""
     # Initialize page objects
     home_page = HomePage(browser, base_url)
@@ -27,20 +30,21 @@ def test_search_pagination_performance(browser, base_url):
     if pagination_success:
         page_load_time = time.time() - start_time
         print(f"Pagination completed in {page_load_time:.2f} seconds")
+        performance_baseline.record(page_load_time, query="data")
         
         # Verify results are still present after pagination
         results_after_pagination = search_page.get_results_titles()
         assert len(results_after_pagination) > 0, "Results should persist after pagination"
         
-        # Performance requirement: pagination should complete within 5 seconds
-        assert page_load_time <= 15.0, f"Pagination took {page_load_time:.2f}s, which exceeds 15s limit"
+        # Performance requirement: pagination should not regress against earlier runs
+        performance_baseline.assert_no_regression(fallback_threshold=PAGINATION_FALLBACK_THRESHOLD)
     else:
         print("Pagination test skipped - no next page available")
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_multiple_searches_performance(browser, base_url):
+def test_multiple_searches_performance(browser, base_url, performance_baseline):
     """Test performance when executing multiple searches in sequence"""
     # Initialize page objects
     home_page = HomePage(browser, base_url)
@@ -64,6 +68,7 @@ def test_multiple_searches_performance(browser, base_url):
         
         search_duration = time.time() - start_time
         total_search_time += search_duration
+        performance_baseline.record(search_duration, query=term)
         
         if len(results) >= 0:  # Count as successful if no error occurred
             successful_searches += 1
@@ -72,7 +77,7 @@ def test_multiple_searches_performance(browser, base_url):
     
     avg_search_time = total_search_time / len(search_terms)
     
-    # Performance requirement: average search should complete within 5 seconds
-    assert avg_search_time <= 15.0, f"Average search time {avg_search_time:.2f}s exceeds 15s limit"
+    # Performance requirement: no search should regress against earlier runs
+    performance_baseline.assert_no_regression(fallback_threshold=PAGINATION_FALLBACK_THRESHOLD)
     
     print(f"Multiple searches completed. Average time: {avg_search_time:.2f}s, Success rate: {successful_searches}/{len(search_terms)}")
\ No newline at end of file
@@ -3,14 +3,28 @@ import time
 import statistics
 from pages.home_page import HomePage
 from pages.search_page import SearchPage
-from config import Config
+
+
+def _browser_response_time(page, wall_clock_time: float):
+    """
+    Seconds until the results page fired its load event, as measured by the browser,
+    and the baseline metric they belong to. Falls back to the wall-clock measurement
+    when the browser exposes no timings for the results page (capture failed or
+    disabled, or they belong to another document); that is recorded as its own metric
+    so the two kinds of samples never share a baseline.
+    """
+    metrics = page.navigation_metrics
+    if metrics and metrics.load is not None and metrics.url == page.driver.current_url:
+        print(f"Browser metrics: {metrics.summary()}")
+        return metrics.load / 1000, "response_time"
+    return wall_clock_time, "wall_clock"
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_response_time_under_threshold(browser):
+def test_search_response_time_under_threshold(browser, performance_baseline):
     """
-    Test that search returns results within a time threshold.
+    Test that search response time has not regressed against the recorded baseline.
     """
     home_page = HomePage(browser)
     search_page = SearchPage(browser)
@@ -21,22 +35,18 @@ def test_search_response_time_under_threshold(browser):
     search_page.search("education")
     end_time = time.time()
 
-    response_time = end_time - start_time
-
-    # Use a specific performance threshold
-    threshold = getattr(Config, 'PERFORMANCE_THRESHOLD', 5.0)  # Default to 5 seconds
+    response_time, metric = _browser_response_time(search_page, end_time - start_time)
+    performance_baseline.record(response_time, query="education", metric=metric)
 
     print(f"Search completed in {response_time:.2f} seconds.")
 
-    assert response_time <= threshold, (
-        f"Search took {response_time:.2f}s, exceeding limit of {threshold}s"
-    )
+    performance_baseline.assert_no_regression()
     assert len(search_page.get_results_titles()) > 0, "Search performance test failed to return results."
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_performance_multiple_queries(browser):
+def test_search_performance_multiple_queries(browser, performance_baseline):
     """
     Test search performance across multiple different queries.
     """
@@ -62,8 +72,9 @@ def test_search_performance_multiple_queries(browser):
         search_page.search(query)
         end_time = time.time()
 
-        response_time = end_time - start_time
+        response_time, metric = _browser_response_time(search_page, end_time - start_time)
         response_times.append(response_time)
+        performance_baseline.record(response_time, query=query, metric=metric)
 
         # Verify results exist
         results = search_page.get_results_titles()
@@ -78,23 +89,14 @@ def test_search_performance_multiple_queries(browser):
     max_response_time = max(response_times)
     min_response_time = min(response_times)
 
-    # Set performance thresholds
-    avg_threshold = getattr(Config, 'PERFORMANCE_THRESHOLD', 5.0)
-    max_threshold = avg_threshold * 2  # Max response time can be higher
-
     print(f"Performance Metrics:")
     print(f"  Average: {avg_response_time:.2f}s")
     print(f"  Median: {median_response_time:.2f}s")
     print(f"  Max: {max_response_time:.2f}s")
     print(f"  Min: {min_response_time:.2f}s")
 
-    # Verify performance metrics
-    assert avg_response_time <= avg_threshold, (
-        f"Average search time {avg_response_time:.2f}s exceeds threshold of {avg_threshold}s"
-    )
-    assert max_response_time <= max_threshold, (
-        f"Max search time {max_response_time:.2f}s exceeds threshold of {max_threshold}s"
-    )
+    # Verify performance against the baseline of earlier runs
+    performance_baseline.assert_no_regression()
     assert successful_searches == len(test_queries), (
         f"Only {successful_searches}/{len(test_queries)} searches returned results"
     )
@@ -102,7 +104,7 @@ def test_search_performance_multiple_queries(browser):
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_performance_no_results(browser):
+def test_search_performance_no_results(browser, performance_baseline):
     """
     Test performance when search returns no results (edge case).
     """
@@ -118,25 +120,21 @@ def test_search_performance_no_results(browser):
     search_page.search(rare_query)
     end_time = time.time()
 
-    response_time = end_time - start_time
-
-    # Time threshold for no results search
-    threshold = getattr(Config, 'PERFORMANCE_THRESHOLD', 5.0)
+    response_time, metric = _browser_response_time(search_page, end_time - start_time)
+    performance_baseline.record(response_time, query=rare_query, metric=metric)
 
     print(f"No-results search completed in {response_time:.2f} seconds.")
 
     # Verify no results message appears
     assert search_page.has_no_results_message(), "No results message should appear for rare query"
 
-    # Response time should still be within threshold
-    assert response_time <= threshold, (
-        f"No-results search took {response_time:.2f}s, exceeding limit of {threshold}s"
-    )
+    # Response time should not regress against earlier runs
+    performance_baseline.assert_no_regression()
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_performance_different_result_counts(browser):
+def test_search_performance_different_result_counts(browser, performance_baseline):
     """
     Test performance with queries that return different numbers of results.
     """
@@ -162,6 +160,7 @@ def test_search_performance_different_result_counts(browser):
 
         response_time = end_time - start_time
         result_count = len(search_page.get_results_titles())
+        performance_baseline.record(response_time, query=query)
 
         performance_results[query] = {
             'response_time': response_time,
@@ -171,18 +170,13 @@ def test_search_performance_different_result_counts(browser):
 
         print(f"Query '{query}': {response_time:.2f}s for {result_count} results")
 
-    # Verify that all searches completed within reasonable time
-    for query, data in performance_results.items():
-        threshold = getattr(Config, 'PERFORMANCE_THRESHOLD', 5.0)
-        assert data['response_time'] <= threshold, (
-            f"Search for '{query}' took {data['response_time']:.2f}s, "
-            f"exceeding threshold of {threshold}s"
-        )
+    # Verify that no query regressed against its baseline
+    performance_baseline.assert_no_regression()
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_consecutive_search_performance(browser):
+def test_consecutive_search_performance(browser, performance_baseline):
     """
     Test performance when performing multiple searches in sequence.
     This tests for potential memory leaks or performance degradation.
@@ -214,6 +208,7 @@ def test_consecutive_search_performance(browser):
 
         response_time = end_time - start_time
         response_times.append(response_time)
+        performance_baseline.record(response_time, query=query)
 
         print(f"Consecutive search {i+1} ('{query}'): {response_time:.2f}s")
 
@@ -229,10 +224,5 @@ def test_consecutive_search_performance(browser):
             f"Large performance difference detected between consecutive searches: {max_difference:.2f}s"
         )
 
-    # Verify all searches completed within threshold
-    threshold = getattr(Config, 'PERFORMANCE_THRESHOLD', 5.0)
-    for i, response_time in enumerate(response_times):
-        assert response_time <= threshold, (
-            f"Consecutive search {i+1} took {response_time:.2f}s, "
-            f"exceeding threshold of {threshold}s"
-        )
\ No newline at end of file
+    # Verify no search regressed against its baseline
+    performance_baseline.assert_no_regression()
\ No newline at end of file
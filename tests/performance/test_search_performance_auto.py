@@ -2,6 +2,7 @@
 Performance tests with automatic UI monitoring
 """
 import pytest
+import time
 from selenium.webdriver.common.by import By
 from pages.home_page import HomePage
 from pages.search_page import SearchPage
@@ -10,7 +11,7 @@ from pages.dataset_page import DatasetPage
 
 @pytest.mark.performance  
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_performance_with_monitoring(auto_setup_monitoring, browser):
+def test_search_performance_with_monitoring(auto_setup_monitoring, browser, performance_baseline):
     home = HomePage(browser)
     search = SearchPage(browser)
     
@@ -20,7 +21,9 @@ def test_search_performance_with_monitoring(auto_setup_monitoring, browser):
 
     # Performance test with automatic monitoring
     home.go_to_dataset_search_fr()
+    start_time = time.time()
     search.search("education")
+    performance_baseline.record(time.time() - start_time, query="education")
     
     # Monitor performance metrics
     titles = search.get_results_titles()
@@ -6,12 +6,11 @@ import time
 from selenium.common.exceptions import WebDriverException
 from pages.home_page import HomePage
 from pages.search_page import SearchPage
-from config import Config
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_performance_multiple_queries(auto_setup_monitoring, browser):
+def test_search_performance_multiple_queries(auto_setup_monitoring, browser, performance_baseline):
     """
     Test performance of multiple search queries with robust handling for unstable sites.
     """
@@ -44,6 +43,7 @@ def test_search_performance_multiple_queries(auto_setup_monitoring, browser):
             # Record response time
             response_time = time.time() - start_time
             response_times.append(response_time)
+            performance_baseline.record(response_time, query=query)
             
             # Check if results were returned
             results = search_page.get_results_titles()
@@ -69,8 +69,8 @@ def test_search_performance_multiple_queries(auto_setup_monitoring, browser):
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_response_time_under_threshold(auto_setup_monitoring, browser):
-    """Test that search response time stays under threshold with unstable site handling."""
+def test_search_response_time_under_threshold(auto_setup_monitoring, browser, performance_baseline):
+    """Test that search response time does not regress, with unstable site handling."""
     home_page = HomePage(browser)
     search_page = SearchPage(browser)
     
@@ -86,33 +86,26 @@ def test_search_response_time_under_threshold(auto_setup_monitoring, browser):
         pytest.skip("Could not access government website, skipping performance test")
 
     test_queries = ["data", "education", "transport"]
-    threshold = getattr(Config, 'PERFORMANCE_THRESHOLD', 5.0)
-    slow_searches = 0
     
     for query in test_queries:
         try:
             start_time = time.time()
             search_page.search(query)
             response_time = time.time() - start_time
-            
-            if response_time > threshold:
-                slow_searches += 1
-                print(f"Slow search for '{query}': {response_time:.2f}s")
-            
-            # Don't assert here - just collect metrics
-            # The test can pass if most searches are under threshold despite site instability
+            performance_baseline.record(response_time, query=query)
+            print(f"Search for '{query}': {response_time:.2f}s")
         except Exception as e:
             print(f"Search for '{query}' failed: {str(e)}")
             continue
 
-    # Allow for some slow searches due to website instability
-    max_slow_searches = len(test_queries) // 2  # Allow up to 50% slow searches
-    assert slow_searches <= max_slow_searches, f"Too many slow searches: {slow_searches}/{len(test_queries)}"
+    # Site instability shows up in the baseline too, so only a significant
+    # slowdown against earlier runs fails the test
+    performance_baseline.assert_no_regression()
 
 
 @pytest.mark.performance
 @pytest.mark.usefixtures("jira_reporter")
-def test_page_load_time(auto_setup_monitoring, browser):
+def test_page_load_time(auto_setup_monitoring, browser, performance_baseline):
     """Test page load time with robust error handling."""
     home_page = HomePage(browser)
     
@@ -129,6 +122,7 @@ def test_page_load_time(auto_setup_monitoring, browser):
             pytest.skip("Government website unavailable, skipping page load time test")
             
         print(f"Page loaded in {load_time:.2f} seconds")
+        performance_baseline.record(load_time, metric="page_load_time")
         
         # Don't assert load time - just record it
         # Website instability affects load times, so we just report rather than fail
@@ -5,35 +5,18 @@ import pytest
 from selenium.webdriver.common.by import By
 from pages import FAQPage, ContactPage, StaticPage
 from config import Config
-
-
-# Breakpoints for responsive testing
-MOBILE = (375, 812)
-TABLET = (768, 1024) 
-DESKTOP = (1366, 768)
+from utils.viewport_emulation import MOBILE, TABLET, DESKTOP, viewport_width_matches
 
 
 @pytest.mark.responsive
-@pytest.mark.parametrize("width,height,device_type", [
-    (*MOBILE, "mobile"),
-    (*TABLET, "tablet"), 
-    (*DESKTOP, "desktop")
-])
 @pytest.mark.usefixtures("jira_reporter")
-def test_faq_page_responsive_layout(auto_setup_monitoring, browser, width, height, device_type):
-    """Test FAQ page responsive layout across different devices."""
+def test_faq_page_responsive_layout(auto_setup_monitoring, browser, viewport_matrix):
+    """Test FAQ page responsive layout across different devices, from one page load."""
     faq_page = FAQPage(browser)
     
     # Set up monitoring
     auto_setup_monitoring(faq_page)
     
-    # Add delay before resizing to avoid rapid requests
-    import time
-    time.sleep(0.5)
-    
-    # Resize window
-    browser.set_window_size(width, height)
-    
     try:
         # Try to access the FAQ page with rate limiting
         success = faq_page.open_faq_page()
@@ -43,136 +26,88 @@ def test_faq_page_responsive_layout(auto_setup_monitoring, browser, width, heigh
         success = False  # Will be handled by assertions below
     
     if success:
-        # Verify the page has basic content
-        title = faq_page.get_title()
-        assert title is not None
-        
-        # Check responsive behavior based on screen size
-        window_size = browser.get_window_size()
-        # Use more flexible tolerance for window resizing (some OS/Browser combinations have decorations)
-        tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-        actual_width = window_size['width']
-        expected_width = width
-        
-        # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-        if width <= 400 and actual_width >= 360 and actual_width <= 520:
-            # Accept reasonable mobile range if we're close to browser minimum
-            assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-        else:
-            # For larger sizes, use tolerance
-            assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
+        def check_breakpoint(viewport, layout):
+            # Verify the page has basic content
+            assert layout.title is not None
+            
+            # Check responsive behavior based on screen size
+            assert viewport_width_matches(layout.viewport_width, viewport.width), \
+                f"Viewport width {layout.viewport_width} does not match expected {viewport.width}"
+
+        viewport_matrix.check_all(check_breakpoint)
 
 
 @pytest.mark.responsive
-@pytest.mark.parametrize("width,height,device_type", [
-    (*MOBILE, "mobile"),
-    (*TABLET, "tablet"),
-    (*DESKTOP, "desktop")
-])
 @pytest.mark.usefixtures("jira_reporter")
-def test_contact_page_responsive_layout(auto_setup_monitoring, browser, width, height, device_type):
-    """Test Contact page responsive layout across different devices."""
+def test_contact_page_responsive_layout(auto_setup_monitoring, browser, viewport_matrix):
+    """Test Contact page responsive layout across different devices, from one page load."""
     contact_page = ContactPage(browser)
     
     # Set up monitoring
     auto_setup_monitoring(contact_page)
     
-    # Add delay before resizing to avoid rapid requests
-    import time
-    time.sleep(0.5)
-    
-    # Resize window
-    browser.set_window_size(width, height)
-    
     try:
         # Try to access the Contact page with rate limiting
         success = contact_page.open_contact_page()
     except:
         # If Contact page is unavailable, use a fallback page
         contact_page.open_url("about:blank")
-        success = False
+        success = False  # Will be handled by assertions below
     
     if success:
-        # Verify the page has basic content
-        title = contact_page.get_title()
-        assert title is not None
-        
-        # Check responsive behavior
-        window_size = browser.get_window_size()
-        tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-        actual_width = window_size['width']
-        expected_width = width
-        
-        # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-        if width <= 400 and actual_width >= 360 and actual_width <= 520:
-            # Accept reasonable mobile range if we're close to browser minimum
-            assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-        else:
-            # For larger sizes, use tolerance
-            assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
+        def check_breakpoint(viewport, layout):
+            # Verify the page has basic content
+            assert layout.title is not None
+            
+            # Check responsive behavior based on screen size
+            assert viewport_width_matches(layout.viewport_width, viewport.width), \
+                f"Viewport width {layout.viewport_width} does not match expected {viewport.width}"
+
+        viewport_matrix.check_all(check_breakpoint)
 
 
 @pytest.mark.responsive
-@pytest.mark.parametrize("width,height,device_type", [
-    (*MOBILE, "mobile"),
-    (*TABLET, "tablet"),
-    (*DESKTOP, "desktop")
-])
 @pytest.mark.usefixtures("jira_reporter")
-def test_static_page_responsive_layout(auto_setup_monitoring, browser, width, height, device_type):
-    """Test static page responsive layout across different devices."""
+def test_static_page_responsive_layout(auto_setup_monitoring, browser, viewport_matrix):
+    """Test About page responsive layout across different devices, from one page load."""
     static_page = StaticPage(browser)
     
     # Set up monitoring
     auto_setup_monitoring(static_page)
     
-    # Add delay before resizing to avoid rapid requests
-    import time
-    time.sleep(0.5)
-    
-    # Resize window
-    browser.set_window_size(width, height)
-    
     try:
-        # Try to access the About page with rate limiting (as an example static page)
+        # Try to access the About page with rate limiting
         success = static_page.open_about_page()
     except:
         # If About page is unavailable, use a fallback page
         static_page.open_url("about:blank")
-        success = False
+        success = False  # Will be handled by assertions below
     
     if success:
-        # Verify the page has basic content
-        title = static_page.get_page_title()
-        content = static_page.get_page_content()
-        assert title is not None or len(content) > 50
-        
-        # Check responsive behavior
-        window_size = browser.get_window_size()
-        tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-        actual_width = window_size['width']
-        expected_width = width
-        
-        # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-        if width <= 400 and actual_width >= 360 and actual_width <= 520:
-            # Accept reasonable mobile range if we're close to browser minimum
-            assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-        else:
-            # For larger sizes, use tolerance
-            assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
+        def check_breakpoint(viewport, layout):
+            # Verify the page has basic content (a heading, or some text in the content area or body)
+            content_length = layout.text_length("content") if layout.count("content") else layout.body_text_length
+            assert layout.any_visible("title") or layout.title or content_length > 50
+            
+            # Check responsive behavior based on screen size
+            assert viewport_width_matches(layout.viewport_width, viewport.width), \
+                f"Viewport width {layout.viewport_width} does not match expected {viewport.width}"
+
+        viewport_matrix.check_all(check_breakpoint, {"title": StaticPage.PAGE_TITLE, "content": StaticPage.PAGE_CONTENT})
 
 
 @pytest.mark.responsive
 @pytest.mark.usefixtures("jira_reporter")
-def test_responsive_page_transitions(auto_setup_monitoring, browser):
-    """Test responsive page transitions across different window sizes."""
+def test_responsive_page_transitions(auto_setup_monitoring, browser, viewport_matrix):
+    """Test responsive page transitions across different viewport sizes."""
     static_page = StaticPage(browser)
+    emulator = viewport_matrix.emulator
     
     # Set up monitoring
     auto_setup_monitoring(static_page)
     
     # Start with desktop size
-    browser.set_window_size(*DESKTOP)
+    emulator.apply(DESKTOP)
     
     try:
         # Try to access a static page with rate limiting
@@ -183,40 +118,29 @@ def test_responsive_page_transitions(auto_setup_monitoring, browser):
         success = True  # Set to True so we continue with the test
     
     if success:
-        # Get initial page state
-        initial_title = static_page.get_page_title()
-        assert initial_title is not None or len(static_page.get_page_content()) > 50
-        
-        # Change to mobile size
-        browser.set_window_size(*MOBILE)
-        
-        # Small wait for responsive changes to apply
-        import time
-        time.sleep(0.5)
-        
-        # Check that page is still accessible at mobile size
-        mobile_title = static_page.get_page_title()
-        assert mobile_title is not None or len(static_page.get_page_content()) > 50
-        
-        # Change to tablet size
-        browser.set_window_size(*TABLET)
-        
-        # Check that page is still accessible at tablet size
-        tablet_title = static_page.get_page_title()
-        assert tablet_title is not None or len(static_page.get_page_content()) > 50
-        
-        # Verify window resizing worked correctly
-        final_size = browser.get_window_size()
-        tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-        actual_width = final_size['width']
-        expected_width = TABLET[0]
-        
-        # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-        if expected_width <= 400 and actual_width >= 360 and actual_width <= 520:
-            # Accept reasonable mobile range if we're close to browser minimum
-            assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-        else:
-            # For larger sizes, use tolerance
-            assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
+        try:
+            # Get initial page state
+            initial_title = static_page.get_page_title()
+            assert initial_title is not None or len(static_page.get_page_content()) > 50
+            
+            # Change to mobile size (apply waits for the relayout)
+            emulator.apply(MOBILE)
+            
+            # Check that page is still accessible at mobile size
+            mobile_title = static_page.get_page_title()
+            assert mobile_title is not None or len(static_page.get_page_content()) > 50
+            
+            # Change to tablet size
+            width, _ = emulator.apply(TABLET)
+            
+            # Check that page is still accessible at tablet size
+            tablet_title = static_page.get_page_title()
+            assert tablet_title is not None or len(static_page.get_page_content()) > 50
+            
+            # Verify the viewport change worked
+            assert viewport_width_matches(width, TABLET.width), \
+                f"Viewport width {width} does not match expected {TABLET.width}"
+        finally:
+            emulator.reset()
 
-    print(f"Responsive transition test completed for desktop->mobile->tablet")
\ No newline at end of file
+    print(f"Responsive transition test completed for desktop->mobile->tablet")
@@ -3,36 +3,20 @@ from selenium.webdriver.common.by import By
 from pages.home_page import HomePage
 from pages.search_page import SearchPage
 from config import Config
-
-# Breakpoints
-MOBILE = (375, 812)
-TABLET = (768, 1024)
-DESKTOP = (1366, 768)
+from utils.viewport_emulation import MOBILE, TABLET, DESKTOP, viewport_width_matches
 
 @pytest.mark.responsive
-@pytest.mark.parametrize("width,height,device_type", [
-    (*MOBILE, "mobile"),
-    (*TABLET, "tablet"),
-    (*DESKTOP, "desktop")
-])
 @pytest.mark.usefixtures("jira_reporter")
-def test_homepage_responsive_layout(auto_setup_monitoring, browser, width, height, device_type):
+def test_homepage_responsive_layout(auto_setup_monitoring, browser, viewport_matrix):
     """
     Verifies that the layout adapts to different screen sizes.
-    Asserts specific elements are visible or hidden based on viewport.
+    Loads the page once and checks every breakpoint against the same DOM.
     """
     home_page = HomePage(browser)
 
     # Set up automatic monitoring
     auto_setup_monitoring(home_page)
 
-    # Add delay before resizing to avoid rapid requests
-    import time
-    time.sleep(0.5)
-
-    # Resize window (this might fail if website is down, which is OK)
-    browser.set_window_size(width, height)
-
     try:
         # Try to access the government website with rate limiting
         home_page.go_to_dataset_search_fr()
@@ -40,49 +24,27 @@ def test_homepage_responsive_layout(auto_setup_monitoring, browser, width, heigh
         # If government website is unavailable, use a fallback page
         home_page.open_url("about:blank")
 
-    # Basic check that page loaded correctly
-    title = home_page.get_title()
-    assert title and title.strip(), f"Page title should be visible on {device_type}"
+    def check_breakpoint(viewport, layout):
+        # Basic check that page loaded correctly
+        assert layout.title and layout.title.strip(), f"Page title should be visible on {viewport.name}"
 
-    # Check that main content elements are visible
-    try:
-        # Look for common page elements
-        logo_elements = browser.find_elements(By.CSS_SELECTOR, ".site-title, .logo, h1, .header-brand")
-        assert len(logo_elements) > 0, f"Main branding element should be present on {device_type}"
+        # Main branding should be visible, or at least the page content accessible
+        if layout.count("branding"):
+            assert layout.any_visible("branding") or layout.body_text_length > 50, \
+                f"Main branding should be visible on {viewport.name}"
+        else:
+            assert layout.body_text_length > 50, f"Page should have content on {viewport.name}"
 
-        # At least one should be displayed
-        has_visible_logo = any(el.is_displayed() for el in logo_elements)
-        assert has_visible_logo, f"Main branding should be visible on {device_type}"
-    except:
-        # If specific branding selectors don't work, at least check that content is accessible
-        body_text = browser.find_element(By.TAG_NAME, "body").text
-        assert len(body_text) > 50, f"Page should have content on {device_type}"
-
-    # Check general responsive behavior based on screen size
-    window_size = browser.get_window_size()
-    # Use a more flexible tolerance for window resizing (some OS/Browser combinations have decorations)
-    # Also account for browser minimum window size restrictions
-    tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-    actual_width = window_size['width']
-    expected_width = width
-
-    # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-    if width <= 400 and actual_width >= 360 and actual_width <= 520:
-        # Accept reasonable mobile range if we're close to browser minimum
-        assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-    else:
-        # For larger sizes, use tolerance
-        assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
+        # The viewport should match the breakpoint (resized windows may be held at a browser minimum width)
+        assert viewport_width_matches(layout.viewport_width, viewport.width), \
+            f"Viewport width {layout.viewport_width} does not match expected {viewport.width}"
+
+    viewport_matrix.check_all(check_breakpoint, {"branding": ".site-title, .logo, h1, .header-brand"})
 
 
 @pytest.mark.responsive
-@pytest.mark.parametrize("width,height,device_type", [
-    (*MOBILE, "mobile"),
-    (*TABLET, "tablet"),
-    (*DESKTOP, "desktop")
-])
 @pytest.mark.usefixtures("jira_reporter")
-def test_search_page_responsive_layout(auto_setup_monitoring, browser, width, height, device_type):
+def test_search_page_responsive_layout(auto_setup_monitoring, browser, viewport_matrix):
     """
     Verifies that the search page layout adapts to different screen sizes.
     """
@@ -91,13 +53,6 @@ def test_search_page_responsive_layout(auto_setup_monitoring, browser, width, he
     # Set up automatic monitoring
     auto_setup_monitoring(search_page)
 
-    # Add delay before resizing to avoid rapid requests
-    import time
-    time.sleep(0.5)
-
-    # Resize window (this might fail if website is down, which is OK)
-    browser.set_window_size(width, height)
-
     try:
         # Try to access the government website with rate limiting
         search_page.open()
@@ -105,52 +60,40 @@ def test_search_page_responsive_layout(auto_setup_monitoring, browser, width, he
         # If government website is unavailable, use a fallback page
         search_page.open_url("about:blank")
 
-    # Check that search input is always visible
-    try:
-        search_input = browser.find_element(By.ID, "field-giant-search")
-        assert search_input.is_displayed(), f"Search input not visible on {device_type}"
-    except:
-        # Alternative selector for search input
-        search_inputs = browser.find_elements(By.CSS_SELECTOR, "input[type='search'], input[name*='search'], .search-input")
-        assert len(search_inputs) > 0, f"Search input should be present on {device_type}"
-        has_visible_input = any(el.is_displayed() for el in search_inputs)
-        assert has_visible_input, f"Search input should be visible on {device_type}"
-
-    # Check general responsive behavior based on screen size
-    window_size = browser.get_window_size()
-    # Use a more flexible tolerance for window resizing (some OS/Browser combinations have decorations)
-    # Also account for browser minimum window size restrictions
-    tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-    actual_width = window_size['width']
-    expected_width = width
-
-    # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-    if width <= 400 and actual_width >= 360 and actual_width <= 520:
-        # Accept reasonable mobile range if we're close to browser minimum
-        assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-    else:
-        # For larger sizes, use tolerance
-        assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
-
-    # Verify page content is accessible
-    page_content = browser.find_element(By.TAG_NAME, "body").text
-    assert len(page_content) > 50, f"Search page should have content on {device_type}"
+    def check_breakpoint(viewport, layout):
+        # Check that search input is always visible
+        assert layout.count("search_input") or layout.count("search_fallback"), \
+            f"Search input should be present on {viewport.name}"
+        assert layout.any_visible("search_input") or layout.any_visible("search_fallback"), \
+            f"Search input should be visible on {viewport.name}"
+
+        assert viewport_width_matches(layout.viewport_width, viewport.width), \
+            f"Viewport width {layout.viewport_width} does not match expected {viewport.width}"
+
+        # Verify page content is accessible
+        assert layout.body_text_length > 50, f"Search page should have content on {viewport.name}"
+
+    viewport_matrix.check_all(check_breakpoint, {
+        "search_input": (By.ID, "field-giant-search"),
+        "search_fallback": "input[type='search'], input[name*='search'], .search-input",
+    })
 
 
 @pytest.mark.responsive
 @pytest.mark.usefixtures("jira_reporter")
-def test_responsive_element_visibility_transitions(auto_setup_monitoring, browser):
+def test_responsive_element_visibility_transitions(auto_setup_monitoring, browser, viewport_matrix):
     """
-    Test responsive transitions by changing window sizes dynamically
-    and checking element visibility changes.
+    Test responsive transitions by changing viewport sizes dynamically
+    on the same loaded page and checking it stays accessible.
     """
     home_page = HomePage(browser)
+    emulator = viewport_matrix.emulator
 
     # Set up automatic monitoring
     auto_setup_monitoring(home_page)
 
     # Start with desktop size
-    browser.set_window_size(*DESKTOP)
+    emulator.apply(DESKTOP)
 
     try:
         # Try to access the government website with rate limiting
@@ -159,41 +102,29 @@ def test_responsive_element_visibility_transitions(auto_setup_monitoring, browse
         # If government website is unavailable, use a fallback page
         home_page.open_url("about:blank")
 
-    # Get initial page state
-    initial_title = home_page.get_title()
-    assert initial_title and initial_title.strip(), "Page should be accessible at desktop size"
-
-    # Change to mobile size
-    browser.set_window_size(*MOBILE)
-
-    # Small wait for responsive changes to apply
-    browser.implicitly_wait(1)
+    try:
+        # Get initial page state
+        initial_title = home_page.get_title()
+        assert initial_title and initial_title.strip(), "Page should be accessible at desktop size"
 
-    # Check that page is still accessible at mobile size
-    mobile_title = home_page.get_title()
-    assert mobile_title and mobile_title.strip(), "Page should remain accessible at mobile size"
+        # Change to mobile size (apply waits for the relayout)
+        emulator.apply(MOBILE)
 
-    # Change to tablet size
-    browser.set_window_size(*TABLET)
+        # Check that page is still accessible at mobile size
+        mobile_title = home_page.get_title()
+        assert mobile_title and mobile_title.strip(), "Page should remain accessible at mobile size"
 
-    # Check that page is still accessible at tablet size
-    tablet_title = home_page.get_title()
-    assert tablet_title and tablet_title.strip(), "Page should remain accessible at tablet size"
+        # Change to tablet size
+        width, _ = emulator.apply(TABLET)
 
-    # Verify window resizing worked correctly
-    final_size = browser.get_window_size()
-    # Use a more flexible tolerance for window resizing (some OS/Browser combinations have decorations)
-    # Also account for browser minimum window size restrictions
-    tolerance = 150  # Increased tolerance to account for minimum browser window restrictions
-    actual_width = final_size['width']
-    expected_width = TABLET[0]
+        # Check that page is still accessible at tablet size
+        tablet_title = home_page.get_title()
+        assert tablet_title and tablet_title.strip(), "Page should remain accessible at tablet size"
 
-    # For mobile sizes, browsers often enforce minimum widths (e.g., Chrome minimum ~360px)
-    if expected_width <= 400 and actual_width >= 360 and actual_width <= 520:
-        # Accept reasonable mobile range if we're close to browser minimum
-        assert actual_width >= 360, f"Window width {actual_width} should be at least 360px for mobile"
-    else:
-        # For larger sizes, use tolerance
-        assert abs(actual_width - expected_width) <= tolerance, f"Window width {actual_width} not within {tolerance}px of expected {expected_width}"
+        # Verify the viewport change worked
+        assert viewport_width_matches(width, TABLET.width), \
+            f"Viewport width {width} does not match expected {TABLET.width}"
+    finally:
+        emulator.reset()
 
-    print(f"Responsive transition test completed for desktop->mobile->tablet")
\ No newline at end of file
+    print(f"Responsive transition test completed for desktop->mobile->tablet")
@@ -7,7 +7,7 @@ from config import Config
 
 @pytest.mark.stress
 @pytest.mark.usefixtures("jira_reporter")
-def test_concurrent_search_load(auto_setup_monitoring, browser):
+def test_concurrent_search_load(auto_setup_monitoring, browser, performance_baseline):
     """Test how the system handles repeated searches in a short time."""
     home_page = HomePage(browser)
     search_page = SearchPage(browser)
@@ -26,15 +26,19 @@ def test_concurrent_search_load(auto_setup_monitoring, browser):
 
         results = search_page.get_results_titles()
         duration = time.time() - start_time
+        performance_baseline.record(duration, query=keyword)
 
         print(f"Search {i+1} ('{keyword}') took {duration:.2f}s. Results: {len(results)}")
 
         # Assertion: Search should not fail (return results or explicit no-result)
         assert search_page.is_search_result_visible(), f"Search {i+1} failed UI check"
 
+    # Searches under load should not be significantly slower than in earlier runs
+    performance_baseline.assert_no_regression()
+
 @pytest.mark.stress
 @pytest.mark.usefixtures("jira_reporter")
-def test_repeated_search_does_not_crash(browser):
+def test_repeated_search_does_not_crash(browser, performance_baseline):
     """Test stability under repetition (20 iterations)."""
     home_page = HomePage(browser)
     search_page = SearchPage(browser)
@@ -45,9 +49,14 @@ def test_repeated_search_does_not_crash(browser):
     iterations = 20
 
     for i in range(iterations):
+        start_time = time.time()
         search_page.search(keyword)
+        performance_baseline.record(time.time() - start_time, query=keyword)
 
         # Verify browser is still alive and on correct page
         current_url = search_page.get_current_url()
         assert "dataset" in current_url, f"Navigation lost on iteration {i}"
-        assert search_page.is_search_result_visible(), f"UI broken on iteration {i}"
\ No newline at end of file
+        assert search_page.is_search_result_visible(), f"UI broken on iteration {i}"
+
+    # Twenty samples per run: a slowdown across the iterations shows up clearly
+    performance_baseline.assert_no_regression()
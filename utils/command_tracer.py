@@ -0,0 +1,377 @@
+"""
+WebDriver Command Tracer
+Records every WebDriver command (name, duration, calling page-object method),
+every time.sleep and WebDriverWait on the test thread, and spans for fixture
+setup and page-object calls, per test. The pytest-html report gets a time
+breakdown, reports/webdriver_trace/commands_<worker>.jsonl the raw events, and
+each test and worker a Chrome trace_event timeline that loads in Perfetto
+(merged into reports/webdriver_trace/timeline.json at the end of the run)
+"""
+
+import re
+import sys
+import zlib
+import json
+import time
+import html
+import functools
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from selenium.webdriver.support.wait import WebDriverWait
+from config import Config, worker_name
+
+COMMAND = "command"
+SLEEP = "sleep"
+SPAN = "span"
+
+TRACE_DIR = "reports/webdriver_trace"
+TIMELINE_PREFIX = "timeline_"
+MERGED_TIMELINE = "timeline.json"
+
+# Frames from these modules are plumbing, never the interesting caller
+_PLUMBING_PREFIXES = ("selenium.", "utils.command_tracer", "utils.retry_policy")
+# Walking stops at the test runner
+_RUNNER_PREFIXES = ("_pytest.", "pluggy.")
+
+_real_sleep = time.sleep
+_real_until = WebDriverWait.until
+_real_until_not = WebDriverWait.until_not
+
+_tracer = None
+
+
+def _frame_label(frame) -> str:
+    owner = frame.f_locals.get("self")
+    if owner is not None:
+        return f"{type(owner).__name__}.{frame.f_code.co_name}"
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+
+
+def _callers(frame):
+    """
+    (page_object_method, direct_caller) for a frame stack: the outermost
+    page-object method (the one the test called) and the innermost frame that
+    is not Selenium or tracing plumbing.
+    """
+    page_method = None
+    direct = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(_RUNNER_PREFIXES):
+            break
+        if not module.startswith(_PLUMBING_PREFIXES):
+            if direct is None:
+                direct = _frame_label(frame)
+            if module.startswith("pages.") and "self" in frame.f_locals:
+                page_method = _frame_label(frame)
+        frame = frame.f_back
+    return page_method, direct
+
+
+def _condition_name(method) -> str:
+    name = getattr(method, "__qualname__", type(method).__name__)
+    return name.split(".<locals>")[0]
+
+
+def _worker_pid(worker: str) -> int:
+    """
+    Chrome trace process id: gw0 -> 1, gw1 -> 2, ...; a run without xdist is 0.
+    Cross-browser shards ("chrome1", "firefox1_gw0") get a stable id from their name.
+    """
+    match = re.fullmatch(r"gw(\d+)", worker)
+    if match:
+        return int(match.group(1)) + 1
+    return 0 if worker == "main" else 1000 + zlib.crc32(worker.encode("utf-8")) % 1000000
+
+
+@dataclass
+class TraceEvent:
+    """One WebDriver command, sleep or span; start is epoch seconds"""
+    kind: str
+    name: str
+    start: float
+    duration: float
+    caller: Optional[str] = None
+    category: str = ""
+    detail: str = ""
+    thread: str = "MainThread"
+
+
+@dataclass
+class TestTrace:
+    """Everything recorded while one test ran (setup, call and teardown)"""
+    nodeid: str
+    start: float
+    end: Optional[float] = None
+    events: List[TraceEvent] = field(default_factory=list)
+
+    def summary(self) -> Dict:
+        by_command: Dict[str, Dict] = {}
+        by_caller: Dict[str, Dict] = {}
+        sleeps_by_site: Dict[str, float] = {}
+        command_seconds = sleep_seconds = 0.0
+        command_count = 0
+
+        for event in self.events:
+            if event.kind == COMMAND:
+                command_count += 1
+                command_seconds += event.duration
+                for key, table in ((event.name, by_command), (event.caller or "test", by_caller)):
+                    entry = table.setdefault(key, {"count": 0, "seconds": 0.0})
+                    entry["count"] += 1
+                    entry["seconds"] += event.duration
+            elif event.kind == SLEEP:
+                sleep_seconds += event.duration
+                sleeps_by_site[event.name] = sleeps_by_site.get(event.name, 0.0) + event.duration
+
+        wall_seconds = (self.end or time.time()) - self.start
+        return {
+            "wall_seconds": wall_seconds,
+            "command_count": command_count,
+            "command_seconds": command_seconds,
+            "sleep_seconds": sleep_seconds,
+            "other_seconds": max(0.0, wall_seconds - command_seconds - sleep_seconds),
+            "by_command": by_command,
+            "by_caller": by_caller,
+            "sleeps_by_site": sleeps_by_site,
+        }
+
+    def summary_text(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"{summary['command_count']} WebDriver commands {summary['command_seconds']:.2f}s, "
+            f"sleeping {summary['sleep_seconds']:.2f}s, other {summary['other_seconds']:.2f}s "
+            f"(wall {summary['wall_seconds']:.2f}s)"
+        ]
+        for caller, entry in sorted(summary["by_caller"].items(), key=lambda item: -item[1]["seconds"])[:10]:
+            lines.append(f"  {caller}: {entry['count']} commands, {entry['seconds']:.2f}s")
+        for site, seconds in sorted(summary["sleeps_by_site"].items(), key=lambda item: -item[1]):
+            lines.append(f"  sleep in {site}: {seconds:.2f}s")
+        return "\n".join(lines)
+
+    def to_html(self) -> str:
+        """Breakdown table for the pytest-html report"""
+        summary = self.summary()
+
+        def rows(items):
+            return "".join(
+                f"<tr><td>{html.escape(name)}</td><td>{count}</td><td>{seconds:.3f}s</td></tr>"
+                for name, count, seconds in items
+            )
+
+        commands = sorted(summary["by_command"].items(), key=lambda item: -item[1]["seconds"])
+        callers = sorted(summary["by_caller"].items(), key=lambda item: -item[1]["seconds"])
+        sleeps = sorted(summary["sleeps_by_site"].items(), key=lambda item: -item[1])
+        return (
+            "<div class='webdriver-trace'>"
+            f"<p><b>Time breakdown:</b> {summary['command_count']} WebDriver commands "
+            f"{summary['command_seconds']:.2f}s, sleeping {summary['sleep_seconds']:.2f}s, "
+            f"other {summary['other_seconds']:.2f}s (wall {summary['wall_seconds']:.2f}s)</p>"
+            "<table><tr><th>Caller</th><th>Commands</th><th>Time</th></tr>"
+            + rows((name, entry["count"], entry["seconds"]) for name, entry in callers) +
+            "</table><table><tr><th>Command</th><th>Count</th><th>Time</th></tr>"
+            + rows((name, entry["count"], entry["seconds"]) for name, entry in commands) +
+            "</table><table><tr><th>Sleep site</th><th></th><th>Time</th></tr>"
+            + rows((name, "", seconds) for name, seconds in sleeps) +
+            "</table></div>"
+        )
+
+    def chrome_events(self, pid: int, thread_ids: Dict[str, int]) -> List[Dict]:
+        """Complete ('X') trace events, timestamps in epoch microseconds so workers line up"""
+        events = [{
+            "name": self.nodeid, "cat": "test", "ph": "X", "pid": pid, "tid": thread_ids.setdefault("MainThread", 1),
+            "ts": int(self.start * 1e6), "dur": int(((self.end or time.time()) - self.start) * 1e6),
+        }]
+        for event in self.events:
+            args = {key: value for key, value in (("caller", event.caller), ("detail", event.detail)) if value}
+            events.append({
+                "name": event.name, "cat": event.category or event.kind, "ph": "X", "pid": pid,
+                "tid": thread_ids.setdefault(event.thread, len(thread_ids) + 1),
+                "ts": int(event.start * 1e6), "dur": max(1, int(event.duration * 1e6)), "args": args,
+            })
+        return events
+
+
+class CommandTracer:
+    """
+    Per-process tracer. attach() wraps a driver's command executor, install()
+    replaces time.sleep and WebDriverWait.until so sleeps and waits on the test
+    thread are accounted for, and start_test()/finish_test() bracket the events
+    of each test. Finished tests are appended to commands_<worker>.jsonl and to
+    the worker's Chrome timeline, and written as tests/<nodeid>.json.
+    """
+
+    def __init__(self, trace_dir: str = TRACE_DIR, worker: str = "main"):
+        self.trace_dir = Path(trace_dir)
+        self.worker = worker
+        self.pid = _worker_pid(worker)
+        self.trace_path = self.trace_dir / f"commands_{worker}.jsonl"
+        self.timeline_path = self.trace_dir / f"{TIMELINE_PREFIX}{worker}.json"
+        (self.trace_dir / "tests").mkdir(parents=True, exist_ok=True)
+        self.trace_path.write_text("", encoding="utf-8")
+        # JSON Array Format: the closing bracket is optional, so tests can be appended as they finish
+        metadata = {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": worker}}
+        self.timeline_path.write_text("[\n" + json.dumps(metadata) + ",\n", encoding="utf-8")
+        self.thread_ids: Dict[str, int] = {}
+        self.current: Optional[TestTrace] = None
+        self._test_thread: Optional[threading.Thread] = None
+        self._in_command = False  # sleeps inside a command are already part of its duration
+
+    def _on_test_thread(self) -> bool:
+        return self.current is not None and threading.current_thread() is self._test_thread
+
+    def install(self) -> "CommandTracer":
+        tracer = self
+
+        def traced_sleep(seconds):
+            start = time.time()
+            try:
+                _real_sleep(seconds)
+            finally:
+                if not tracer._in_command and tracer._on_test_thread():
+                    frame = sys._getframe(1)
+                    tracer.current.events.append(TraceEvent(SLEEP, _frame_label(frame), start, time.time() - start,
+                                                            _callers(frame)[0], category=SLEEP))
+
+        def traced_wait(real_method):
+            def wrapper(wait, method, message=""):
+                if not tracer._on_test_thread():
+                    return real_method(wait, method, message)
+                with tracer.span(f"WebDriverWait.{real_method.__name__}", "wait", _condition_name(method)):
+                    return real_method(wait, method, message)
+            return wrapper
+
+        time.sleep = traced_sleep
+        WebDriverWait.until = traced_wait(_real_until)
+        WebDriverWait.until_not = traced_wait(_real_until_not)
+        return self
+
+    def uninstall(self):
+        time.sleep = _real_sleep
+        WebDriverWait.until = _real_until
+        WebDriverWait.until_not = _real_until_not
+
+    def attach(self, driver):
+        """Wrap the driver's command executor once; pooled drivers keep the wrapper"""
+        executor = getattr(driver, "command_executor", None)
+        if executor is None or getattr(executor, "_command_tracer", None) is self:
+            return  # HttpBrowser, or already traced
+        original_execute = executor.execute
+        tracer = self
+
+        def traced_execute(command, params):
+            outermost = not tracer._in_command
+            tracer._in_command = True
+            start = time.time()
+            try:
+                return original_execute(command, params)
+            finally:
+                if outermost:
+                    tracer._in_command = False
+                if outermost and tracer.current is not None:
+                    page_method, direct = _callers(sys._getframe(1))
+                    tracer.current.events.append(TraceEvent(COMMAND, command, start, time.time() - start,
+                                                            page_method or direct, category="webdriver",
+                                                            thread=threading.current_thread().name))
+
+        executor.execute = traced_execute
+        executor._command_tracer = self
+
+    @contextmanager
+    def span(self, name: str, category: str, detail: str = ""):
+        """Record the enclosed block as a span of the current test (no-op between tests)"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                self.current.events.append(TraceEvent(SPAN, name, start, time.time() - start, category=category,
+                                                      detail=detail, thread=threading.current_thread().name))
+
+    def start_test(self, nodeid: str) -> TestTrace:
+        self.current = TestTrace(nodeid=nodeid, start=time.time())
+        self._test_thread = threading.current_thread()
+        return self.current
+
+    def finish_test(self) -> Optional[TestTrace]:
+        trace, self.current = self.current, None
+        if trace is None:
+            return None
+        trace.end = time.time()
+        with open(self.trace_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "nodeid": trace.nodeid,
+                "worker": self.worker,
+                "start": trace.start,
+                "end": trace.end,
+                "summary": trace.summary(),
+                "events": [asdict(event) for event in trace.events]
+            }) + "\n")
+
+        events = trace.chrome_events(self.pid, self.thread_ids)
+        with open(self.timeline_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(event) + ",\n" for event in events)
+        # Shards of different browsers run the same tests
+        prefix = f"{Config.TEST_SHARD_ID}_" if Config.TEST_SHARD_ID else ""
+        test_file = prefix + re.sub(r"[^\w.-]+", "_", trace.nodeid)[:200] + ".json"
+        with open(self.trace_dir / "tests" / test_file, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return trace
+
+
+def get_command_tracer() -> Optional[CommandTracer]:
+    """Process-wide tracer, installed on first use; None when TRACE_WEBDRIVER_COMMANDS is off"""
+    global _tracer
+    if _tracer is None and Config.TRACE_WEBDRIVER_COMMANDS:
+        _tracer = CommandTracer(worker=worker_name()).install()
+    return _tracer
+
+
+@contextmanager
+def span(name: str, category: str, detail: str = ""):
+    """Record the enclosed block in the active test trace, if any"""
+    if _tracer is None or _tracer.current is None:
+        yield
+        return
+    with _tracer.span(name, category, detail):
+        yield
+
+
+def traced(category: str):
+    """Decorator recording every call of a page-object method as a span"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if _tracer is None or _tracer.current is None:
+                return func(self, *args, **kwargs)
+            detail = str(args[0])[:200] if args else ""
+            with _tracer.span(f"{type(self).__name__}.{func.__name__}", category, detail):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def remove_traces(trace_dir: str = TRACE_DIR):
+    """Delete timelines and per-test traces left by a previous run"""
+    root = Path(trace_dir)
+    for path in list(root.glob("*.json*")) + list(root.glob("tests/*.json")):
+        path.unlink()
+
+
+def merge_timelines(trace_dir: str = TRACE_DIR) -> Optional[str]:
+    """Combine the per-worker timelines into one Chrome trace for the whole run"""
+    root = Path(trace_dir)
+    events = []
+    for path in sorted(root.glob(f"{TIMELINE_PREFIX}*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            events.extend(json.loads(line.rstrip().rstrip(",")) for line in f if line.strip() not in ("", "[", "]"))
+    if not events:
+        return None
+    merged_path = root / MERGED_TIMELINE
+    with open(merged_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return str(merged_path)
@@ -0,0 +1,137 @@
+"""
+WebDriver Pool
+Keeps warm browser sessions alive across tests and resets them between uses
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+from config import Config
+
+
+# (browser name, headless, remote)
+PoolKey = Tuple[str, bool, bool]
+
+
+@dataclass
+class PooledDriver:
+    """A driver handed out by the pool together with its usage counter"""
+    key: PoolKey
+    driver: WebDriver
+    uses: int = 0
+
+
+class DriverPool:
+    """
+    Hands out warm WebDriver sessions keyed by browser/headless/remote and
+    resets their state between tests.
+
+    The pool lives in a session-scoped fixture, so under pytest-xdist every
+    worker process owns its own pool and no driver is ever shared across workers.
+    """
+
+    def __init__(self, driver_factory: Callable[[str, bool, bool], WebDriver], max_uses: int = None):
+        self.driver_factory = driver_factory
+        self.max_uses = max_uses or Config.DRIVER_POOL_MAX_USES
+        self._idle: Dict[PoolKey, List[PooledDriver]] = {}
+        self._in_use: Dict[int, PooledDriver] = {}
+        self.logger = logging.getLogger(__name__)
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "crashed": 0}
+
+    def acquire(self, browser_name: str, headless: bool, remote: bool) -> WebDriver:
+        """Return a healthy driver for the given configuration, creating one if needed"""
+        key = (browser_name, headless, remote)
+        idle = self._idle.setdefault(key, [])
+
+        while idle:
+            pooled = idle.pop()
+            if self._is_healthy(pooled.driver):
+                pooled.uses += 1
+                self.stats["reused"] += 1
+                self._in_use[id(pooled.driver)] = pooled
+                return pooled.driver
+            self.logger.warning(f"Discarding crashed {browser_name} driver after {pooled.uses} uses")
+            self.stats["crashed"] += 1
+            self._quit(pooled.driver)
+
+        driver = self.driver_factory(browser_name, headless, remote)
+        self.stats["created"] += 1
+        pooled = PooledDriver(key=key, driver=driver, uses=1)
+        self._in_use[id(driver)] = pooled
+        return driver
+
+    def release(self, driver: WebDriver):
+        """Reset a driver and return it to the pool, or quit it when it is worn out or broken"""
+        pooled = self._in_use.pop(id(driver), None)
+        if pooled is None:
+            self._quit(driver)
+            return
+
+        if pooled.uses >= self.max_uses:
+            self.logger.info(f"Recycling driver after {pooled.uses} uses")
+            self.stats["recycled"] += 1
+            self._quit(driver)
+            return
+
+        try:
+            self.reset(driver)
+        except Exception as e:
+            self.logger.warning(f"Driver reset failed, discarding it: {e}")
+            self.stats["crashed"] += 1
+            self._quit(driver)
+            return
+
+        self._idle.setdefault(pooled.key, []).append(pooled)
+
+    def reset(self, driver: WebDriver):
+        """Bring a used driver back to a clean state equivalent to a fresh launch"""
+        handles = driver.window_handles
+        main_handle = handles[0]
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(main_handle)
+
+        # Storage can only be cleared for the current origin, so do it before leaving the page
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            pass  # about:blank and data: URLs have no accessible storage
+
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Chromium drivers can drop cookies for every domain in one call
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            # Responsive tests may leave a device emulation behind
+            driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+        driver.delete_all_cookies()
+
+        driver.implicitly_wait(0)
+        driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+        driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
+        driver.get("about:blank")
+
+    def close_all(self):
+        """Quit every driver owned by the pool"""
+        for pooled_list in self._idle.values():
+            for pooled in pooled_list:
+                self._quit(pooled.driver)
+        for pooled in self._in_use.values():
+            self._quit(pooled.driver)
+        self._idle.clear()
+        self._in_use.clear()
+        self.logger.info(f"Driver pool closed - stats: {self.stats}")
+
+    def _is_healthy(self, driver: WebDriver) -> bool:
+        """Cheap liveness probe: a dead session fails on any command"""
+        try:
+            return len(driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def _quit(self, driver: WebDriver):
+        try:
+            driver.quit()
+        except Exception:
+            pass  # Session already gone
@@ -0,0 +1,152 @@
+"""
+Duration-aware Test Scheduling
+Keeps a smoothed history of how long every test takes (per browser) and hands
+tests to pytest-xdist workers longest-first, so slow tests such as the
+logged_in_browser ones start early instead of becoming the long pole at the end
+of the run. lpt_partition() is the same longest-processing-time-first packing
+done offline, used to size worker counts against Selenium Grid slots.
+"""
+
+import os
+import json
+import heapq
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+from xdist.scheduler import LoadScheduling
+from config import Config
+
+# Estimate for a test with no history when nothing else is known either
+_DEFAULT_ESTIMATE = 5.0
+
+
+class DurationHistory:
+    """
+    Exponentially smoothed duration (setup + call + teardown) per browser and
+    test, stored as JSON at TEST_DURATIONS_FILE.
+    """
+
+    def __init__(self, path: str = None, browser: str = Config.DEFAULT_BROWSER):
+        self.path = Path(path or Config.TEST_DURATIONS_FILE)
+        self.browser = browser
+        self.logger = logging.getLogger(__name__)
+        self.data: Dict[str, Dict[str, Dict]] = {}
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable duration history {self.path}: {e}")
+
+    @property
+    def durations(self) -> Dict[str, Dict]:
+        return self.data.setdefault(self.browser, {})
+
+    def estimate(self, nodeid: str) -> float:
+        """Smoothed duration of a test; unknown tests get the median of the known ones"""
+        entry = self.durations.get(nodeid)
+        if entry:
+            return entry["seconds"]
+        known = sorted(entry["seconds"] for entry in self.durations.values())
+        return known[len(known) // 2] if known else _DEFAULT_ESTIMATE
+
+    def update(self, measured: Dict[str, float]):
+        """Fold the durations of this run into the history and save it"""
+        alpha = Config.TEST_DURATION_SMOOTHING
+        for nodeid, seconds in measured.items():
+            entry = self.durations.get(nodeid)
+            if entry is None:
+                self.durations[nodeid] = {"seconds": seconds, "runs": 1}
+            else:
+                entry["seconds"] = alpha * seconds + (1 - alpha) * entry["seconds"]
+                entry["runs"] += 1
+        self.save()
+
+    def save(self):
+        """Write through a temp file + rename so a concurrent run never reads a partial file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def lpt_partition(durations: Dict[str, float], bins: int) -> Tuple[List[List[str]], float]:
+    """
+    Longest-processing-time-first packing of tests into `bins` workers: each
+    test, longest first, goes to the currently least-loaded worker. Returns the
+    per-worker test lists and the predicted makespan (at most 4/3 of optimal).
+    """
+    bins = max(1, bins)
+    loads = [(0.0, index) for index in range(bins)]
+    assignment: List[List[str]] = [[] for _ in range(bins)]
+    for nodeid, seconds in sorted(durations.items(), key=lambda item: -item[1]):
+        load, index = heapq.heappop(loads)
+        assignment[index].append(nodeid)
+        heapq.heappush(loads, (load + seconds, index))
+    return assignment, max(load for load, _ in loads)
+
+
+def grid_worker_count(tests: int = None) -> int:
+    """Parallel sessions one browser can hold on the grid without queueing"""
+    slots = Config.GRID_NODES_PER_BROWSER * Config.GRID_NODE_MAX_SESSION
+    return max(1, min(slots, tests)) if tests is not None else slots
+
+
+class LPTScheduling(LoadScheduling):
+    """
+    xdist scheduler that dispatches pending tests longest-first. Each worker
+    holds only the two tests xdist needs to keep it busy (the running one and
+    the next), so whichever worker frees up first takes the longest test left:
+    the online form of LPT, which also absorbs estimates that turn out wrong.
+    """
+
+    def __init__(self, config, log=None, history: DurationHistory = None):
+        super().__init__(config, log)
+        self.history = history or DurationHistory(browser=config.getoption("--browser").lower())
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        if not self.collection:
+            return
+        estimates = [self.history.estimate(nodeid) for nodeid in self.collection]
+        # sorted() is stable, so tests with equal estimates keep pytest's fixture-friendly order
+        self.pending[:] = sorted(range(len(self.collection)), key=lambda index: -estimates[index])
+
+        _, makespan = lpt_partition(dict(zip(self.collection, estimates)), len(self.nodes))
+        self.log(f"longest-first schedule of {len(self.collection)} tests on {len(self.nodes)} workers, "
+                 f"predicted makespan {makespan:.1f}s (serial {sum(estimates):.1f}s)")
+
+        for _ in range(2):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration: float = 0):
+        if node.shutting_down:
+            return
+        if self.pending:
+            self._send_tests(node, max(0, 2 - len(self.node2pending[node])))
+        else:
+            node.shutdown()
+
+    def remove_node(self, node):
+        crashitem = super().remove_node(node)
+        # Items given back by a crashed worker go back into longest-first order
+        self.pending.sort(key=lambda index: -self.history.estimate(self.collection[index]))
+        return crashitem
+
@@ -0,0 +1,57 @@
+"""
+Selenium Grid Capacity
+Reads the hub's /status endpoint and reports, per browser, how many session
+slots the UP nodes offer and how many are free right now
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+import requests
+from config import Config
+
+# Grid stereotype browserName for each --browser option
+GRID_BROWSER_NAMES = {"chrome": "chrome", "firefox": "firefox", "edge": "MicrosoftEdge", "safari": "safari"}
+
+
+@dataclass
+class BrowserCapacity:
+    """Session slots of one browser across the grid"""
+    browser: str
+    total: int = 0
+    free: int = 0
+
+    @property
+    def busy(self) -> int:
+        return self.total - self.free
+
+
+def query_grid_capacity(status_url: str = None, timeout: float = 5.0) -> Optional[Dict[str, BrowserCapacity]]:
+    """
+    Slots per --browser name from the hub's /status, or None when the grid is
+    unreachable or not ready. Nodes that are not UP (DRAINING, DOWN) are ignored.
+    """
+    status_url = status_url or Config.GRID_STATUS_URL
+    try:
+        response = requests.get(status_url, timeout=timeout)
+        response.raise_for_status()
+        status = response.json()["value"]
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logging.getLogger(__name__).warning(f"Selenium Grid status unavailable at {status_url}: {e}")
+        return None
+    if not status.get("ready"):
+        return None
+
+    option_names = {grid_name.lower(): option for option, grid_name in GRID_BROWSER_NAMES.items()}
+    capacity: Dict[str, BrowserCapacity] = {}
+    for node in status.get("nodes", []):
+        if node.get("availability") != "UP":
+            continue
+        for slot in node.get("slots", []):
+            grid_name = slot.get("stereotype", {}).get("browserName", "")
+            browser = option_names.get(grid_name.lower(), grid_name.lower())
+            entry = capacity.setdefault(browser, BrowserCapacity(browser))
+            entry.total += 1
+            if slot.get("session") is None:
+                entry.free += 1
+    return capacity
@@ -0,0 +1,295 @@
+"""
+HTTP-only Browser
+A read-only stand-in for WebDriver that fetches pages with a pooled requests
+Session and parses them with lxml. Page objects that only read titles, text and
+form fields (StaticPage, FAQPage, ContactPage) work on it unchanged, in
+milliseconds instead of seconds. JavaScript never runs, so it only suits
+server-rendered pages; anything interactive raises UnknownMethodException.
+"""
+
+import logging
+import threading
+from typing import List, Optional
+from urllib.parse import urljoin
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+from lxml.etree import ParserError, XPathError
+from selenium.common.exceptions import (
+    WebDriverException,
+    NoSuchElementException,
+    InvalidSelectorException,
+    UnknownMethodException,
+)
+from config import Config
+
+# Elements whose content is never rendered as text
+_NON_RENDERED_TAGS = {"script", "style", "noscript", "template", "head", "title", "meta", "link"}
+
+# Block-level elements start a new line in WebElement.text
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+}
+
+# Locator strategies expressed as XPath, with the locator value bound to $value
+_XPATH_STRATEGIES = {
+    "id": ".//*[@id=$value]",
+    "name": ".//*[@name=$value]",
+    "link text": ".//a[normalize-space(string(.))=$value]",
+    "partial link text": ".//a[contains(string(.), $value)]",
+}
+
+_BROWSER_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "fr-FR,fr;q=0.9,ar;q=0.8,en;q=0.7",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _shared_session() -> requests.Session:
+    """One keep-alive connection pool per process, reused by every HttpBrowser"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(_BROWSER_HEADERS)
+        return _session
+
+
+def _unsupported(action: str):
+    raise UnknownMethodException(f"{action} needs a real browser: HttpBrowser only reads static HTML")
+
+
+def _is_hidden(element) -> bool:
+    if element.tag in _NON_RENDERED_TAGS or element.get("hidden") is not None:
+        return True
+    if element.tag == "input" and (element.get("type") or "").lower() == "hidden":
+        return True
+    style = (element.get("style") or "").replace(" ", "").lower()
+    return "display:none" in style or "visibility:hidden" in style
+
+
+def _rendered_text(element) -> str:
+    """Approximate WebElement.text: visible text, one line per block, whitespace collapsed"""
+    parts = []
+
+    def walk(node):
+        if not isinstance(node.tag, str) or _is_hidden(node):
+            return  # comments, processing instructions and hidden subtrees
+        block = node.tag in _BLOCK_TAGS
+        if block:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append("\n")
+
+    walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _find(root, by: str, value: str) -> list:
+    try:
+        if by == "css selector":
+            found = root.cssselect(value)
+        elif by == "xpath":
+            found = root.xpath(value)
+        elif by == "class name":
+            found = root.cssselect(f".{value}")
+        elif by == "tag name":
+            found = root.cssselect(value)
+        elif by in _XPATH_STRATEGIES:
+            found = root.xpath(_XPATH_STRATEGIES[by], value=value)
+        else:
+            raise InvalidSelectorException(f"Unsupported locator strategy: {by}")
+    except (XPathError, SyntaxError) as e:
+        raise InvalidSelectorException(f"Invalid {by} selector {value!r}: {e}")
+    return [element for element in found if isinstance(getattr(element, "tag", None), str)]
+
+
+class HttpElement:
+    """Read-only WebElement backed by an lxml element"""
+
+    def __init__(self, browser: "HttpBrowser", element):
+        self._browser = browser
+        self._element = element
+
+    @property
+    def tag_name(self) -> str:
+        return self._element.tag
+
+    @property
+    def text(self) -> str:
+        return _rendered_text(self._element) if self.is_displayed() else ""
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        value = self._element.get(name)
+        if value is not None and name in ("href", "src", "action"):
+            return urljoin(self._browser.current_url, value)  # WebDriver returns the resolved property
+        if name in ("textContent", "innerText"):
+            return self._element.text_content()
+        return value
+
+    def get_dom_attribute(self, name: str) -> Optional[str]:
+        return self._element.get(name)
+
+    def is_displayed(self) -> bool:
+        return not _is_hidden(self._element) and not any(_is_hidden(node) for node in self._element.iterancestors())
+
+    def is_enabled(self) -> bool:
+        return self._element.get("disabled") is None
+
+    def is_selected(self) -> bool:
+        return self._element.get("checked") is not None or self._element.get("selected") is not None
+
+    def find_elements(self, by: str = "id", value: str = None) -> List["HttpElement"]:
+        return [HttpElement(self._browser, element) for element in _find(self._element, by, value)]
+
+    def find_element(self, by: str = "id", value: str = None) -> "HttpElement":
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {{'method': '{by}', 'selector': '{value}'}}")
+        return elements[0]
+
+    def click(self):
+        _unsupported("click")
+
+    def send_keys(self, *value):
+        _unsupported("send_keys")
+
+    def clear(self):
+        _unsupported("clear")
+
+    def submit(self):
+        _unsupported("submit")
+
+
+class HttpBrowser:
+    """
+    The subset of the WebDriver API used by read-only page objects: get, title,
+    current_url, page_source, find_element(s), back and refresh.
+    Pages are fetched through the shared session, optionally via a proxy
+    (the --http-cache proxy), and never run JavaScript.
+    """
+
+    # A fetched document never changes, so page objects should not poll it
+    static_document = True
+    name = "http"
+
+    def __init__(self, proxy_address: str = None, session: requests.Session = None):
+        self.session = session or _shared_session()
+        self.proxies = {"http": f"http://{proxy_address}", "https": f"http://{proxy_address}"} if proxy_address else None
+        self.status_code: Optional[int] = None
+        self._url = "about:blank"
+        self._source = ""
+        self._document = lxml_html.document_fromstring("<html><head></head><body></body></html>")
+        self._history: List[str] = []
+        self.logger = logging.getLogger(__name__)
+        if proxy_address:
+            # The caching proxy presents a self-signed certificate, as it does to browsers
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    def _load(self, url: str):
+        if url == "about:blank":
+            self._url, self._source, self.status_code = url, "", None
+            self._document = lxml_html.document_fromstring("<html><head></head><body></body></html>")
+            return
+
+        try:
+            response = self.session.get(url, proxies=self.proxies, verify=self.proxies is None,
+                                        timeout=Config.PAGE_LOAD_TIMEOUT)
+        except requests.RequestException as e:
+            # Worded like a browser network error so the retry policy treats it as transient
+            raise WebDriverException(f"unable to connect to {url}: {e}")
+
+        self._url = response.url
+        self._source = response.text
+        self.status_code = response.status_code
+        try:
+            self._document = lxml_html.document_fromstring(response.content, base_url=response.url)
+        except ParserError:
+            self._document = lxml_html.document_fromstring("<html><head></head><body></body></html>")
+        self.logger.debug(f"Fetched {response.url} ({response.status_code}, {len(response.content)} bytes)")
+
+    def get(self, url: str):
+        if self._url != "about:blank":
+            self._history.append(self._url)
+        self._load(url)
+
+    def back(self):
+        if self._history:
+            self._load(self._history.pop())
+
+    def refresh(self):
+        self._load(self._url)
+
+    @property
+    def current_url(self) -> str:
+        return self._url
+
+    @property
+    def title(self) -> str:
+        titles = self._document.xpath("//title")
+        return " ".join(titles[0].text_content().split()) if titles else ""
+
+    @property
+    def page_source(self) -> str:
+        return self._source
+
+    def find_elements(self, by: str = "id", value: str = None) -> List[HttpElement]:
+        return [HttpElement(self, element) for element in _find(self._document, by, value)]
+
+    def find_element(self, by: str = "id", value: str = None) -> HttpElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {{'method': '{by}', 'selector': '{value}'}}")
+        return elements[0]
+
+    def get_cookies(self) -> List[dict]:
+        return [{"name": cookie.name, "value": cookie.value, "domain": cookie.domain, "path": cookie.path}
+                for cookie in self.session.cookies]
+
+    def add_cookie(self, cookie: dict):
+        self.session.cookies.set(cookie["name"], cookie["value"],
+                                 domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+
+    def delete_all_cookies(self):
+        self.session.cookies.clear()
+
+    def implicitly_wait(self, time_to_wait: float):
+        pass  # Nothing loads after the response, so there is nothing to wait for
+
+    def execute_script(self, script: str, *args):
+        _unsupported("execute_script")
+
+    def execute_async_script(self, script: str, *args):
+        _unsupported("execute_async_script")
+
+    def save_screenshot(self, filename: str) -> bool:
+        _unsupported("save_screenshot")
+
+    def get_screenshot_as_png(self) -> bytes:
+        _unsupported("get_screenshot_as_png")
+
+    def quit(self):
+        """Forget the page and the cookies; the pooled connections stay open for the next test"""
+        self.delete_all_cookies()
+        self._history.clear()
+        self._load("about:blank")
+
+    close = quit
@@ -0,0 +1,415 @@
+"""
+Record-and-Replay HTTP Cache Proxy
+A local forward proxy configured into the browsers under test. In record mode it
+fetches from the network and stores every GET response in a content-addressed
+on-disk cache; in replay mode it answers from that cache only. Logged-in traffic
+(requests carrying credentials) always bypasses the cache.
+"""
+
+import os
+import ssl
+import json
+import time
+import socket
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import requests
+from config import Config
+from utils.rate_limiter import _file_lock
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Hop-by-hop and encoding headers are recomputed for the browser, never replayed
+_DROPPED_RESPONSE_HEADERS = {
+    "connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length",
+    "proxy-authenticate", "proxy-connection", "upgrade", "trailer", "te",
+}
+_DROPPED_REQUEST_HEADERS = _DROPPED_RESPONSE_HEADERS | {"host", "proxy-authorization", "accept-encoding"}
+# Session state must never be served to another test from the cache
+_UNCACHED_RESPONSE_HEADERS = {"set-cookie"}
+_CACHEABLE_STATUSES = {200, 203, 301, 308, 404, 410}
+
+
+def _carries_credentials(headers) -> bool:
+    """
+    Whether a request is made as a logged-in user: its response (a profile page,
+    a dashboard) must not be replayed to anonymous sessions or other tests
+    """
+    if headers.get("Authorization"):
+        return True
+    cookie_names = [cookie.split("=", 1)[0].strip().lower() for cookie in (headers.get("Cookie") or "").split(";")]
+    return any(marker in name for name in cookie_names if name for marker in Config.HTTP_CACHE_CREDENTIAL_COOKIES)
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write through a temp file + rename so concurrent xdist workers never see partial files"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_name, path)
+
+
+@contextmanager
+def _cache_lock(cache_dir: Path):
+    """Exclusive lock shared by every xdist worker using cache_dir"""
+    with open(cache_dir / "cache.lock", "a+") as handle:
+        with _file_lock(handle):
+            yield
+
+
+class HttpCache:
+    """
+    Content-addressed response cache.
+
+    Bodies live in objects/<sha256 of body>, so an asset served under several URLs
+    is stored once. Each cached URL has a small entries/<sha256 of url>.json record
+    (status, headers, body hash, store time); its file mtime is bumped on every hit
+    and used as the LRU clock when the total object size exceeds max_bytes.
+    Stores and eviction run under a lock file in cache_dir, and the number of
+    stores since the last eviction is kept there too, so workers sharing the
+    cache evict once per EVICTION_INTERVAL stores overall and never delete a body
+    another worker is writing an entry for.
+    """
+
+    EVICTION_INTERVAL = 100
+
+    def __init__(self, cache_dir: str = None, ttl: float = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or Config.HTTP_CACHE_DIR)
+        self.objects_dir = self.cache_dir / "objects"
+        self.entries_dir = self.cache_dir / "entries"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = Config.HTTP_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = Config.HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.url_stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._store_counter_path = self.cache_dir / "stores_since_eviction"
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _entry_name(method: str, url: str) -> str:
+        return hashlib.sha256(f"{method} {url}".encode("utf-8")).hexdigest() + ".json"
+
+    def count(self, url: str, outcome: str):
+        """Record a 'hits', 'misses', 'stale' or 'bypassed' (credentialed) lookup for url"""
+        with self._stats_lock:
+            counters = self.url_stats.setdefault(url, {"hits": 0, "misses": 0, "stale": 0, "bypassed": 0})
+            counters[outcome] += 1
+
+    def lookup(self, method: str, url: str, allow_stale: bool = False) -> Optional[Tuple[Dict, bytes]]:
+        """Return (entry, body) for a cached response, or None on a miss or expired entry"""
+        entry_path = self.entries_dir / self._entry_name(method, url)
+        try:
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            body = (self.objects_dir / entry["body_sha256"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            self.count(url, "misses")
+            return None
+
+        if not allow_stale and time.time() - entry["stored_at"] > self.ttl:
+            self.count(url, "stale")
+            return None
+
+        os.utime(entry_path)  # LRU bookkeeping
+        self.count(url, "hits")
+        return entry, body
+
+    def store(self, method: str, url: str, status: int, headers: List[Tuple[str, str]], body: bytes):
+        body_sha256 = hashlib.sha256(body).hexdigest()
+        object_path = self.objects_dir / body_sha256
+        entry = {
+            "url": url,
+            "status": status,
+            "headers": headers,
+            "body_sha256": body_sha256,
+            "size": len(body),
+            "stored_at": time.time(),
+        }
+        with _cache_lock(self.cache_dir):
+            if not object_path.exists():
+                _atomic_write(object_path, body)
+            _atomic_write(self.entries_dir / self._entry_name(method, url), json.dumps(entry).encode("utf-8"))
+
+            try:
+                stores = int(self._store_counter_path.read_text()) + 1
+            except (OSError, ValueError):
+                stores = 1
+            if stores >= self.EVICTION_INTERVAL:
+                self._evict_locked()
+                stores = 0
+            _atomic_write(self._store_counter_path, str(stores).encode("ascii"))
+
+    def evict(self):
+        """Drop least recently used entries until stored bodies fit in max_bytes"""
+        with _cache_lock(self.cache_dir):
+            self._evict_locked()
+            _atomic_write(self._store_counter_path, b"0")
+
+    def _evict_locked(self):
+        entries = []
+        for entry_path in self.entries_dir.glob("*.json"):
+            try:
+                entry = json.loads(entry_path.read_text(encoding="utf-8"))
+                entries.append((entry_path.stat().st_mtime, entry_path, entry["body_sha256"]))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        object_sizes = {}
+        for object_path in self.objects_dir.iterdir():
+            try:
+                object_sizes[object_path.name] = object_path.stat().st_size
+            except OSError:
+                continue
+        total = sum(object_sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()  # oldest access first
+        referenced = {body_hash: 0 for body_hash in object_sizes}
+        for _, _, body_hash in entries:
+            referenced[body_hash] = referenced.get(body_hash, 0) + 1
+
+        for _, entry_path, body_hash in entries:
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            referenced[body_hash] -= 1
+            if referenced[body_hash] == 0 and body_hash in object_sizes:
+                (self.objects_dir / body_hash).unlink(missing_ok=True)
+                total -= object_sizes[body_hash]
+
+        self.logger.info(f"HTTP cache evicted down to {total / 1_000_000:.1f} MB")
+
+    def write_stats(self, path: str) -> str:
+        """Dump per-URL hit/miss counters as JSON"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._stats_lock:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.url_stats, f, indent=2)
+        return str(path)
+
+    def summary(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {
+                outcome: sum(counters[outcome] for counters in self.url_stats.values())
+                for outcome in ("hits", "misses", "stale", "bypassed")
+            }
+
+
+def _ensure_certificate(cache_dir: Path) -> Tuple[Path, Path]:
+    """
+    Create (once) the self-signed certificate the proxy presents for intercepted
+    HTTPS hosts. Browsers are launched with acceptInsecureCerts, so no CA install
+    is needed. Generated under the cache lock, so workers starting together
+    cannot end up with the key of one and the certificate of another.
+    """
+    cert_path = cache_dir / "proxy_cert.pem"
+    key_path = cache_dir / "proxy_key.pem"
+    if cert_path.exists() and key_path.exists():
+        return cert_path, key_path
+
+    with _cache_lock(cache_dir):
+        if not (cert_path.exists() and key_path.exists()):
+            _generate_certificate(cert_path, key_path)
+    return cert_path, key_path
+
+
+def _generate_certificate(cert_path: Path, key_path: Path):
+
+    try:
+        from cryptography import x509
+        from cryptography.x509.oid import NameOID
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+    except ImportError:
+        raise RuntimeError("The HTTP cache proxy needs the 'cryptography' package to intercept HTTPS: pip install cryptography")
+    import datetime
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "DataGovTN test cache proxy")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=825))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    _atomic_write(key_path, key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()))
+    _atomic_write(cert_path, cert.public_bytes(serialization.Encoding.PEM))
+
+
+class CachingProxy:
+    """
+    Forward proxy for browsers. Plain HTTP requests are handled directly; HTTPS
+    CONNECT tunnels are terminated with a self-signed certificate so the requests
+    inside them can be cached too. Non-GET requests pass straight through in
+    record mode and are refused in replay mode.
+    """
+
+    def __init__(self, mode: str = RECORD, cache: HttpCache = None, host: str = "127.0.0.1",
+                 replay_latency: float = None):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unsupported HTTP cache mode: {mode}")
+        self.mode = mode
+        self.cache = cache or HttpCache()
+        self.host = host
+        self.replay_latency = Config.REPLAY_LATENCY if replay_latency is None else replay_latency
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._sessions = threading.local()
+        self.logger = logging.getLogger(__name__)
+
+        cert_path, key_path = _ensure_certificate(self.cache.cache_dir)
+        self._tls_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self._tls_context.load_cert_chain(cert_path, key_path)
+
+    @property
+    def proxy_address(self) -> str:
+        """host:port to configure as the browser's HTTP and SSL proxy"""
+        return f"{self.host}:{self._server.server_address[1]}"
+
+    def start(self) -> "CachingProxy":
+        self._server = ThreadingHTTPServer((self.host, 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.logger.info(f"HTTP cache proxy ({self.mode}) listening on {self.proxy_address}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.cache.evict()
+
+    def _session(self) -> requests.Session:
+        # One pooled session per handler thread: keep-alive to the portal without sharing state
+        if not hasattr(self._sessions, "session"):
+            self._sessions.session = requests.Session()
+        return self._sessions.session
+
+    def _fetch(self, method: str, url: str, headers: Dict[str, str], body: Optional[bytes]):
+        response = self._session().request(
+            method, url, headers=headers, data=body, allow_redirects=False,
+            timeout=Config.PAGE_LOAD_TIMEOUT
+        )
+        # raw headers keep repeated fields such as Set-Cookie as separate pairs
+        return response.status_code, list(response.raw.headers.items()), response.content
+
+    def _make_handler(self):
+        proxy = self
+
+        class CachingProxyHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            tunnel_origin = None  # "https://host:port" once a CONNECT tunnel is established
+
+            def do_CONNECT(self):
+                host, _, port = self.path.partition(":")
+                self.send_response(200, "Connection Established")
+                self.end_headers()
+                try:
+                    tls_connection = proxy._tls_context.wrap_socket(self.connection, server_side=True)
+                except (ssl.SSLError, OSError) as e:
+                    proxy.logger.debug(f"TLS handshake with browser failed for {self.path}: {e}")
+                    self.close_connection = True
+                    return
+                # Keep serving requests, now read from inside the tunnel
+                self.connection = tls_connection
+                self.rfile = tls_connection.makefile("rb", self.rbufsize)
+                self.wfile = tls_connection.makefile("wb")
+                default_port = port in ("", "443")
+                self.tunnel_origin = f"https://{host}" if default_port else f"https://{host}:{port}"
+                self.close_connection = False
+
+            def _target_url(self) -> str:
+                if self.tunnel_origin:
+                    return self.tunnel_origin + self.path
+                return self.path  # plain HTTP proxy requests carry an absolute URL
+
+            def _send(self, status: int, headers: List[Tuple[str, str]], body: bytes, head_only: bool = False):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head_only:
+                    self.wfile.write(body)
+
+            def _forward_headers(self) -> Dict[str, str]:
+                return {name: value for name, value in self.headers.items()
+                        if name.lower() not in _DROPPED_REQUEST_HEADERS}
+
+            def _handle(self, method: str):
+                url = self._target_url()
+                body = None
+                if "Content-Length" in self.headers:
+                    body = self.rfile.read(int(self.headers["Content-Length"]))
+
+                cacheable = method in ("GET", "HEAD") and not _carries_credentials(self.headers)
+                if method in ("GET", "HEAD") and not cacheable:
+                    proxy.cache.count(url, "bypassed")
+                if cacheable:
+                    cached = proxy.cache.lookup("GET", url, allow_stale=proxy.mode == REPLAY)
+                    if cached:
+                        entry, cached_body = cached
+                        if proxy.mode == REPLAY and proxy.replay_latency:
+                            time.sleep(proxy.replay_latency)
+                        self._send(entry["status"], entry["headers"], cached_body, head_only=method == "HEAD")
+                        return
+
+                if proxy.mode == REPLAY:
+                    reason = "Not in HTTP cache" if cacheable else "Logged-in requests are never cached"
+                    self._send(504, [("Content-Type", "text/plain")], f"{reason}: {url}".encode("utf-8"))
+                    return
+
+                try:
+                    status, upstream_headers, upstream_body = proxy._fetch(
+                        "GET" if method == "HEAD" else method, url, self._forward_headers(), body)
+                except (requests.RequestException, socket.error) as e:
+                    self._send(502, [("Content-Type", "text/plain")], f"Upstream error: {e}".encode("utf-8"))
+                    return
+
+                response_headers = [(name, value) for name, value in upstream_headers
+                                    if name.lower() not in _DROPPED_RESPONSE_HEADERS]
+                cache_control = ", ".join(value for name, value in upstream_headers
+                                          if name.lower() == "cache-control").lower()
+                if (cacheable and status in _CACHEABLE_STATUSES
+                        and "no-store" not in cache_control and "private" not in cache_control):
+                    proxy.cache.store("GET", url, status, [
+                        (name, value) for name, value in response_headers
+                        if name.lower() not in _UNCACHED_RESPONSE_HEADERS
+                    ], upstream_body)
+
+                self._send(status, response_headers, upstream_body, head_only=method == "HEAD")
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_HEAD(self):
+                self._handle("HEAD")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_PUT(self):
+                self._handle("PUT")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+            def log_message(self, format, *args):
+                proxy.logger.debug(format % args)
+
+        return CachingProxyHandler
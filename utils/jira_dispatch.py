@@ -0,0 +1,234 @@
+"""
+Jira Ticket Dispatch
+Creates failure tickets from a background thread pool so test teardown never
+waits on Jira, and deduplicates them: each failure is reduced to a fingerprint
+(hash of its normalized traceback) and a persistent index maps fingerprints to
+the issue opened for them. A failure that was already reported - by another
+test of this run, by another xdist worker or in an earlier run - is added as a
+comment on that issue instead of opening a new one, so forty tests failing on
+the same outage produce one ticket.
+"""
+
+import re
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from config import Config
+from utils.rate_limiter import _file_lock
+from utils.result_stream import is_failure
+
+# Parts of a traceback that change between runs of the same failure
+_VOLATILE_PATTERNS = [
+    (re.compile(r"0x[0-9a-fA-F]+"), "0x?"),                                    # object addresses
+    (re.compile(r"\b[0-9a-f]{16,}\b"), "<id>"),                                # session/element ids
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?"), "<time>"),  # timestamps
+    (re.compile(r"(\.py):\d+"), r"\1"),                                        # line numbers
+    (re.compile(r"\bline \d+"), "line ?"),
+    (re.compile(r"\d+(\.\d+)?"), "<n>"),                                       # timings, counts, ports
+    (re.compile(r"[ \t]+"), " "),
+]
+
+
+def normalize_traceback(error: str) -> str:
+    """
+    The stable part of a pytest failure text. Only the "E   ..." lines and the
+    "file.py:123: ExceptionType" locations are kept when present (pytest's
+    source excerpts move with every edit), then volatile values are masked.
+    """
+    lines = [line for line in (error or "").splitlines()
+             if line.startswith("E ") or re.match(r"^\S+\.py:\d+: \w", line)]
+    text = "\n".join(lines) if lines else (error or "")
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def failure_fingerprint(error: str) -> str:
+    """
+    Stable id of a failure: same error message raised at the same place (file
+    and exception type) -> same fingerprint, whichever test hit it
+    """
+    digest = hashlib.sha256(normalize_traceback(error).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def failure_from_result(result: Dict) -> Dict:
+    """Failure dict for a test result line of utils.result_stream"""
+    return {
+        'test_name': result['nodeid'],
+        'error': result['longrepr'],
+        'timestamp': result['timestamp'],
+        'browser': result.get('browser'),
+        'screenshot': result.get('screenshot')
+    }
+
+
+class FingerprintIndex:
+    """
+    Fingerprint -> issue key, stored as JSON next to the project and shared by
+    every process through a file lock. claim() additionally serialises work on
+    one fingerprint across threads and processes, so two workers hitting the
+    same failure cannot both open an issue for it.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or Config.JIRA_FINGERPRINT_INDEX)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_dir = self.path.with_name(self.path.name + ".locks")
+        self.lock_dir.mkdir(exist_ok=True)
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        self._thread_locks_guard = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked_entries(self):
+        """Read-modify-write the whole index under the index file lock"""
+        with open(self.path.with_name(self.path.name + ".lock"), "a+") as handle:
+            with _file_lock(handle):
+                entries = self._read()
+                yield entries
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def claim(self, fingerprint: str):
+        """Exclusive ownership of one fingerprint while it is looked up and reported"""
+        with self._thread_locks_guard:
+            thread_lock = self._thread_locks.setdefault(fingerprint, threading.Lock())
+        with thread_lock:
+            with open(self.lock_dir / f"{fingerprint}.lock", "a+") as handle:
+                with _file_lock(handle):
+                    yield
+
+    def lookup(self, fingerprint: str) -> Optional[Dict]:
+        return self._read().get(fingerprint)
+
+    def record(self, fingerprint: str, issue_key: str, test_name: str):
+        now = datetime.now().isoformat()
+        with self._locked_entries() as entries:
+            entry = entries.setdefault(fingerprint, {"first_seen": now, "occurrences": 0})
+            entry.update(issue_key=issue_key, test_name=test_name, last_seen=now,
+                         occurrences=entry["occurrences"] + 1)
+
+    def forget(self, fingerprint: str):
+        with self._locked_entries() as entries:
+            entries.pop(fingerprint, None)
+
+
+class JiraDispatcher:
+    """
+    Bounded pool of Jira requests fed by submit(). The ticket creator is built
+    once, on the first dispatched failure, and shared by all requests - so the
+    Jira connection and custom field discovery happen once per process.
+
+    A failure is a dict with test_name, error and timestamp (plus optional
+    browser/platform/screenshot); see JiraTicketCreator.failure_description.
+    """
+
+    def __init__(self, creator_factory: Callable[[], object], index: FingerprintIndex = None,
+                 workers: int = None, deduplicate: bool = None):
+        self.creator_factory = creator_factory
+        self.deduplicate = Config.JIRA_DEDUPLICATE_FAILURES if deduplicate is None else deduplicate
+        self.index = (index or FingerprintIndex()) if self.deduplicate else None
+        self.executor = ThreadPoolExecutor(max_workers=workers or Config.JIRA_DISPATCH_WORKERS,
+                                           thread_name_prefix="jira-dispatch")
+        self.logger = logging.getLogger(__name__)
+        self._creator = None
+        self._creator_lock = threading.Lock()
+        self.stats = {"created": 0, "commented": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def creator(self):
+        with self._creator_lock:
+            if self._creator is None:
+                self._creator = self.creator_factory()
+            return self._creator
+
+    def submit(self, failure: Dict) -> Future:
+        """Queue one failure; the future resolves to the ticket info dict, or None if reporting failed"""
+        return self.executor.submit(self._dispatch, failure)
+
+    def dispatch_all(self, failures: List[Dict]) -> List[Dict]:
+        """Report failures concurrently and return the ticket info of the successful ones, in order"""
+        futures = [self.submit(failure) for failure in failures]
+        return [result for result in (future.result() for future in futures) if result]
+
+    def dispatch_results(self, results: Iterable[Dict]) -> List[Dict]:
+        """
+        Queue every failed or errored test of a result stream as soon as it is
+        read (results may be utils.result_stream.follow_results of a running
+        suite) and return the ticket info once the stream has ended
+        """
+        futures = [self.submit(failure_from_result(result)) for result in results if is_failure(result)]
+        return [result for result in (future.result() for future in futures) if result]
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+    def _dispatch(self, failure: Dict) -> Optional[Dict]:
+        try:
+            if not self.deduplicate:
+                return self._create(failure, None)
+            fingerprint = failure_fingerprint(failure["error"])
+            with self.index.claim(fingerprint):
+                entry = self.index.lookup(fingerprint)
+                if entry:
+                    commented = self.creator.add_failure_comment(entry["issue_key"], failure, entry["occurrences"] + 1)
+                    if commented:
+                        self.index.record(fingerprint, entry["issue_key"], failure["test_name"])
+                        self._count("commented")
+                        print(f"Known failure in {failure['test_name']}: commented on {entry['issue_key']}")
+                        return self._ticket_info(failure, entry["issue_key"], "commented")
+                    if commented is False:
+                        self._count("failed")
+                        return None
+                    # None: the issue was deleted, moved or closed, report the failure afresh
+                    self.index.forget(fingerprint)
+                return self._create(failure, fingerprint)
+        except Exception as e:
+            self.logger.warning(f"Jira reporting failed for {failure.get('test_name')}: {e}")
+            self._count("failed")
+            return None
+
+    def _create(self, failure: Dict, fingerprint: Optional[str]) -> Optional[Dict]:
+        ticket = self.creator.create_failure_ticket(failure)
+        if not ticket:
+            self._count("failed")
+            print(f"Failed to create Jira ticket for test: {failure['test_name']}")
+            return None
+        if fingerprint:
+            self.index.record(fingerprint, ticket["key"], failure["test_name"])
+        self._count("created")
+        print(f"Created Jira ticket {ticket['key']} for test: {failure['test_name']}")
+        return self._ticket_info(failure, ticket["key"], "created")
+
+    def _ticket_info(self, failure: Dict, issue_key: str, action: str) -> Dict:
+        return {
+            'test_name': failure['test_name'],
+            'jira_key': issue_key,
+            'jira_url': f"{self.creator.jira_url}/browse/{issue_key}",
+            'timestamp': failure['timestamp'],
+            'action': action
+        }
+
+    def close(self, wait: bool = True):
+        """Finish queued reports (if wait) and stop the pool"""
+        self.executor.shutdown(wait=wait)
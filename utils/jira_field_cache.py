@@ -0,0 +1,91 @@
+"""
+Jira Field Cache
+Custom field ids discovered by JiraTicketCreator, stored on disk per Jira URL
+and project key so the conftest fixtures, run_tests_with_jira.py and the LLM web
+app rediscover them at most once per JIRA_FIELD_CACHE_TTL instead of on every
+connection. Entries can be dropped explicitly with invalidate() (or the
+--refresh-jira-fields flag of the runner scripts).
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from config import Config
+from utils.rate_limiter import _file_lock
+
+
+def _cache_key(jira_url: str, project_key: str) -> str:
+    return f"{jira_url.rstrip('/').lower()}|{project_key.upper()}"
+
+
+class JiraFieldCache:
+    """JSON file of {"<url>|<project>": {"fields": {...}, "discovered_at": epoch}} guarded by a file lock"""
+
+    def __init__(self, path: str = None, ttl: float = None):
+        self.path = Path(path or Config.JIRA_FIELD_CACHE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = Config.JIRA_FIELD_CACHE_TTL if ttl is None else ttl
+        self.logger = logging.getLogger(__name__)
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, entries: Dict[str, Dict]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _locked(self):
+        with open(self.path.with_name(self.path.name + ".lock"), "a+") as handle:
+            with _file_lock(handle):
+                yield
+
+    def get(self, jira_url: str, project_key: str) -> Optional[Dict[str, str]]:
+        """Cached fields, or None if there is no entry or it is older than the TTL"""
+        entry = self._read().get(_cache_key(jira_url, project_key))
+        if entry is None or time.time() - entry["discovered_at"] > self.ttl:
+            return None
+        return entry["fields"]
+
+    def get_or_discover(self, jira_url: str, project_key: str,
+                        discover: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """
+        Cached fields, discovering and storing them on a miss. The lock is held
+        while discovering so concurrent workers wait for one discovery instead
+        of each running their own. Exceptions from discover are not cached.
+        """
+        fields = self.get(jira_url, project_key)
+        if fields is not None:
+            return fields
+        with self._locked():
+            entries = self._read()
+            key = _cache_key(jira_url, project_key)
+            entry = entries.get(key)
+            if entry is not None and time.time() - entry["discovered_at"] <= self.ttl:
+                return entry["fields"]  # Another process discovered them while we waited
+            fields = discover()
+            entries[key] = {"fields": fields, "discovered_at": time.time()}
+            self._write(entries)
+            self.logger.info(f"Discovered Jira custom fields for {key}: {fields}")
+            return fields
+
+    def invalidate(self, jira_url: str = None, project_key: str = None):
+        """Drop the entry of one Jira URL and project, or every entry when called without arguments"""
+        with self._locked():
+            if jira_url is None:
+                entries = {}
+            else:
+                entries = self._read()
+                entries.pop(_cache_key(jira_url, project_key), None)
+            self._write(entries)
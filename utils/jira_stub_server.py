@@ -0,0 +1,189 @@
+"""
+Jira Stand-in Server
+A small in-memory imitation of the Jira REST API v2 - just the endpoints the
+ticket automation uses (server info, fields, search, create issue, get issue,
+comments) - so ticket dispatch and deduplication can be exercised locally:
+
+    python -m utils.jira_stub_server          # prints the URL to use as JIRA_URL
+"""
+
+import re
+import json
+import time
+import logging
+import threading
+from typing import Dict, List
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+_ISSUE_PATH = re.compile(r"^/rest/api/2/issue/([^/]+)$")
+_COMMENT_PATH = re.compile(r"^/rest/api/2/issue/([^/]+)/comment$")
+
+# Field list returned by /rest/api/2/field, named like the French project's custom fields
+DEFAULT_FIELDS = [
+    {"id": "summary", "name": "Summary", "custom": False},
+    {"id": "description", "name": "Description", "custom": False},
+    {"id": "priority", "name": "Priority", "custom": False},
+    {"id": "customfield_10037", "name": "Severity", "custom": True},
+    {"id": "customfield_10038", "name": "Custom Priority", "custom": True},
+]
+_FIELD_IDS = {field["id"] for field in DEFAULT_FIELDS}
+
+
+def _status(name: str, category: str) -> Dict:
+    """Status field of an issue; category is the statusCategory key (new, indeterminate or done)"""
+    return {"name": name, "statusCategory": {"key": category}}
+
+
+class JiraStubServer:
+    """
+    In-memory Jira on a local port. Created issues and comments are kept in
+    `issues` (key -> raw issue with a "comments" list) and every request is
+    appended to `requests` as (method, path), so callers can count round trips.
+    New issues are Open; set_status() moves one to another status.
+    """
+
+    def __init__(self, project_key: str = "QA", latency: float = 0.0, host: str = "127.0.0.1"):
+        self.project_key = project_key
+        self.latency = latency
+        self.host = host
+        self.issues: Dict[str, Dict] = {}
+        self.requests: List[tuple] = []
+        self._issue_counter = 0
+        self.url = None
+        self._server = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> "JiraStubServer":
+        self._server = ThreadingHTTPServer((self.host, 0), self._make_handler())
+        self._server.daemon_threads = True
+        self.url = f"http://{self.host}:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.logger.info(f"Jira stand-in server started at {self.url}")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def count(self, method: str, path_pattern: str) -> int:
+        """Number of requests with this method whose path matches the regex"""
+        return sum(1 for m, path in self.requests if m == method and re.search(path_pattern, path))
+
+    def _issue_json(self, key: str) -> Dict:
+        issue = self.issues[key]
+        return {"id": issue["id"], "key": key, "self": f"{self.url}/rest/api/2/issue/{issue['id']}",
+                "fields": {**issue["fields"], "comment": {"comments": issue["comments"],
+                                                          "total": len(issue["comments"])}}}
+
+    def _create_issue(self, fields: Dict) -> Dict:
+        with self._lock:
+            self._issue_counter += 1
+            issue_id = str(10000 + self._issue_counter)
+            key = f"{fields.get('project', {}).get('key', self.project_key)}-{self._issue_counter}"
+            self.issues[key] = {"id": issue_id, "fields": {**fields, "status": _status("Open", "new")},
+                                "comments": []}
+        return {"id": issue_id, "key": key, "self": f"{self.url}/rest/api/2/issue/{issue_id}"}
+
+    def set_status(self, key: str, name: str = "Closed", category: str = "done"):
+        """Move an issue to a status, e.g. set_status("QA-1", "Resolved") to simulate a fix"""
+        with self._lock:
+            self.issues[key]["fields"]["status"] = _status(name, category)
+
+    def _add_comment(self, key: str, body: str) -> Dict:
+        with self._lock:
+            comments = self.issues[key]["comments"]
+            comment = {"id": str(len(comments) + 1), "body": body,
+                       "self": f"{self.url}/rest/api/2/issue/{key}/comment/{len(comments) + 1}"}
+            comments.append(comment)
+        return comment
+
+    def _find_key(self, key_or_id: str):
+        if key_or_id in self.issues:
+            return key_or_id
+        return next((key for key, issue in self.issues.items() if issue["id"] == key_or_id), None)
+
+    def _make_handler(self):
+        stub = self
+
+        class JiraRequestHandler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_found(self):
+                self._reply(404, {"errorMessages": ["Issue does not exist or you do not have permission to see it."],
+                                  "errors": {}})
+
+            def _route(self, method: str):
+                path = urlparse(self.path).path.rstrip("/")
+                stub.requests.append((method, path))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+                if method == "GET" and path == "/rest/api/2/serverInfo":
+                    return self._reply(200, {"baseUrl": stub.url, "version": "9.4.0",
+                                             "versionNumbers": [9, 4, 0], "deploymentType": "Server"})
+                if method == "GET" and path == "/rest/api/2/field":
+                    return self._reply(200, DEFAULT_FIELDS)
+                if path == "/rest/api/2/search":
+                    return self._reply(200, {"startAt": 0, "maxResults": 1, "total": len(stub.issues),
+                                             "issues": [stub._issue_json(key) for key in list(stub.issues)[:1]]})
+                if method == "POST" and path == "/rest/api/2/issue":
+                    fields = payload.get("fields", {})
+                    unknown = [name for name in fields if name.startswith("customfield_") and name not in _FIELD_IDS]
+                    if unknown:
+                        # What Jira answers for a field that is not on the create screen
+                        return self._reply(400, {"errorMessages": [], "errors": {
+                            name: f"Field '{name}' cannot be set. It is not on the appropriate screen, or unknown."
+                            for name in unknown}})
+                    return self._reply(201, stub._create_issue(fields))
+
+                match = _COMMENT_PATH.match(path)
+                if match:
+                    key = stub._find_key(match.group(1))
+                    if key is None:
+                        return self._not_found()
+                    if method == "POST":
+                        return self._reply(201, stub._add_comment(key, payload.get("body", "")))
+                    comments = stub.issues[key]["comments"]
+                    return self._reply(200, {"comments": comments, "total": len(comments)})
+
+                match = _ISSUE_PATH.match(path)
+                if method == "GET" and match:
+                    key = stub._find_key(match.group(1))
+                    return self._reply(200, stub._issue_json(key)) if key else self._not_found()
+
+                self._reply(404, {"errorMessages": [f"No stand-in for {method} {path}"], "errors": {}})
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+            def log_message(self, format, *args):
+                stub.logger.debug(format % args)
+
+        return JiraRequestHandler
+
+
+if __name__ == "__main__":
+    server = JiraStubServer().start()
+    print(f"Jira stand-in running at {server.url} (JIRA_URL={server.url}); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"{len(server.issues)} issues created: " + ", ".join(
+            f"{key} ({len(issue['comments'])} comments)" for key, issue in server.issues.items()))
@@ -0,0 +1,222 @@
+"""
+Layout Probe
+Collects everything a responsive check needs in one execute_script call:
+bounding boxes, computed display/visibility/opacity and font size for a set of
+named locators, horizontal overflow (and which elements cause it), undersized
+tap targets, the document title and the amount of body text. Responsive tests
+then assert over the returned LayoutSnapshot in plain Python.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webdriver import WebDriver
+
+# Smallest comfortable touch target in CSS pixels (WCAG 2.5.5 / Apple HIG use 44)
+MIN_TAP_TARGET = 44
+MAX_ELEMENTS_PER_LOCATOR = 50
+MAX_REPORTED_OFFENDERS = 20
+
+_LAYOUT_PROBE_JS = """
+const [specs, maxPerLocator, minTap, maxOffenders] = arguments;
+const root = document.documentElement;
+// Layout viewport: what elements are laid out against (980px on mobile pages without a meta viewport)
+const viewportWidth = root.clientWidth;
+// Visual viewport in device CSS pixels: the breakpoint the device actually shows
+const vv = window.visualViewport;
+const deviceSize = vv ? [Math.round(vv.width * vv.scale), Math.round(vv.height * vv.scale)]
+                      : [window.innerWidth, window.innerHeight];
+
+function label(el) {
+    let text = el.tagName.toLowerCase();
+    if (el.id) text += '#' + el.id;
+    if (typeof el.className === 'string' && el.className.trim()) {
+        text += '.' + el.className.trim().split(/\\s+/).slice(0, 2).join('.');
+    }
+    return text;
+}
+
+function describe(el) {
+    const rect = el.getBoundingClientRect();
+    const style = getComputedStyle(el);
+    const visible = rect.width > 0 && rect.height > 0 && style.display !== 'none'
+        && style.visibility !== 'hidden' && parseFloat(style.opacity) > 0;
+    return {
+        tag: label(el),
+        x: rect.left + window.scrollX, y: rect.top + window.scrollY,
+        width: rect.width, height: rect.height,
+        display: style.display, visibility: style.visibility, opacity: parseFloat(style.opacity),
+        font_size: parseFloat(style.fontSize),
+        visible: visible,
+        fits_viewport: rect.left >= -1 && rect.right <= viewportWidth + 1,
+        text_length: visible ? (el.innerText || '').trim().length : 0
+    };
+}
+
+function query(spec) {
+    try {
+        if (spec.using === 'xpath') {
+            const found = document.evaluate(spec.value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < found.snapshotLength; i++) nodes.push(found.snapshotItem(i));
+            return nodes.filter(node => node.nodeType === Node.ELEMENT_NODE);
+        }
+        return Array.from(document.querySelectorAll(spec.value));
+    } catch (e) {
+        return [];  // an invalid selector matches nothing, as find_elements would report
+    }
+}
+
+const elements = {};
+const counts = {};
+for (const [name, spec] of Object.entries(specs)) {
+    const nodes = query(spec);
+    counts[name] = nodes.length;
+    elements[name] = nodes.slice(0, maxPerLocator).map(describe);
+}
+
+const horizontalOverflow = root.scrollWidth > root.clientWidth + 1;
+const overflowing = [];
+if (horizontalOverflow && document.body) {
+    // Report the outermost offenders only: their descendants overflow with them
+    for (const el of document.body.querySelectorAll('*')) {
+        if (overflowing.length >= maxOffenders) break;
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 || rect.right <= viewportWidth + 1) continue;
+        if (overflowing.some(entry => entry.node.contains(el))) continue;
+        overflowing.push({node: el, tag: label(el), right: rect.right});
+    }
+}
+
+const tapTargets = document.querySelectorAll(
+    'a[href], button, input:not([type=hidden]), select, textarea, [role=button], [onclick]');
+let visibleTargets = 0;
+const smallTargets = [];
+for (const el of tapTargets) {
+    const rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0 || getComputedStyle(el).visibility === 'hidden') continue;
+    visibleTargets++;
+    if ((rect.width < minTap || rect.height < minTap) && smallTargets.length < maxOffenders) {
+        smallTargets.push({tag: label(el), width: rect.width, height: rect.height});
+    }
+}
+
+return {
+    title: document.title,
+    viewport_width: deviceSize[0],
+    viewport_height: deviceSize[1],
+    layout_width: viewportWidth,
+    document_width: root.scrollWidth,
+    horizontal_overflow: horizontalOverflow,
+    overflowing_elements: overflowing.map(entry => ({tag: entry.tag, right: entry.right})),
+    tap_targets: visibleTargets,
+    small_tap_targets: smallTargets,
+    body_text_length: document.body ? document.body.innerText.trim().length : 0,
+    elements: elements,
+    counts: counts
+};
+"""
+
+# Locator strategies that are not CSS or XPath, expressed as CSS
+_CSS_EQUIVALENTS = {
+    By.ID: lambda value: f'[id="{value}"]',
+    By.NAME: lambda value: f'[name="{value}"]',
+    By.CLASS_NAME: lambda value: f".{value}",
+    By.TAG_NAME: lambda value: value,
+}
+
+
+def _spec(locator) -> Dict[str, str]:
+    """JS query spec for a CSS selector string or a (By, value) page-object locator"""
+    if isinstance(locator, str):
+        return {"using": "css", "value": locator}
+    by, value = locator
+    if by == By.XPATH:
+        return {"using": "xpath", "value": value}
+    if by in _CSS_EQUIVALENTS:
+        return {"using": "css", "value": _CSS_EQUIVALENTS[by](value)}
+    if by == By.CSS_SELECTOR:
+        return {"using": "css", "value": value}
+    raise ValueError(f"Locator strategy {by!r} is not supported by the layout probe")
+
+
+@dataclass
+class ElementLayout:
+    """Box and computed style of one matched element (coordinates are document CSS pixels)"""
+    tag: str
+    x: float
+    y: float
+    width: float
+    height: float
+    display: str
+    visibility: str
+    opacity: float
+    font_size: float
+    visible: bool
+    fits_viewport: bool
+    text_length: int
+
+
+@dataclass
+class LayoutSnapshot:
+    """Layout of the current page at the current viewport"""
+    title: str
+    viewport_width: int
+    viewport_height: int
+    layout_width: int
+    document_width: int
+    horizontal_overflow: bool
+    body_text_length: int
+    tap_targets: int
+    overflowing_elements: List[Dict] = field(default_factory=list)
+    small_tap_targets: List[Dict] = field(default_factory=list)
+    elements: Dict[str, List[ElementLayout]] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def visible(self, name: str) -> List[ElementLayout]:
+        return [element for element in self.elements.get(name, []) if element.visible]
+
+    def any_visible(self, name: str) -> bool:
+        return bool(self.visible(name))
+
+    def count(self, name: str) -> int:
+        """Total matches of the locator (elements holds at most MAX_ELEMENTS_PER_LOCATOR)"""
+        return self.counts.get(name, 0)
+
+    def text_length(self, name: str) -> int:
+        """Visible text length of the first visible match"""
+        visible = self.visible(name)
+        return visible[0].text_length if visible else 0
+
+    def min_font_size(self, name: str) -> float:
+        sizes = [element.font_size for element in self.visible(name)]
+        return min(sizes) if sizes else 0.0
+
+    def summary(self) -> str:
+        parts = [f"viewport {self.viewport_width}x{self.viewport_height}"]
+        if self.horizontal_overflow:
+            offenders = ", ".join(entry["tag"] for entry in self.overflowing_elements[:5])
+            parts.append(f"horizontal overflow to {self.document_width}px ({offenders})")
+        if self.small_tap_targets:
+            parts.append(f"{len(self.small_tap_targets)} of {self.tap_targets} tap targets under {MIN_TAP_TARGET}px")
+        return ", ".join(parts)
+
+
+class LayoutProbe:
+    """Takes LayoutSnapshots of the page loaded in a driver"""
+
+    def __init__(self, driver: WebDriver, min_tap_target: int = MIN_TAP_TARGET):
+        self.driver = driver
+        self.min_tap_target = min_tap_target
+
+    def snapshot(self, locators: Dict[str, object] = None) -> LayoutSnapshot:
+        """
+        Measure the page in one round trip. locators maps a name to a CSS selector
+        or a (By, value) tuple; their matches end up in snapshot.elements[name].
+        """
+        specs = {name: _spec(locator) for name, locator in (locators or {}).items()}
+        raw = self.driver.execute_script(_LAYOUT_PROBE_JS, specs, MAX_ELEMENTS_PER_LOCATOR,
+                                         self.min_tap_target, MAX_REPORTED_OFFENDERS)
+        elements = {name: [ElementLayout(**element) for element in matches]
+                    for name, matches in raw.pop("elements").items()}
+        return LayoutSnapshot(elements=elements, **raw)
@@ -0,0 +1,278 @@
+"""
+Performance Baseline Store
+Keeps every timing measured by the performance and stress tests in a local SQLite
+database, keyed by test, query, browser and git commit, and flags statistically
+significant regressions against a rolling baseline of earlier runs
+"""
+
+import os
+import math
+import uuid
+import random
+import sqlite3
+import logging
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from config import Config
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS measurements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id TEXT NOT NULL,
+        test TEXT NOT NULL,
+        query TEXT NOT NULL,
+        browser TEXT NOT NULL,
+        git_commit TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value REAL NOT NULL,
+        recorded_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_measurements_key
+        ON measurements (test, query, browser, metric, recorded_at);
+"""
+
+_git_commit = None
+
+
+def current_git_commit() -> str:
+    """Short hash of HEAD (GIT_COMMIT overrides it in CI), or 'unknown' outside a checkout"""
+    global _git_commit
+    if _git_commit is None:
+        _git_commit = os.getenv("GIT_COMMIT")
+    if _git_commit is None:
+        try:
+            _git_commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=Path(__file__).resolve().parent, capture_output=True, text=True, timeout=5
+            ).stdout.strip() or "unknown"
+        except (OSError, subprocess.SubprocessError):
+            _git_commit = "unknown"
+    return _git_commit
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q-th percentile (0-100) with linear interpolation between closest ranks"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _exact_u_upper_tail(m: int, n: int, u: float) -> float:
+    """
+    P(U >= u) under the null for samples of size m and n without ties. The counts
+    of arrangements per U value are the coefficients of the Gaussian binomial
+    [m+n choose m]_q = prod_{i=1..m} (1 - q^(n+i)) / (1 - q^i).
+    """
+    size = m * n + 1
+    counts = [1] + [0] * (size - 1)
+    for i in range(1, m + 1):
+        shift = n + i
+        for k in range(size - 1, shift - 1, -1):
+            counts[k] -= counts[k - shift]
+        for k in range(i, size):
+            counts[k] += counts[k - i]
+    return sum(counts[math.ceil(u):]) / math.comb(m + n, m)
+
+
+def mann_whitney_greater(current: Sequence[float], baseline: Sequence[float]) -> Tuple[float, float]:
+    """
+    One-sided Mann-Whitney U test that current tends to be larger than baseline.
+    Returns (U, p-value). Uses the exact distribution for small samples without
+    ties and the tie-corrected normal approximation otherwise.
+    """
+    m, n = len(current), len(baseline)
+    u = sum(1.0 if x > y else 0.5 if x == y else 0.0 for x in current for y in baseline)
+
+    combined = list(current) + list(baseline)
+    has_ties = len(set(combined)) < len(combined)
+    if not has_ties and m * n <= 10000:
+        return u, _exact_u_upper_tail(m, n, u)
+
+    tie_term = sum(count ** 3 - count for count in
+                   (combined.count(value) for value in set(combined)))
+    total = m + n
+    variance = m * n / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - m * n / 2 - 0.5) / math.sqrt(variance)  # continuity correction
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_difference_ci(current: Sequence[float], baseline: Sequence[float], q: float,
+                            iterations: int = 2000, confidence: float = 0.95,
+                            seed: int = 0) -> Tuple[float, float]:
+    """Percentile bootstrap CI for percentile(current, q) - percentile(baseline, q)"""
+    rng = random.Random(seed)
+    differences = sorted(
+        percentile(rng.choices(current, k=len(current)), q) - percentile(rng.choices(baseline, k=len(baseline)), q)
+        for _ in range(iterations)
+    )
+    tail = (1 - confidence) / 2 * 100
+    return percentile(differences, tail), percentile(differences, 100 - tail)
+
+
+@dataclass
+class RegressionResult:
+    """Comparison of one test/query/metric against its rolling baseline"""
+    test: str
+    query: str
+    metric: str
+    current_samples: int
+    baseline_samples: int
+    current_p50: float
+    current_p95: float
+    baseline_p50: Optional[float] = None
+    baseline_p95: Optional[float] = None
+    p_value: Optional[float] = None
+    p50_difference_ci: Optional[Tuple[float, float]] = None
+    p95_difference_ci: Optional[Tuple[float, float]] = None
+    regressed: bool = False
+    reason: str = ""
+
+    def summary(self) -> str:
+        label = f"{self.test} [{self.query}] {self.metric}" if self.query else f"{self.test} {self.metric}"
+        if self.baseline_p50 is None:
+            return f"{label}: p50 {self.current_p50:.2f}s - {self.reason}"
+        low, high = self.p50_difference_ci
+        return (f"{label}: p50 {self.current_p50:.2f}s vs baseline {self.baseline_p50:.2f}s "
+                f"(p95 {self.current_p95:.2f}s vs {self.baseline_p95:.2f}s, "
+                f"p50 diff 95% CI [{low:+.2f}, {high:+.2f}]s, p={self.p_value:.3f}, "
+                f"n={self.current_samples}/{self.baseline_samples}) - {self.reason}")
+
+
+class PerformanceBaselineStore:
+    """
+    SQLite results store. Each xdist worker opens its own connection; SQLite's
+    file locking serialises the writes.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or Config.PERF_BASELINE_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path), timeout=30)
+        self.connection.executescript(_SCHEMA)
+        self.logger = logging.getLogger(__name__)
+
+    def record(self, run_id: str, test: str, query: str, browser: str, metric: str,
+               values: Sequence[float], git_commit: str = None):
+        """Store one or more samples for a test/query/metric"""
+        git_commit = git_commit or current_git_commit()
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO measurements (run_id, test, query, browser, git_commit, metric, value, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, test, query, browser, git_commit, metric, value, now) for value in values]
+            )
+
+    def baseline(self, test: str, query: str, browser: str, metric: str,
+                 exclude_run_id: str = None, window: int = None) -> List[float]:
+        """The most recent `window` samples recorded by earlier runs"""
+        rows = self.connection.execute(
+            "SELECT value FROM measurements WHERE test = ? AND query = ? AND browser = ? AND metric = ? "
+            "AND run_id != ? ORDER BY recorded_at DESC, id DESC LIMIT ?",
+            (test, query, browser, metric, exclude_run_id or "", window or Config.PERF_BASELINE_WINDOW)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def compare(self, test: str, query: str, browser: str, metric: str, current: Sequence[float],
+                exclude_run_id: str = None, fallback_threshold: float = None) -> RegressionResult:
+        """
+        Flag a regression when current samples are significantly slower than the
+        baseline (one-sided Mann-Whitney, p < PERF_REGRESSION_ALPHA) and the median
+        slowed down by more than PERF_REGRESSION_MIN_EFFECT. While fewer than
+        PERF_BASELINE_MIN_SAMPLES baseline samples exist, the absolute
+        fallback_threshold (PERFORMANCE_THRESHOLD by default) is applied to the
+        median instead.
+        """
+        if fallback_threshold is None:
+            fallback_threshold = Config.PERFORMANCE_THRESHOLD
+        baseline = self.baseline(test, query, browser, metric, exclude_run_id)
+        result = RegressionResult(
+            test=test, query=query, metric=metric,
+            current_samples=len(current), baseline_samples=len(baseline),
+            current_p50=percentile(current, 50), current_p95=percentile(current, 95)
+        )
+
+        if len(baseline) < Config.PERF_BASELINE_MIN_SAMPLES:
+            result.regressed = result.current_p50 > fallback_threshold
+            result.reason = (f"collecting baseline ({len(baseline)}/{Config.PERF_BASELINE_MIN_SAMPLES} samples), "
+                             f"{'above' if result.regressed else 'within'} the "
+                             f"{fallback_threshold}s fallback threshold")
+            return result
+
+        result.baseline_p50 = percentile(baseline, 50)
+        result.baseline_p95 = percentile(baseline, 95)
+        _, result.p_value = mann_whitney_greater(current, baseline)
+        result.p50_difference_ci = bootstrap_difference_ci(current, baseline, 50)
+        result.p95_difference_ci = bootstrap_difference_ci(current, baseline, 95)
+
+        slowdown = (result.current_p50 - result.baseline_p50) / result.baseline_p50 if result.baseline_p50 else 0.0
+        significant = result.p_value < Config.PERF_REGRESSION_ALPHA
+        material = slowdown > Config.PERF_REGRESSION_MIN_EFFECT
+        result.regressed = significant and material
+        if result.regressed:
+            result.reason = f"REGRESSION: median {slowdown:+.0%} slower"
+        elif significant:
+            result.reason = f"slower ({slowdown:+.0%}) but below the {Config.PERF_REGRESSION_MIN_EFFECT:.0%} effect size"
+        else:
+            result.reason = "no significant change"
+        return result
+
+    def close(self):
+        self.connection.close()
+
+
+class PerformanceRecorder:
+    """
+    Per-test handle used by the performance_baseline fixture. Samples are buffered
+    while the test runs, compared against the baseline on demand, and written to
+    the store when the test finishes so they never count towards their own baseline.
+    """
+
+    def __init__(self, store: PerformanceBaselineStore, test: str, browser: str, run_id: str):
+        self.store = store
+        self.test = test
+        self.browser = browser
+        self.run_id = run_id
+        self.samples: Dict[Tuple[str, str], List[float]] = {}
+
+    def record(self, value: float, query: str = "", metric: str = "response_time"):
+        """Buffer one sample (seconds) for this test"""
+        self.samples.setdefault((query, metric), []).append(value)
+
+    def compare(self, fallback_threshold: float = None) -> List[RegressionResult]:
+        """
+        Compare every buffered query/metric against its baseline. fallback_threshold
+        (seconds) replaces PERFORMANCE_THRESHOLD while the baseline is being collected.
+        """
+        results = []
+        for (query, metric), values in self.samples.items():
+            result = self.store.compare(self.test, query, self.browser, metric, values, self.run_id,
+                                        fallback_threshold)
+            print(f"Baseline check: {result.summary()}")
+            results.append(result)
+        return results
+
+    def assert_no_regression(self, fallback_threshold: float = None):
+        """Fail the test if any buffered query/metric regressed against its baseline"""
+        regressions = [result for result in self.compare(fallback_threshold) if result.regressed]
+        assert not regressions, "Performance regression detected:\n" + "\n".join(
+            result.summary() for result in regressions
+        )
+
+    def flush(self):
+        """Persist the buffered samples"""
+        for (query, metric), values in self.samples.items():
+            self.store.record(self.run_id, self.test, query, self.browser, metric, values)
+        self.samples.clear()
+
+
+def new_run_id() -> str:
+    """Identifier shared by all workers of one pytest-xdist run (xdist exports it to each worker)"""
+    return os.getenv("PYTEST_XDIST_TESTRUNUID") or uuid.uuid4().hex
@@ -0,0 +1,128 @@
+"""
+Browser Performance Probe
+Reads Navigation Timing, Paint Timing, LCP and Resource Timing entries from the
+page in a single execute_script call, so performance checks can use what the
+browser measured instead of wall-clock time around WebDriver calls
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+
+# All times are milliseconds relative to navigation start, as reported by the browser
+_METRICS_SCRIPT = """
+    var nav = performance.getEntriesByType('navigation')[0] || null;
+    var paints = {};
+    performance.getEntriesByType('paint').forEach(function (entry) {
+        paints[entry.name] = entry.startTime;
+    });
+
+    // LCP entries are only exposed through an observer; buffered entries are
+    // available synchronously via takeRecords(). Browsers without LCP support throw.
+    var lcp = null;
+    try {
+        var observer = new PerformanceObserver(function () {});
+        observer.observe({type: 'largest-contentful-paint', buffered: true});
+        var records = observer.takeRecords();
+        observer.disconnect();
+        if (records.length) {
+            lcp = records[records.length - 1].startTime;
+        }
+    } catch (e) {}
+
+    return {
+        url: location.href,
+        navigation: nav && {
+            type: nav.type,
+            ttfb: nav.responseStart,
+            dom_content_loaded: nav.domContentLoadedEventEnd,
+            load: nav.loadEventEnd,
+            transfer_size: nav.transferSize
+        },
+        first_paint: paints['first-paint'] === undefined ? null : paints['first-paint'],
+        first_contentful_paint: paints['first-contentful-paint'] === undefined ? null : paints['first-contentful-paint'],
+        largest_contentful_paint: lcp,
+        resources: performance.getEntriesByType('resource').map(function (entry) {
+            return {
+                name: entry.name,
+                initiator_type: entry.initiatorType,
+                start: entry.startTime,
+                duration: entry.duration,
+                transfer_size: entry.transferSize
+            };
+        })
+    };
+"""
+
+
+@dataclass
+class PageMetrics:
+    """Browser-measured timings for one loaded document (milliseconds)"""
+    url: str
+    navigation_type: Optional[str] = None
+    ttfb: Optional[float] = None
+    dom_content_loaded: Optional[float] = None
+    load: Optional[float] = None
+    first_paint: Optional[float] = None
+    first_contentful_paint: Optional[float] = None
+    largest_contentful_paint: Optional[float] = None
+    transfer_size: Optional[int] = None
+    resources: List[Dict] = field(default_factory=list)
+
+    @property
+    def resource_count(self) -> int:
+        return len(self.resources)
+
+    def slowest_resources(self, count: int = 5) -> List[Dict]:
+        return sorted(self.resources, key=lambda r: r["duration"], reverse=True)[:count]
+
+    def summary(self) -> str:
+        def fmt(value):
+            return f"{value:.0f}ms" if value is not None else "n/a"
+        return (f"TTFB {fmt(self.ttfb)}, DCL {fmt(self.dom_content_loaded)}, load {fmt(self.load)}, "
+                f"FCP {fmt(self.first_contentful_paint)}, LCP {fmt(self.largest_contentful_paint)}, "
+                f"{self.resource_count} resources")
+
+
+class PerformanceProbe:
+    """
+    Collects PageMetrics for the document currently loaded in the driver.
+    Every capture is kept in history, one entry per navigation.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.history: List[PageMetrics] = []
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def last(self) -> Optional[PageMetrics]:
+        return self.history[-1] if self.history else None
+
+    def capture(self) -> Optional[PageMetrics]:
+        """Read all timing entries for the current document in one round trip"""
+        try:
+            raw = self.driver.execute_script(_METRICS_SCRIPT)
+        except WebDriverException as e:
+            self.logger.debug(f"Could not read performance entries: {e}")
+            return None
+
+        navigation = raw.get("navigation") or {}
+        metrics = PageMetrics(
+            url=raw["url"],
+            navigation_type=navigation.get("type"),
+            ttfb=navigation.get("ttfb"),
+            # Event end times stay 0 until the event has fired
+            dom_content_loaded=navigation.get("dom_content_loaded") or None,
+            load=navigation.get("load") or None,
+            first_paint=raw.get("first_paint"),
+            first_contentful_paint=raw.get("first_contentful_paint"),
+            largest_contentful_paint=raw.get("largest_contentful_paint"),
+            transfer_size=navigation.get("transfer_size"),
+            resources=raw.get("resources") or []
+        )
+        self.history.append(metrics)
+        self.logger.info(f"Page metrics for {metrics.url}: {metrics.summary()}")
+        return metrics
@@ -0,0 +1,152 @@
+"""
+Shared Rate Limiter
+Per-host token buckets stored in lock-protected files, so every page object and
+every pytest-xdist worker on the machine draws from the same request budget
+"""
+
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from config import Config
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def _file_lock(handle):
+    """Hold an exclusive OS-level lock on an open file (blocks until acquired)"""
+    if os.name == "nt":
+        handle.seek(0)
+        while True:
+            try:
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError:
+                continue  # LK_LOCK gives up after ~10s of contention; keep waiting
+        try:
+            yield
+        finally:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket per host. Bucket state (available tokens, last refill time and
+    throttling counters) lives in one small JSON file per host that is only read
+    and written while holding a file lock, which makes it safe across processes.
+    """
+
+    def __init__(self, state_dir: str = None, limits: Dict[str, Dict[str, float]] = None):
+        self.state_dir = Path(state_dir or Config.RATE_LIMIT_DIR)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.limits = limits if limits is not None else Config.RATE_LIMITS
+        self.logger = logging.getLogger(__name__)
+        # Counters for this process only; shared_stats() reports all processes
+        self.stats = {"requests": 0, "throttled_requests": 0, "throttled_seconds": 0.0}
+
+    def _limits_for(self, host: str) -> Dict[str, float]:
+        if host in self.limits:
+            return self.limits[host]
+        return {"burst": 1.0, "refill_per_second": 1.0 / Config.REQUEST_DELAY}
+
+    def _state_path(self, host: str) -> Path:
+        return self.state_dir / f"{host}.json"
+
+    @contextmanager
+    def _shared_state(self, host: str):
+        """Yield the host's bucket state under the file lock and persist changes on exit"""
+        path = self._state_path(host)
+        with open(path, "a+", encoding="utf-8") as handle:
+            with _file_lock(handle):
+                handle.seek(0)
+                raw = handle.read()
+                state = json.loads(raw) if raw.strip() else {}
+                yield state
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+
+    def acquire(self, host: Optional[str]) -> float:
+        """
+        Take one token for host, sleeping until it is available.
+        Returns the number of seconds spent throttled.
+        """
+        if not host or host in Config.RATE_LIMIT_EXEMPT_HOSTS or Config.RATE_LIMIT_DISABLED:
+            return 0.0  # about:blank, data: URLs, local servers and cache replay need no throttling
+
+        limits = self._limits_for(host)
+        burst = limits["burst"]
+        rate = limits["refill_per_second"]
+
+        with self._shared_state(host) as state:
+            now = time.time()
+            elapsed = max(0.0, now - state.get("updated", now))
+            tokens = min(burst, state.get("tokens", burst) + elapsed * rate)
+            # Reserve the token now, even if that drives the bucket negative: the
+            # deficit is the queue of callers that already hold a future slot
+            tokens -= 1
+            wait_time = -tokens / rate if tokens < 0 else 0.0
+            state["tokens"] = tokens
+            state["updated"] = now
+            state["requests"] = state.get("requests", 0) + 1
+            if wait_time > 0:
+                state["throttled_requests"] = state.get("throttled_requests", 0) + 1
+                state["throttled_seconds"] = state.get("throttled_seconds", 0.0) + wait_time
+
+        self.stats["requests"] += 1
+        if wait_time > 0:
+            self.stats["throttled_requests"] += 1
+            self.stats["throttled_seconds"] += wait_time
+            self.logger.debug(f"Rate limit: waiting {wait_time:.2f}s for {host}")
+            time.sleep(wait_time)
+        return wait_time
+
+    def acquire_for_url(self, url: str) -> float:
+        """Take one token for the host of url"""
+        return self.acquire(urlparse(url).hostname)
+
+    def shared_stats(self) -> Dict[str, Dict]:
+        """Throttling counters accumulated by every process, keyed by host"""
+        stats = {}
+        for path in self.state_dir.glob("*.json"):
+            with self._shared_state(path.stem) as state:
+                stats[path.stem] = {
+                    "requests": state.get("requests", 0),
+                    "throttled_requests": state.get("throttled_requests", 0),
+                    "throttled_seconds": state.get("throttled_seconds", 0.0)
+                }
+        return stats
+
+    def reset_counters(self):
+        """Zero the shared counters (bucket levels are kept so limits stay honoured)"""
+        for path in self.state_dir.glob("*.json"):
+            with self._shared_state(path.stem) as state:
+                for counter in ("requests", "throttled_requests", "throttled_seconds"):
+                    state.pop(counter, None)
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """Process-wide limiter instance"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = TokenBucketRateLimiter()
+    return _rate_limiter
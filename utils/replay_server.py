@@ -0,0 +1,154 @@
+"""
+Offline Replay Server
+Serves saved copies of the portal ("Save page as... complete" snapshots) from
+local HTTP servers, so tests can run without touching data.gov.tn
+"""
+
+import re
+import json
+import time
+import logging
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import Config
+
+# Browsers stamp saved pages with the URL they were saved from
+_SAVED_FROM_PATTERN = re.compile(rb"<!-- saved from url=\(\d+\)(\S+?) -->")
+
+# Saved-page asset folders contain a few extension-less files named after their type
+_EXTENSIONLESS_TYPES = {"css": "text/css", "js": "application/javascript"}
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _normalise_path(path: str) -> str:
+    path = unquote(path or "/")
+    return path if path.endswith("/") or "." in path.rsplit("/", 1)[-1] else path + "/"
+
+
+class ReplayServer:
+    """
+    One local HTTP server per recorded origin (data.gov.tn, catalog.data.gov.tn...).
+
+    Pages are discovered from the "saved from url" comment of every *.html file in
+    snapshot_dir, plus the optional replay_manifest.json which maps extra URLs to
+    snapshot files. Asset requests ("<page>_files/...") are served from the matching
+    folder, and absolute links to recorded origins are rewritten to the local servers.
+    """
+
+    MANIFEST_NAME = "replay_manifest.json"
+
+    def __init__(self, snapshot_dir: str = None, origins: List[str] = None,
+                 latency: float = None, host: str = "127.0.0.1"):
+        self.snapshot_dir = Path(snapshot_dir or Config.REPLAY_DIR).resolve()
+        self.origins = origins or [_origin(Config.BASE_URL), _origin(Config.CATALOG_URL_FR)]
+        self.latency = Config.REPLAY_LATENCY if latency is None else latency
+        self.host = host
+        self.pages: Dict[str, Dict[str, Path]] = {origin: {} for origin in self.origins}
+        self.local_origins: Dict[str, str] = {}
+        self._servers: List[ThreadingHTTPServer] = []
+        self.logger = logging.getLogger(__name__)
+        self._load_pages()
+
+    def _load_pages(self):
+        """Index saved pages by original origin and path"""
+        for html_file in self.snapshot_dir.glob("*.html"):
+            with open(html_file, "rb") as f:
+                match = _SAVED_FROM_PATTERN.search(f.read(2048))
+            if match:
+                self._register(match.group(1).decode("utf-8"), html_file)
+
+        manifest_path = self.snapshot_dir / self.MANIFEST_NAME
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            for url, file_name in manifest.get("pages", {}).items():
+                self._register(url, self.snapshot_dir / file_name)
+
+    def _register(self, url: str, html_file: Path):
+        origin = _origin(url)
+        if origin in self.pages:
+            self.pages[origin][_normalise_path(urlparse(url).path)] = html_file
+
+    def start(self) -> "ReplayServer":
+        for origin in self.origins:
+            server = ThreadingHTTPServer((self.host, 0), self._make_handler(origin))
+            server.daemon_threads = True
+            self.local_origins[origin] = f"http://{self.host}:{server.server_address[1]}"
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers.append(server)
+        self.logger.info(f"Replay server started: {self.local_origins}")
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+    def local_url(self, url: str) -> str:
+        """Translate a live URL into the equivalent replay URL"""
+        for origin, local in self.local_origins.items():
+            if url.startswith(origin):
+                return local + url[len(origin):]
+        return url
+
+    def _rewrite_links(self, body: bytes) -> bytes:
+        for origin, local in self.local_origins.items():
+            body = body.replace(origin.encode("utf-8"), local.encode("utf-8"))
+        return body
+
+    def resolve(self, origin: str, path: str) -> Optional[Path]:
+        """Find the snapshot file answering path on origin, or None"""
+        page = self.pages[origin].get(_normalise_path(path))
+        if page:
+            return page
+
+        # Assets are referenced relative to the page, so the "_files" folder can
+        # appear under any page path: serve from the folder segment onwards
+        parts = [part for part in unquote(path).split("/") if part]
+        for index, part in enumerate(parts):
+            if part.endswith("_files"):
+                assets_dir = (self.snapshot_dir / part).resolve()
+                candidate = (self.snapshot_dir / Path(*parts[index:])).resolve()
+                if assets_dir in candidate.parents and candidate.is_file():
+                    return candidate
+        return None
+
+    def _make_handler(self, origin: str):
+        replay = self
+
+        class ReplayRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if replay.latency:
+                    time.sleep(replay.latency)
+
+                file_path = replay.resolve(origin, urlparse(self.path).path)
+                if file_path is None:
+                    self.send_error(404, "Not recorded")
+                    return
+
+                body = file_path.read_bytes()
+                name = file_path.name[:-len(".download")] if file_path.name.endswith(".download") else file_path.name
+                content_type = mimetypes.guess_type(name)[0] or _EXTENSIONLESS_TYPES.get(name, "application/octet-stream")
+                if content_type == "text/html":
+                    body = replay._rewrite_links(body)
+                    content_type = "text/html; charset=utf-8"
+
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                replay.logger.debug(f"[{origin}] {format % args}")
+
+        return ReplayRequestHandler
@@ -0,0 +1,152 @@
+"""
+Result Stream
+A pytest plugin that appends one JSON line per finished test (nodeid, outcome,
+longrepr, duration, screenshot, browser) to a results file while the suite
+runs, once the test's teardown is done, and a reader that follows that file. Consumers such as the Jira ingestion
+in run_tests_with_jira.py act on failures as they happen instead of scraping
+the HTML report afterwards.
+
+Lines are written by the xdist controller only, so one file covers all workers.
+The first line is {"event": "session_start"} and the last {"event":
+"session_finish", "exitstatus": ...}; every other line is a test result.
+A test's duration is setup + call + teardown, as in conftest's duration
+history; a teardown error gets a line of its own with a duration of 0.
+"""
+
+import os
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator
+
+SESSION_START = "session_start"
+SESSION_FINISH = "session_finish"
+
+
+class ResultStreamPlugin:
+    """Registered by conftest when --result-stream is given"""
+
+    def __init__(self, path: str, browser: str = None):
+        self.path = Path(path)
+        self.browser = browser
+        self._file = None
+        # Phases of tests still running: nodeid -> seconds so far
+        self._durations: Dict[str, float] = {}
+        # Results waiting for their test's teardown: nodeid -> record
+        self._pending: Dict[str, Dict] = {}
+
+    def _emit(self, record: Dict):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def pytest_sessionstart(self, session):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._emit({"event": SESSION_START, "timestamp": datetime.now().isoformat()})
+
+    def pytest_runtest_logreport(self, report):
+        duration = self._durations.pop(report.nodeid, 0.0) + report.duration
+        if report.when != "teardown":
+            self._durations[report.nodeid] = duration
+            # A test's result is its call phase, or the setup phase when that did not pass
+            # (errors and skips); it is written once the teardown has been timed too
+            if report.when == "call" or not report.passed:
+                self._pending[report.nodeid] = self._record(report)
+            return
+
+        record = self._pending.pop(report.nodeid, None)
+        if record is not None:
+            record["duration"] = round(duration, 3)
+            self._emit(record)
+            duration = 0.0
+        # Teardown only reports when it errors
+        if report.failed:
+            record = self._record(report)
+            record["duration"] = round(duration, 3)
+            self._emit(record)
+
+    def _record(self, report) -> Dict:
+        if report.failed and report.when != "call":
+            outcome = "error"
+        elif report.skipped and hasattr(report, "wasxfail"):
+            outcome = "xfailed"
+        else:
+            outcome = report.outcome
+        node = getattr(report, "node", None)  # xdist sets the reporting worker on the controller
+        return {
+            "nodeid": report.nodeid,
+            "outcome": outcome,
+            "when": report.when,
+            "longrepr": report.longreprtext if not report.passed else "",
+            "duration": round(report.duration, 3),
+            "screenshot": getattr(report, "screenshot", None),
+            "browser": self.browser,
+            "worker": node.gateway.id if node is not None else None,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        if self._file:
+            for record in self._pending.values():  # Interrupted before their teardown
+                self._emit(record)
+            self._pending.clear()
+            self._emit({"event": SESSION_FINISH, "exitstatus": int(exitstatus),
+                        "timestamp": datetime.now().isoformat()})
+            self._file.close()
+            self._file = None
+
+
+def follow_results(path: str, process=None, poll_interval: float = 0.5) -> Iterator[Dict]:
+    """
+    Yield test results from a results file as they are written. Waits for the
+    file to appear, stops at the session_finish line, or - if process (a Popen)
+    is given - once it has exited and everything it wrote has been read.
+    """
+    path = Path(path)
+    handle = None
+    buffer = ""
+    exited = False
+    try:
+        while True:
+            if handle is None and path.exists():
+                handle = open(path, "r", encoding="utf-8")
+            chunk = handle.read() if handle else ""
+            if chunk:
+                buffer += chunk
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record.get("event") == SESSION_FINISH:
+                        return
+                    if "event" not in record:
+                        yield record
+                continue
+
+            if process is not None and process.poll() is not None:
+                if exited:
+                    return  # The run ended without finishing the stream (crash, interrupt)
+                exited = True  # Read once more: the last lines may have been written just before exiting
+                continue
+            time.sleep(poll_interval)
+    finally:
+        if handle:
+            handle.close()
+
+
+def read_results(path: str) -> Iterator[Dict]:
+    """Test results of a finished (or interrupted) run, without waiting for more"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if "event" not in record:
+                    yield record
+
+
+def is_failure(result: Dict) -> bool:
+    return result.get("outcome") in ("failed", "error")
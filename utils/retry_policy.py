@@ -0,0 +1,189 @@
+"""
+Retry Policy
+Classifies WebDriver failures and retries only the ones worth retrying, using
+exponential backoff with decorrelated jitter inside a per-call time budget
+"""
+
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+from selenium.common.exceptions import (
+    WebDriverException,
+    TimeoutException,
+    StaleElementReferenceException,
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    NoSuchElementException,
+    InvalidSelectorException,
+    InvalidArgumentException,
+    UnknownMethodException,
+)
+from config import Config
+
+# Failure classes
+TRANSIENT = "transient"  # Network hiccup or slow page load: back off, then retry
+STALE = "stale"          # DOM re-rendered under us: retry almost immediately
+PERMANENT = "permanent"  # Locator miss or programming error: retrying only wastes time
+
+# Fragments of WebDriver error messages that point at the network rather than the page
+_NETWORK_MARKERS = (
+    "net::err_", "connection refused", "connection reset", "timed out receiving message",
+    "page load", "unable to connect", "failed to establish", "remote end closed",
+)
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Map an exception raised by a page-object action to TRANSIENT, STALE or PERMANENT"""
+    if isinstance(exc, (StaleElementReferenceException, ElementClickInterceptedException,
+                        ElementNotInteractableException)):
+        return STALE
+    if isinstance(exc, TimeoutException):
+        # WebDriverWait raises a bare TimeoutException when a locator never matches;
+        # only page-load timeouts reported by the driver carry a network message
+        message = (exc.msg or "").lower()
+        return TRANSIENT if any(marker in message for marker in _NETWORK_MARKERS) else PERMANENT
+    if isinstance(exc, (NoSuchElementException, InvalidSelectorException, InvalidArgumentException,
+                        UnknownMethodException)):
+        return PERMANENT
+    if isinstance(exc, (WebDriverException, ConnectionError, OSError)):
+        return TRANSIENT
+    return PERMANENT
+
+
+@dataclass
+class RetryStats:
+    """Outcome of one call made through the retry policy"""
+    function: str
+    attempts: int = 0
+    succeeded: bool = False
+    failure_classes: List[str] = field(default_factory=list)
+    slept_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    gave_up_reason: str = ""
+
+
+@dataclass
+class RetryCounters:
+    """Running totals of RetryStats, kept instead of one record per call"""
+    calls: int = 0
+    retried_calls: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    slept_seconds: float = 0.0
+    failure_classes: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, stats: RetryStats):
+        self.calls += 1
+        self.retries += max(0, stats.attempts - 1)
+        self.retried_calls += stats.attempts > 1
+        self.gave_up += not stats.succeeded
+        self.slept_seconds += stats.slept_seconds
+        for failure_class in stats.failure_classes:
+            self.failure_classes[failure_class] = self.failure_classes.get(failure_class, 0) + 1
+
+    def merge(self, other: Dict):
+        """Add counters serialized with as_dict (e.g. from an xdist worker's report)"""
+        self.calls += other["calls"]
+        self.retried_calls += other["retried_calls"]
+        self.retries += other["retries"]
+        self.gave_up += other["gave_up"]
+        self.slept_seconds += other["slept_seconds"]
+        for failure_class, count in other["failure_classes"].items():
+            self.failure_classes[failure_class] = self.failure_classes.get(failure_class, 0) + count
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls, "retried_calls": self.retried_calls, "retries": self.retries,
+            "gave_up": self.gave_up, "slept_seconds": round(self.slept_seconds, 3),
+            "failure_classes": dict(self.failure_classes),
+        }
+
+
+# Totals for the test currently running in this process, handed over by take_retry_counters
+_pending_counters = RetryCounters()
+_pending_lock = threading.Lock()
+
+
+def record_retry_stats(stats: RetryStats):
+    """Fold the outcome of one call into this process's pending totals"""
+    with _pending_lock:
+        _pending_counters.add(stats)
+
+
+def take_retry_counters() -> RetryCounters:
+    """Return the totals recorded since the previous call and start new ones"""
+    global _pending_counters
+    with _pending_lock:
+        counters, _pending_counters = _pending_counters, RetryCounters()
+    return counters
+
+
+class RetryPolicy:
+    """
+    Runs a callable and retries it according to the class of the failure.
+
+    Sleep times follow "decorrelated jitter": each delay is drawn uniformly
+    between the base delay and three times the previous delay, capped at
+    max_delay, which spreads retries from parallel workers apart.
+    """
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None,
+                 max_delay: float = None, time_budget: float = None, stale_delay: float = 0.1):
+        self.max_attempts = max_attempts or Config.MAX_RETRIES
+        self.base_delay = base_delay if base_delay is not None else Config.RETRY_DELAY
+        self.max_delay = max_delay if max_delay is not None else Config.RETRY_MAX_DELAY
+        self.time_budget = time_budget if time_budget is not None else Config.RETRY_TIME_BUDGET
+        self.stale_delay = stale_delay
+        self.logger = logging.getLogger(__name__)
+
+    def _next_delay(self, failure_class: str, previous_delay: float) -> float:
+        if failure_class == STALE:
+            return self.stale_delay
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous_delay * 3)))
+
+    def run(self, func: Callable, stats: RetryStats, before_attempt: Callable[[str], None] = None):
+        """
+        Call func until it succeeds, fails permanently, runs out of attempts or
+        exhausts the time budget. before_attempt receives the class of the
+        previous failure (None on the first attempt) and is used for rate limiting.
+        """
+        start = time.monotonic()
+        delay = self.base_delay
+        failure_class = None
+
+        try:
+            while True:
+                stats.attempts += 1
+                if before_attempt:
+                    before_attempt(failure_class)
+                try:
+                    result = func()
+                    stats.succeeded = True
+                    return result
+                except Exception as e:
+                    failure_class = classify_exception(e)
+                    stats.failure_classes.append(failure_class)
+
+                    if failure_class == PERMANENT:
+                        stats.gave_up_reason = f"permanent failure: {type(e).__name__}"
+                        raise
+                    if stats.attempts >= self.max_attempts:
+                        stats.gave_up_reason = f"max attempts ({self.max_attempts}) reached"
+                        raise
+
+                    delay = self._next_delay(failure_class, delay)
+                    if time.monotonic() - start + delay > self.time_budget:
+                        stats.gave_up_reason = f"time budget ({self.time_budget}s) exhausted"
+                        raise
+
+                    self.logger.info(
+                        f"Retry attempt {stats.attempts}/{self.max_attempts} for {stats.function} "
+                        f"after {failure_class} failure ({type(e).__name__}), sleeping {delay:.2f}s"
+                    )
+                    time.sleep(delay)
+                    stats.slept_seconds += delay
+        finally:
+            stats.elapsed_seconds = time.monotonic() - start
@@ -0,0 +1,191 @@
+"""
+Screenshot Writer
+Takes the PNG bytes from the driver on the test thread and leaves everything
+else - downsampling, compression and the disk write - to a small background
+thread pool. Identical frames are stored once (by content hash) and the
+directory is kept under SCREENSHOT_MAX_BYTES by evicting the least recently
+used screenshots. Under pytest-xdist every worker evicts on its own, so each
+gets an equal share of the budget, and a dedupe hit on a file another worker
+has evicted writes the frame again.
+"""
+
+import io
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from pathlib import Path
+from typing import Dict, List, Set
+from config import Config
+
+# Stored files end in the first hex digits of the SHA-256 of the frame, so later runs dedupe too
+_HASH_LENGTH = 16
+_HASHED_NAME = re.compile(rf"_([0-9a-f]{{{_HASH_LENGTH}}})\.png$")
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class ScreenshotWriter:
+    """
+    Content-addressed, size-bounded screenshot store. capture() returns the
+    final path right away; the file appears once the background write is done
+    (flush() waits for all pending writes).
+    """
+
+    def __init__(self, directory: str = "reports/screenshots", max_bytes: int = None,
+                 max_width: int = None, workers: int = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = Config.SCREENSHOT_MAX_BYTES // int(os.getenv("PYTEST_XDIST_WORKER_COUNT", 1))
+        self.max_bytes = max_bytes
+        self.max_width = max_width if max_width is not None else Config.SCREENSHOT_MAX_WIDTH
+        self.executor = ThreadPoolExecutor(max_workers=workers or Config.SCREENSHOT_WORKERS,
+                                           thread_name_prefix="screenshot-writer")
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending: List[Future] = []
+        # Queued paths not written yet: dedupe hits on them are expected to be missing on disk
+        self._writing: Set[Path] = set()
+        self._by_hash: Dict[str, Path] = {}
+        # path -> bytes on disk, least recently used first
+        self._files: "OrderedDict[Path, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._pillow_missing_logged = False
+        self.stats = {"captured": 0, "deduplicated": 0, "written": 0, "evicted": 0, "failed": 0}
+        self._index_existing()
+
+    def _index_existing(self):
+        """Pick up screenshots of earlier runs so they count towards the budget and the dedupe index"""
+        existing = sorted(self.directory.glob("*.png"), key=lambda path: path.stat().st_mtime)
+        for path in existing:
+            size = path.stat().st_size
+            self._files[path] = size
+            self._total_bytes += size
+            match = _HASHED_NAME.search(path.name)
+            if match:
+                self._by_hash[match.group(1)] = path
+
+    def capture(self, driver, name: str) -> str:
+        """Grab a screenshot from the driver and queue it for writing; returns its path"""
+        return self.submit(driver.get_screenshot_as_png(), name)
+
+    def submit(self, png: bytes, name: str) -> str:
+        """Queue PNG bytes for writing under `name`, or return the stored copy of an identical frame"""
+        digest = hashlib.sha256(png).hexdigest()[:_HASH_LENGTH]
+        with self._lock:
+            self.stats["captured"] += 1
+            existing = self._by_hash.get(digest)
+            if existing is not None and (existing in self._writing or existing.exists()):
+                self.stats["deduplicated"] += 1
+                if existing in self._files:
+                    self._files.move_to_end(existing)
+                return str(existing)
+            if existing is not None:
+                self._forget(existing)  # Evicted by another worker: store the frame again
+
+            safe_name = re.sub(r"[^\w.-]+", "_", name)[:150]
+            path = self.directory / f"{safe_name}_{digest}.png"
+            self._by_hash[digest] = path
+            self._writing.add(path)
+            future = self.executor.submit(self._write, png, path, digest)
+            self._pending = [pending for pending in self._pending if not pending.done()] + [future]
+        return str(path)
+
+    def _encode(self, png: bytes) -> bytes:
+        """Downsample to max_width and recompress when enabled and Pillow is installed"""
+        if not self.max_width:
+            return png
+        try:
+            from PIL import Image
+        except ImportError:
+            if not self._pillow_missing_logged:
+                self.logger.warning("SCREENSHOT_MAX_WIDTH needs Pillow (pip install Pillow); keeping full-size screenshots")
+                self._pillow_missing_logged = True
+            return png
+
+        with Image.open(io.BytesIO(png)) as image:
+            if image.width <= self.max_width:
+                return png
+            height = round(image.height * self.max_width / image.width)
+            resized = image.resize((self.max_width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue()
+
+    def _write(self, png: bytes, path: Path, digest: str):
+        try:
+            data = self._encode(png)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.warning(f"Failed to write screenshot {path}: {e}")
+            with self._lock:
+                self.stats["failed"] += 1
+                self._writing.discard(path)
+                self._by_hash.pop(digest, None)
+            return
+
+        with self._lock:
+            self.stats["written"] += 1
+            self._writing.discard(path)
+            self._total_bytes += len(data) - self._files.pop(path, 0)
+            self._files[path] = len(data)
+            self._evict()
+
+    def _forget(self, path: Path):
+        """Drop a file that is gone from disk from the budget and the dedupe index (lock held)"""
+        self._total_bytes -= self._files.pop(path, 0)
+        match = _HASHED_NAME.search(path.name)
+        if match and self._by_hash.get(match.group(1)) == path:
+            del self._by_hash[match.group(1)]
+
+    def _evict(self):
+        """Delete least recently used screenshots until the directory fits the budget (lock held)"""
+        while self._total_bytes > self.max_bytes and len(self._files) > 1:
+            path, size = self._files.popitem(last=False)
+            self._total_bytes -= size
+            self.stats["evicted"] += 1
+            match = _HASHED_NAME.search(path.name)
+            if match and self._by_hash.get(match.group(1)) == path:
+                del self._by_hash[match.group(1)]
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass  # Another worker evicted it first
+
+    def flush(self, timeout: float = None):
+        """Wait for every queued screenshot to be on disk"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        wait(pending, timeout=timeout)
+
+    def close(self):
+        self.flush()
+        self.executor.shutdown(wait=True)
+        self.logger.info(f"Screenshot writer closed - stats: {self.stats}")
+
+
+def get_screenshot_writer() -> ScreenshotWriter:
+    """Process-wide writer writing to reports/screenshots"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ScreenshotWriter()
+        return _writer
+
+
+def close_screenshot_writer():
+    """Finish pending writes at the end of the session (no-op if nothing was captured)"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
@@ -3,8 +3,10 @@ Standardized UI Monitoring System
 Provides automatic monitoring for all UI interactions without repeated code
 """
 
+import time
 import functools
-from typing import Callable, Any
+from datetime import datetime
+from typing import Callable, Any, List, Union
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -24,10 +26,19 @@ class MonitoringDecorator:
         self.ui_monitor = ui_monitor
         self.doc_system = doc_system
 
-    def auto_monitor_interactions(self, element_locator: tuple = None):
+    def auto_monitor_interactions(self, element_locator: Union[tuple, List[tuple]] = None):
         """
-        Decorator that automatically monitors before and after UI interactions
+        Decorator that automatically monitors before and after UI interactions.
+        element_locator may be a single locator or a list of locators; all of them
+        are captured together in one WebDriver round trip before and after the action.
         """
+        if element_locator and isinstance(element_locator, list):
+            locators = element_locator
+        elif element_locator:
+            locators = [element_locator]
+        else:
+            locators = []
+
         def decorator(func: Callable) -> Callable:
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
@@ -37,40 +48,47 @@ class MonitoringDecorator:
                 if not driver:
                     return func(*args, **kwargs)  # No monitoring if no driver
                 
-                # Capture before state if element_locator is provided
-                before_state = None
-                if element_locator:
-                    before_state = self.ui_monitor.capture_element_state(element_locator)
-                
+                # Capture before state if element locators are provided
+                before_states = []
+                if locators:
+                    before_states = self.ui_monitor.capture_element_states(locators)
+
                 # Execute the original function
+                start = time.monotonic()
                 result = func(*args, **kwargs)
-                
-                # Capture after state if element_locator is provided
-                after_state = None
-                if element_locator:
+
+                # Capture after state once the elements and the page have settled
+                after_states = []
+                settle = None
+                if locators:
                     try:
-                        # Wait a bit for changes to occur
-                        import time
-                        time.sleep(0.5)
-                        after_state = self.ui_monitor.capture_element_state(element_locator)
+                        settle = self.ui_monitor.wait_for_settle(locators)
+                        after_states = settle['states']
                     except:
                         pass  # It's ok if we can't capture after state
-                
-                # Create documentation record
-                if element_locator and before_state and after_state:
-                    change = UIStateChange(
-                        timestamp=after_state['timestamp'],
-                        element_locator=str(element_locator),
-                        event_type="interaction",
-                        duration=0.5,  # Approximate
-                        initial_state=before_state,
-                        final_state=after_state,
-                        success=True,
-                        test_name=func.__name__,
-                        page_url=driver.current_url
-                    )
-                    self.doc_system.record_change(change)
-                
+                duration = time.monotonic() - start
+
+                # Create documentation records
+                if before_states and after_states:
+                    page_url = driver.current_url
+                    notes = (f"Settled in {settle['elapsed_seconds']:.2f}s "
+                             f"({'settled' if settle['settled'] else 'not settled'}, "
+                             f"{settle['mutations']} DOM mutations, {settle['resources']} requests)")
+                    for locator, before_state, after_state in zip(locators, before_states, after_states):
+                        change = UIStateChange(
+                            timestamp=after_state['timestamp'],
+                            element_locator=str(locator),
+                            event_type="interaction",
+                            duration=duration,  # Action plus settling time
+                            initial_state=before_state,
+                            final_state=after_state,
+                            success=True,
+                            test_name=func.__name__,
+                            page_url=page_url,
+                            notes=notes
+                        )
+                        self.doc_system.record_change(change)
+
                 return result
             return wrapper
         return decorator
@@ -86,20 +104,22 @@ class MonitoringDecorator:
                 
                 # Monitor loading indicators after the action
                 if hasattr(args[0], 'driver'):
-                    all_disappeared, details = self.ui_monitor.wait_for_loading_indicators_to_disappear()
+                    watch = self.ui_monitor.watch_loading_indicators()
+                    all_disappeared = watch['quiescent']
                     
                     # Record loading state change
                     change = UIStateChange(
-                        timestamp=details.get('timestamp', str(func.__name__)),
+                        timestamp=datetime.now().isoformat(),
                         element_locator="Loading Indicators",
                         event_type="loading_disappearance",
-                        duration=1.0,  # Approximate
-                        initial_state={"loading_visible": not all_disappeared},
+                        duration=watch['elapsed_seconds'],
+                        initial_state={"loading_visible": any(
+                            state['initially_visible'] for state in watch['indicators'].values())},
                         final_state={"loading_disappeared": all_disappeared},
                         success=all_disappeared,
                         test_name=func.__name__,
                         page_url=args[0].driver.current_url,
-                        notes=f"Loading indicators monitoring: {details}"
+                        notes=f"Loading indicators monitoring: {watch['indicators']}"
                     )
                     self.doc_system.record_change(change)
                 
@@ -116,34 +136,37 @@ class MonitoringDecorator:
             def wrapper(*args, **kwargs):
                 result = func(*args, **kwargs)
                 
-                # Look for images that might have loaded after the action
+                # Audit every image on the page after the action in one round trip
                 if hasattr(args[0], 'driver'):
                     driver = args[0].driver
-                    img_elements = driver.find_elements(By.TAG_NAME, 'img')
-                    
-                    for i, img in enumerate(img_elements[:5]):  # Check first 5 images to avoid too many checks
-                        try:
-                            # Create a locator for the specific image
-                            img_locator = (By.XPATH, f"//img[{i+1}]")
-                            img_result = self.ui_monitor.monitor_image_loading(img_locator, timeout=2)
-                            
-                            # Record image loading result
-                            change = UIStateChange(
-                                timestamp=img_result.get('final_state', {}).get('timestamp', str(func.__name__)),
-                                element_locator=str(img_locator),
-                                event_type="image_load",
-                                duration=2.0,  # Approximate
-                                initial_state=img_result.get('initial_state', {}),
-                                final_state=img_result.get('final_state', {}),
-                                success=img_result.get('image_loaded', False),
-                                test_name=func.__name__,
-                                page_url=driver.current_url,
-                                notes="Real image load verification"
-                            )
-                            self.doc_system.record_change(change)
-                        except Exception:
-                            continue  # Skip if image check fails
-                
+                    try:
+                        audit = self.ui_monitor.audit_images(timeout=2)
+                    except Exception:
+                        return result  # Skip if the page cannot run the audit
+
+                    page_url = driver.current_url
+                    for image in audit['images']:
+                        if image['loaded']:
+                            notes = f"Loaded {image['current_src']}"
+                        elif image['decode_pending']:
+                            notes = f"Still loading after {audit['elapsed_seconds']:.2f}s: {image['src']}"
+                        else:
+                            notes = f"Failed to render: {image['src']} ({image['decode_error'] or 'no image data'})"
+                        change = UIStateChange(
+                            timestamp=audit['timestamp'],
+                            element_locator=str(image['locator']),
+                            event_type="image_load",
+                            duration=image['decode_seconds'] if image['decode_seconds'] is not None
+                            else audit['elapsed_seconds'],
+                            initial_state=image['initial_state'],
+                            final_state=image['final_state'],
+                            success=image['loaded'],
+                            test_name=func.__name__,
+                            page_url=page_url,
+                            notes=notes
+                        )
+                        self.doc_system.record_change(change)
+
                 return result
             return wrapper
         return decorator
@@ -1,14 +1,22 @@
 """
 UI Change Documentation System
-Creates comprehensive reports of UI state changes during testing
+Creates comprehensive reports of UI state changes during testing.
+Changes are streamed to a JSONL file by a background writer thread and reports
+are built by reading that file back, so memory stays bounded however long the
+session runs. Each pytest-xdist worker writes its own shard; merge_shards()
+combines them on the controller.
 """
 
-import os
 import json
+import heapq
+import queue
+import logging
+import threading
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterator, Any, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from config import worker_name
 
 @dataclass
 class UIStateChange:
@@ -25,84 +33,151 @@ class UIStateChange:
     notes: str = ""
 
 
+_STOP = object()  # Tells the writer thread to finish
+
+# Per-worker shard files: ui_changes_stream_<worker>.jsonl plus its counters
+STREAM_PREFIX = "ui_changes_stream_"
+SUMMARY_PREFIX = "ui_changes_summary_"
+
+
 class UIDocumentationSystem:
     """
     Comprehensive system to document UI state changes with reports and analysis
     """
-    
-    def __init__(self, report_dir: str = "reports/ui_changes"):
+
+    # Producers block once this many changes are waiting to be written
+    MAX_PENDING_CHANGES = 10000
+
+    def __init__(self, report_dir: str = "reports/ui_changes", shard: str = None):
         self.report_dir = Path(report_dir)
         self.report_dir.mkdir(parents=True, exist_ok=True)
-        self.changes: List[UIStateChange] = []
         self.session_start = datetime.now()
-        
+        # One shard per test process: xdist worker, cross-browser shard or "main"
+        self.shard = shard or worker_name()
+        self.logger = logging.getLogger(__name__)
+
+        # Summary counters, updated as changes arrive
+        self._counters_lock = threading.Lock()
+        self.event_counts: Dict[str, int] = {}
+        self.total_changes = 0
+        self.successful_changes = 0
+        self.total_duration = 0.0
+
+        self.stream_path = self.report_dir / f"{STREAM_PREFIX}{self.shard}.jsonl"
+        self.summary_path = self.report_dir / f"{SUMMARY_PREFIX}{self.shard}.json"
+        self._stream = open(self.stream_path, 'w', encoding='utf-8')
+        self._pending: queue.Queue = queue.Queue(maxsize=self.MAX_PENDING_CHANGES)
+        self._writer = threading.Thread(target=self._write_changes, name="ui-documentation-writer", daemon=True)
+        self._writer.start()
+
+    def _write_changes(self):
+        """Writer thread: append queued changes to the JSONL stream"""
+        while True:
+            item = self._pending.get()
+            try:
+                if item is _STOP:
+                    return
+                self._stream.write(json.dumps(item, ensure_ascii=False) + "\n")
+                if self._pending.empty():
+                    self._stream.flush()  # Flush per burst rather than per change
+            except (OSError, TypeError, ValueError) as e:
+                self.logger.warning(f"Could not write UI change: {e}")
+            finally:
+                self._pending.task_done()
+
     def record_change(self, change: UIStateChange):
         """Record a UI state change"""
-        self.changes.append(change)
-        
+        with self._counters_lock:
+            self.event_counts[change.event_type] = self.event_counts.get(change.event_type, 0) + 1
+            self.total_changes += 1
+            self.total_duration += change.duration
+            if change.success:
+                self.successful_changes += 1
+        self._pending.put(asdict(change))
+
+    def flush(self):
+        """Wait until every recorded change is on disk"""
+        if self._writer.is_alive():
+            self._pending.join()
+            self._stream.flush()
+
+    def close(self):
+        """Stop the writer thread, close the stream and save the shard's counters"""
+        if self._writer.is_alive():
+            self._pending.put(_STOP)
+            self._writer.join()
+        if not self._stream.closed:
+            self._stream.close()
+            with self._counters_lock, open(self.summary_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "session_start": self.session_start.isoformat(),
+                    "event_counts": self.event_counts,
+                    "total_changes": self.total_changes,
+                    "successful_changes": self.successful_changes,
+                    "total_duration": self.total_duration
+                }, f)
+
+    def iter_changes(self) -> Iterator[Dict]:
+        """Stream recorded changes back from disk, in recording order"""
+        self.flush()
+        with open(self.stream_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
     def generate_report(self, test_session_name: str = "default_session") -> str:
         """Generate a comprehensive report of all UI changes"""
-        report_data = {
-            "session_info": {
-                "session_name": test_session_name,
-                "start_time": self.session_start.isoformat(),
-                "end_time": datetime.now().isoformat(),
-                "duration": str(datetime.now() - self.session_start),
-                "total_changes": len(self.changes)
-            },
-            "changes": [asdict(change) for change in self.changes],
-            "summary": self._generate_summary()
+        end_time = datetime.now()
+        session_info = {
+            "session_name": test_session_name,
+            "start_time": self.session_start.isoformat(),
+            "end_time": end_time.isoformat(),
+            "duration": str(end_time - self.session_start),
+            "total_changes": self.total_changes
         }
-        
+        summary = self._generate_summary()
+
         # Write JSON report
         json_report_path = self.report_dir / f"ui_changes_{test_session_name}.json"
-        with open(json_report_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
-        
+        self._write_json_report(session_info, summary, self.iter_changes(), json_report_path)
+
         # Write human-readable report
         md_report_path = self.report_dir / f"ui_changes_{test_session_name}.md"
-        self._write_markdown_report(report_data, md_report_path)
-        
+        self._write_markdown_report(session_info, summary, self.iter_changes(), md_report_path)
+
         return str(json_report_path)
-    
+
     def _generate_summary(self) -> Dict[str, Any]:
         """Generate summary statistics for the session"""
-        if not self.changes:
-            return {"message": "No UI state changes recorded"}
-        
-        # Count by event type
-        event_counts = {}
-        total_duration = 0
-        successful_changes = 0
-        
-        for change in self.changes:
-            event_counts[change.event_type] = event_counts.get(change.event_type, 0) + 1
-            total_duration += change.duration
-            if change.success:
-                successful_changes += 1
-        
-        avg_duration = total_duration / len(self.changes) if self.changes else 0
-        
-        return {
-            "event_type_counts": event_counts,
-            "successful_changes": successful_changes,
-            "total_changes": len(self.changes),
-            "success_rate": f"{(successful_changes / len(self.changes) * 100):.1f}%" if self.changes else "0%",
-            "average_duration": f"{avg_duration:.2f}s",
-            "total_duration": f"{total_duration:.2f}s"
-        }
-    
-    def _write_markdown_report(self, report_data: Dict, output_path: Path):
+        with self._counters_lock:
+            return summarize_counters(dict(self.event_counts), self.total_changes,
+                                      self.successful_changes, self.total_duration)
+
+    @staticmethod
+    def _write_json_report(session_info: Dict, summary: Dict, changes: Iterator[Dict], output_path: Path):
+        """Write the JSON report one change at a time"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('{\n  "session_info": ')
+            f.write(json.dumps(session_info, ensure_ascii=False))
+            f.write(',\n  "summary": ')
+            f.write(json.dumps(summary, ensure_ascii=False))
+            f.write(',\n  "changes": [')
+            for i, change in enumerate(changes):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(change, ensure_ascii=False))
+            f.write("\n  ]\n}\n")
+
+    @staticmethod
+    def _write_markdown_report(session_info: Dict, summary: Dict, changes: Iterator[Dict], output_path: Path):
         """Write a human-readable markdown report"""
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(f"# UI State Change Report\n\n")
-            f.write(f"**Session**: {report_data['session_info']['session_name']}\n")
-            f.write(f"**Start Time**: {report_data['session_info']['start_time']}\n")
-            f.write(f"**End Time**: {report_data['session_info']['end_time']}\n")
-            f.write(f"**Duration**: {report_data['session_info']['duration']}\n\n")
-            
+            f.write(f"**Session**: {session_info['session_name']}\n")
+            f.write(f"**Start Time**: {session_info['start_time']}\n")
+            f.write(f"**End Time**: {session_info['end_time']}\n")
+            f.write(f"**Duration**: {session_info['duration']}\n\n")
+
             # Summary
-            summary = report_data['summary']
             f.write("## Summary\n")
             if 'message' in summary:
                 f.write(f"{summary['message']}\n\n")
@@ -111,53 +186,145 @@ class UIDocumentationSystem:
                 f.write(f"- Successful Changes: {summary['successful_changes']}\n")
                 f.write(f"- Success Rate: {summary['success_rate']}\n")
                 f.write(f"- Average Duration: {summary['average_duration']}\n")
-                
+
                 f.write("\n### Changes by Type:\n")
                 for event_type, count in summary['event_type_counts'].items():
                     f.write(f"- {event_type}: {count}\n")
                 f.write("\n")
-            
+
             # Detailed changes
             f.write("## Detailed Changes\n")
-            for i, change in enumerate(report_data['changes'], 1):
+            for i, change in enumerate(changes, 1):
                 f.write(f"### Change {i}\n")
                 f.write(f"- **Element**: `{change['element_locator']}`\n")
-                f.write(f"- **Event**: {change['event_type']}\n") 
+                f.write(f"- **Event**: {change['event_type']}\n")
                 f.write(f"- **Duration**: {change['duration']:.2f}s\n")
                 f.write(f"- **Success**: {'✓' if change['success'] else '✗'}\n")
                 f.write(f"- **URL**: {change['page_url']}\n")
                 if change['notes']:
                     f.write(f"- **Notes**: {change['notes']}\n")
                 f.write("\n")
-    
+
     def create_visual_timeline(self) -> str:
-        """Create a visual timeline of UI changes"""
-        if not self.changes:
+        """
+        Create a visual timeline of UI changes. Changes are listed in recording
+        order, which is chronological within one process.
+        """
+        if not self.total_changes:
             return "No changes to visualize"
-        
-        # Sort changes by timestamp
-        sorted_changes = sorted(self.changes, key=lambda x: x.timestamp)
-        
+
         timeline_file = self.report_dir / "ui_timeline.md"
         with open(timeline_file, 'w', encoding='utf-8') as f:
             f.write("# UI Change Timeline\n\n")
-            
-            for change in sorted_changes:
-                status_icon = "✅" if change.success else "❌"
-                f.write(f"{status_icon} **{change.event_type.upper()}** - `{change.element_locator}`\n")
-                f.write(f"  *{change.timestamp} - Duration: {change.duration:.2f}s*\n")
-                f.write(f"  *URL: {change.page_url}*\n\n")
-        
+
+            for change in self.iter_changes():
+                status_icon = "✅" if change['success'] else "❌"
+                f.write(f"{status_icon} **{change['event_type'].upper()}** - `{change['element_locator']}`\n")
+                f.write(f"  *{change['timestamp']} - Duration: {change['duration']:.2f}s*\n")
+                f.write(f"  *URL: {change['page_url']}*\n\n")
+
         return str(timeline_file)
 
 
+def remove_shards(report_dir: str = "reports/ui_changes"):
+    """Delete shards left by a previous run (which may have used more workers)"""
+    for pattern in (f"{STREAM_PREFIX}*.jsonl", f"{SUMMARY_PREFIX}*.json"):
+        for path in Path(report_dir).glob(pattern):
+            path.unlink()
+
+
+def _read_shard(path: Path, shard: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                change = json.loads(line)
+                change["worker"] = shard
+                yield change
+
+
+def _merged_changes(shards: Dict[str, Path]) -> Iterator[Dict]:
+    """
+    K-way merge of the shards by timestamp. Each shard is already in recording
+    order, so only one pending change per shard is held in memory.
+    """
+    return heapq.merge(*(_read_shard(path, shard) for shard, path in shards.items()),
+                       key=lambda change: change["timestamp"])
+
+
+def merge_shards(report_dir: str = "reports/ui_changes",
+                 test_session_name: str = "session_final") -> Optional[str]:
+    """
+    Combine every worker shard in report_dir into one JSON and markdown report.
+    Returns the JSON report path, or None when no shard was written.
+    """
+    report_dir = Path(report_dir)
+    shards = {path.name[len(STREAM_PREFIX):-len(".jsonl")]: path
+              for path in sorted(report_dir.glob(f"{STREAM_PREFIX}*.jsonl"))}
+    if not shards:
+        return None
+
+    event_counts: Dict[str, int] = {}
+    total_changes = successful_changes = 0
+    total_duration = 0.0
+    session_start = None
+    for shard in shards:
+        summary_path = report_dir / f"{SUMMARY_PREFIX}{shard}.json"
+        if not summary_path.exists():
+            continue  # Worker crashed before closing: its changes are merged, not counted
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            counters = json.load(f)
+        for event_type, count in counters["event_counts"].items():
+            event_counts[event_type] = event_counts.get(event_type, 0) + count
+        total_changes += counters["total_changes"]
+        successful_changes += counters["successful_changes"]
+        total_duration += counters["total_duration"]
+        session_start = min(session_start or counters["session_start"], counters["session_start"])
+
+    end_time = datetime.now()
+    start_time = datetime.fromisoformat(session_start) if session_start else end_time
+    session_info = {
+        "session_name": test_session_name,
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "duration": str(end_time - start_time),
+        "total_changes": total_changes,
+        "workers": list(shards)
+    }
+    summary = summarize_counters(event_counts, total_changes, successful_changes, total_duration)
+
+    json_report_path = report_dir / f"ui_changes_{test_session_name}.json"
+    UIDocumentationSystem._write_json_report(session_info, summary, _merged_changes(shards), json_report_path)
+    md_report_path = report_dir / f"ui_changes_{test_session_name}.md"
+    UIDocumentationSystem._write_markdown_report(session_info, summary, _merged_changes(shards), md_report_path)
+    return str(json_report_path)
+
+
+def summarize_counters(event_counts: Dict[str, int], total_changes: int,
+                       successful_changes: int, total_duration: float) -> Dict[str, Any]:
+    """Summary statistics from incrementally maintained counters"""
+    if not total_changes:
+        return {"message": "No UI state changes recorded"}
+
+    avg_duration = total_duration / total_changes
+
+    return {
+        "event_type_counts": event_counts,
+        "successful_changes": successful_changes,
+        "total_changes": total_changes,
+        "success_rate": f"{(successful_changes / total_changes * 100):.1f}%",
+        "average_duration": f"{avg_duration:.2f}s",
+        "total_duration": f"{total_duration:.2f}s"
+    }
+
+
 # Example usage and testing
 if __name__ == "__main__":
     doc_system = UIDocumentationSystem()
-    
+
     # Example of how this would be used in a test
     print("UI Documentation System created successfully")
     print("To use in tests:")
     print("1. Create a UIDocumentationSystem instance")
-    print("2. Record UI changes using doc_system.record_change()") 
-    print("3. Generate reports with doc_system.generate_report()")
\ No newline at end of file
+    print("2. Record UI changes using doc_system.record_change()")
+    print("3. Generate reports with doc_system.generate_report()")
+    doc_system.close()
@@ -12,10 +12,262 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from config import Config
 
 
+# In-page is_displayed: rendered, not visibility:hidden and not fully transparent.
+# Shared by the monitoring scripts and the page objects' snapshot scripts.
+IS_DISPLAYED_JS = """
+    function isDisplayed(el) {
+        if (el.checkVisibility) {
+            return el.checkVisibility({visibilityProperty: true, opacityProperty: true});
+        }
+        var style = window.getComputedStyle(el);
+        return el.getClientRects().length > 0 && style.visibility !== 'hidden'
+            && style.opacity !== '0';
+    }
+"""
+
+# In-page equivalent of find_elements, plus isDisplayed, shared by the monitoring scripts
+_LOCATOR_HELPERS_JS = IS_DISPLAYED_JS + """
+    function locateAll(by, value) {
+        switch (by) {
+            case 'css selector': return Array.from(document.querySelectorAll(value));
+            case 'id': return Array.from(document.querySelectorAll('[id="' + CSS.escape(value) + '"]'));
+            case 'name': return Array.from(document.getElementsByName(value));
+            case 'class name': return Array.from(document.getElementsByClassName(value));
+            case 'tag name': return Array.from(document.getElementsByTagName(value));
+            case 'xpath':
+                var result = document.evaluate(value, document, null,
+                    XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                var nodes = [];
+                for (var i = 0; i < result.snapshotLength; i++) {
+                    nodes.push(result.snapshotItem(i));
+                }
+                return nodes;
+            case 'link text':
+            case 'partial link text':
+                return Array.from(document.getElementsByTagName('a')).filter(function (link) {
+                    var linkText = (link.innerText || '').trim();
+                    return by === 'link text' ? linkText === value : linkText.indexOf(value) !== -1;
+                });
+        }
+        throw new Error('Unsupported locator strategy: ' + by);
+    }
+"""
+
+# Snapshot of the first element matching each locator, with the fields capture_element_state
+# used to gather with one WebDriver command per property
+_SNAPSHOT_HELPERS_JS = _LOCATOR_HELPERS_JS + """
+    function snapshotAll(locators) {
+        return locators.map(function (locator) {
+            var el = locateAll(locator[0], locator[1])[0];
+            if (!el) {
+                return null;
+            }
+            var displayed = isDisplayed(el);
+            return {
+                is_displayed: displayed,
+                is_enabled: !(el.matches && el.matches(':disabled')),
+                // Like WebElement.text, hidden elements report no text
+                text: displayed ? (el.innerText || '').trim().substring(0, 100) : '',
+                tag_name: el.tagName.toLowerCase(),
+                'class': el.getAttribute('class') || '',
+                id: el.getAttribute('id') || ''
+            };
+        });
+    }
+"""
+
+# Waits for the page to settle after an action. Activity is any DOM mutation, any resource
+# finishing (PerformanceObserver) or a change in the watched elements' snapshots. Settled means
+# the elements and the page have both been quiet for quiet_ms; pages with endless background
+# activity (carousels, polling) count as settled once the elements alone have been stable for
+# four times as long. The callback also carries the final element snapshots.
+_SETTLE_WATCHER_JS = _SNAPSHOT_HELPERS_JS + """
+    var locators = arguments[0], timeoutMs = arguments[1], quietMs = arguments[2];
+    var done = arguments[arguments.length - 1];
+    var start = performance.now(), lastActivity = start, lastStateChange = start;
+    var mutations = 0, resources = 0, finished = false;
+    var signature = JSON.stringify(snapshotAll(locators));
+
+    // Requests that completed between the action and this script count as recent activity
+    performance.getEntriesByType('resource').forEach(function (entry) {
+        lastActivity = Math.max(lastActivity, entry.responseEnd);
+    });
+
+    var mutationObserver = new MutationObserver(function (records) {
+        mutations += records.length;
+        lastActivity = performance.now();
+    });
+    mutationObserver.observe(document.documentElement,
+        {subtree: true, childList: true, attributes: true, characterData: true});
+
+    var resourceObserver = null;
+    try {
+        resourceObserver = new PerformanceObserver(function (list) {
+            resources += list.getEntries().length;
+            lastActivity = performance.now();
+        });
+        resourceObserver.observe({type: 'resource'});
+    } catch (e) {}
+
+    var interval = setInterval(function () {
+        if (finished) { return; }
+        var now = performance.now();
+        var current = JSON.stringify(snapshotAll(locators));
+        if (current !== signature) {
+            signature = current;
+            lastStateChange = lastActivity = now;
+        }
+        var pageQuiet = now - lastActivity >= quietMs;
+        var elementsQuiet = now - lastStateChange >= quietMs;
+        if ((elementsQuiet && pageQuiet) || now - lastStateChange >= quietMs * 4 || now - start >= timeoutMs) {
+            finished = true;
+            clearInterval(interval);
+            mutationObserver.disconnect();
+            if (resourceObserver) { resourceObserver.disconnect(); }
+            done({
+                settled: elementsQuiet,
+                page_quiet: pageQuiet,
+                elapsed_ms: now - start,
+                mutations: mutations,
+                resources: resources,
+                states: snapshotAll(locators)
+            });
+        }
+    }, 25);
+"""
+
+# Audits every <img> in one round trip: load state at the start, optionally the outcome of
+# img.decode() for all images in parallel (bounded by one overall deadline), and the resource
+# timing of each image's current source.
+_IMAGE_AUDIT_JS = _LOCATOR_HELPERS_JS + """
+    var waitForDecode = arguments[0], deadlineMs = arguments[1];
+    var done = arguments[arguments.length - 1];
+    var start = performance.now();
+    var images = Array.from(document.images);
+
+    function describe(img) {
+        return {
+            complete: img.complete,
+            natural_width: img.naturalWidth,
+            natural_height: img.naturalHeight,
+            current_src: img.currentSrc || null,
+            displayed: isDisplayed(img)
+        };
+    }
+
+    var reports = images.map(function (img, i) {
+        var timing = img.currentSrc ? performance.getEntriesByName(img.currentSrc)[0] : null;
+        return {
+            index: i,
+            src: img.getAttribute('src'),
+            alt: img.getAttribute('alt'),
+            lazy: img.loading === 'lazy',
+            initial: describe(img),
+            final: null,
+            load_ms: timing ? timing.duration : null,
+            decode_ms: null,
+            decode_error: null,
+            decode_pending: false
+        };
+    });
+
+    var finished = false;
+    function finish() {
+        if (finished) { return; }
+        finished = true;
+        images.forEach(function (img, i) { reports[i].final = describe(img); });
+        done({elapsed_ms: performance.now() - start, images: reports});
+    }
+
+    if (!waitForDecode || !images.length || !HTMLImageElement.prototype.decode) {
+        finish();
+        return;
+    }
+
+    var pending = images.length;
+    images.forEach(function (img, i) {
+        reports[i].decode_pending = true;
+        img.decode().then(function () {
+            reports[i].decode_ms = performance.now() - start;
+        }, function (error) {
+            reports[i].decode_error = String(error && error.message || error);
+        }).then(function () {
+            reports[i].decode_pending = false;
+            if (--pending === 0) { finish(); }
+        });
+    });
+    setTimeout(finish, deadlineMs);
+"""
+
+# Watches every loading indicator at once. A MutationObserver re-checks on DOM changes and a
+# short interval catches CSS-only transitions; the callback fires once no indicator has been
+# visible for settle_ms, or when the overall deadline passes.
+_LOADING_WATCHER_JS = _LOCATOR_HELPERS_JS + """
+    var locators = arguments[0], timeoutMs = arguments[1], settleMs = arguments[2];
+    var done = arguments[arguments.length - 1];
+    var start = performance.now(), lastBusy = 0, finished = false, busy = false;
+    var states = locators.map(function () {
+        return {initially_visible: null, visible: false, appeared_at_ms: null,
+                disappeared_at_ms: null, error: null};
+    });
+    var observer = null, interval = null;
+
+    function finish(now) {
+        finished = true;
+        if (observer) { observer.disconnect(); }
+        clearInterval(interval);
+        done({elapsed_ms: now, quiescent: !busy, indicators: states});
+    }
+
+    function check() {
+        if (finished) { return; }
+        var now = performance.now() - start;
+        busy = false;
+        locators.forEach(function (locator, i) {
+            var state = states[i], visible;
+            try {
+                visible = locateAll(locator[0], locator[1]).some(isDisplayed);
+            } catch (e) {
+                state.error = String(e);
+                return;
+            }
+            if (state.initially_visible === null) { state.initially_visible = visible; }
+            if (visible && !state.visible) {
+                if (state.appeared_at_ms === null) { state.appeared_at_ms = now; }
+                state.disappeared_at_ms = null;
+            } else if (!visible && state.visible) {
+                state.disappeared_at_ms = now;
+            }
+            state.visible = visible;
+            busy = busy || visible;
+        });
+        if (busy) { lastBusy = now; }
+        if ((!busy && now - lastBusy >= settleMs) || now >= timeoutMs) { finish(now); }
+    }
+
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true});
+    interval = setInterval(check, 50);
+    check();
+"""
+
+# Time left after an in-page deadline for the final callback to reach the driver
+_SCRIPT_DEADLINE_MARGIN = 2.0
+
+
+def _script_deadline_ms(timeout: float) -> float:
+    """
+    In-page deadline for an async watcher script. The drivers' script timeout is set
+    once to Config.SCRIPT_TIMEOUT, so longer watches are capped instead of having
+    the timeout changed and restored around every call.
+    """
+    return min(timeout, Config.SCRIPT_TIMEOUT - _SCRIPT_DEADLINE_MARGIN) * 1000
+
+
 class UIStateMonitor:
     """
     Monitors and documents UI state changes including elements appearing/disappearing
@@ -56,8 +308,99 @@ class UIStateMonitor:
         )
         self.logger = logging.getLogger(__name__)
     
+    # Resolves each [by, value] locator in the page and returns the same fields
+    # capture_element_state used to gather with one WebDriver command per property.
+    _SNAPSHOT_SCRIPT = _SNAPSHOT_HELPERS_JS + """
+        return snapshotAll(arguments[0]);
+    """
+
+    @staticmethod
+    def _missing_element_state(timestamp: str) -> Dict:
+        return {
+            'exists': False,
+            'is_displayed': False,
+            'is_enabled': False,
+            'text': '',
+            'tag_name': None,
+            'class': '',
+            'id': '',
+            'timestamp': timestamp,
+            'screenshot': None
+        }
+
     def capture_element_state(self, locator: Tuple[By, str]) -> Dict:
-        """Capture the current state of an element with zero implicit wait for performance"""
+        """Capture the current state of an element in a single WebDriver round trip"""
+        return self.capture_element_states([locator])[0]
+
+    def capture_element_states(self, locators: List[Tuple[By, str]]) -> List[Dict]:
+        """
+        Capture the state of several elements with one execute_script call.
+        Returns one state dict per locator, in the same order.
+        """
+        try:
+            snapshots = self.driver.execute_script(self._SNAPSHOT_SCRIPT, [list(loc) for loc in locators])
+        except WebDriverException as e:
+            # Pages with a broken JS context (or exotic locator strategies) fall back to native calls
+            self.logger.debug(f"JS snapshot failed, using WebDriver calls: {e}")
+            return [self._capture_element_state_native(locator) for locator in locators]
+
+        return self._states_from_snapshots(snapshots)
+
+    def _states_from_snapshots(self, snapshots: List[Optional[Dict]]) -> List[Dict]:
+        timestamp = datetime.now().isoformat()
+        states = []
+        for snapshot in snapshots:
+            if snapshot is None:
+                states.append(self._missing_element_state(timestamp))
+            else:
+                states.append({
+                    'exists': True,
+                    **snapshot,
+                    'timestamp': timestamp,
+                    'screenshot': None  # Will be added if needed
+                })
+        return states
+
+    def wait_for_settle(self, locators: List[Tuple[By, str]], timeout: float = None,
+                        quiet_time: float = None) -> Dict:
+        """
+        Wait, inside the page, until the watched elements and the page stop changing
+        (no DOM mutations and no finished network requests for quiet_time seconds),
+        then capture the elements' states in the same round trip.
+        Returns the states plus how long settling took. If the script cannot run
+        (for example because the action started a navigation), the states are
+        captured directly and 'settled' is False.
+        """
+        timeout = Config.SETTLE_TIMEOUT if timeout is None else timeout
+        quiet_time = Config.SETTLE_QUIET_TIME if quiet_time is None else quiet_time
+        start = time.monotonic()
+
+        try:
+            raw = self.driver.execute_async_script(
+                _SETTLE_WATCHER_JS, [list(loc) for loc in locators], _script_deadline_ms(timeout), quiet_time * 1000
+            )
+        except WebDriverException as e:
+            self.logger.debug(f"Settle detection unavailable, capturing states directly: {e}")
+            return {
+                'settled': False,
+                'page_quiet': False,
+                'elapsed_seconds': time.monotonic() - start,
+                'mutations': None,
+                'resources': None,
+                'states': self.capture_element_states(locators)
+            }
+
+        return {
+            'settled': raw['settled'],
+            'page_quiet': raw['page_quiet'],
+            'elapsed_seconds': raw['elapsed_ms'] / 1000,
+            'mutations': raw['mutations'],
+            'resources': raw['resources'],
+            'states': self._states_from_snapshots(raw['states'])
+        }
+
+    def _capture_element_state_native(self, locator: Tuple[By, str]) -> Dict:
+        """Capture element state through individual WebDriver commands with zero implicit wait"""
         # Use context manager to temporarily disable implicit wait for instant checks
         with self._no_implicit_wait():
             elements = self.driver.find_elements(*locator)
@@ -75,17 +418,7 @@ class UIStateMonitor:
                     'screenshot': None  # Will be added if needed
                 }
         # If we exit the context manager, it means elements is empty
-        return {
-            'exists': False,
-            'is_displayed': False,
-            'is_enabled': False,
-            'text': '',
-            'tag_name': None,
-            'class': '',
-            'id': '',
-            'timestamp': datetime.now().isoformat(),
-            'screenshot': None
-        }
+        return self._missing_element_state(datetime.now().isoformat())
     
     def monitor_element_disappearance(self, locator: Tuple[By, str], timeout: int = 10) -> Dict:
         """Monitor an element's disappearance and document the state change"""
@@ -167,50 +500,98 @@ class UIStateMonitor:
                 'reason': f'Element did not appear within {timeout}s'
             }
     
-    def monitor_loading_states(self, loading_indicators: List[Tuple[By, str]] = None) -> Dict:
+    # Common loading indicators across websites
+    DEFAULT_LOADING_INDICATORS = [
+        (By.CSS_SELECTOR, ".loading"),
+        (By.CSS_SELECTOR, ".spinner"),
+        (By.CSS_SELECTOR, ".loading-spinner"),
+        (By.CSS_SELECTOR, ".progress"),
+        (By.CSS_SELECTOR, "[data-loading='true']"),
+        (By.CSS_SELECTOR, ".wait"),
+        (By.CSS_SELECTOR, ".in-progress"),
+        (By.CSS_SELECTOR, ".processing")
+    ]
+
+    def watch_loading_indicators(self, loading_indicators: List[Tuple[By, str]] = None,
+                                 timeout: float = 10, settle_time: float = 0.3) -> Dict:
+        """
+        Watch all loading indicators in parallel inside the page.
+        Returns as soon as none of them has been visible for settle_time seconds,
+        or after timeout seconds overall, with per-indicator appear/disappear timestamps
+        (seconds since the watch started).
+        """
+        if loading_indicators is None:
+            loading_indicators = self.DEFAULT_LOADING_INDICATORS
+
+        raw = self.driver.execute_async_script(
+            _LOADING_WATCHER_JS,
+            [list(loc) for loc in loading_indicators],
+            _script_deadline_ms(timeout),
+            settle_time * 1000
+        )
+
+        def to_seconds(ms):
+            return ms / 1000 if ms is not None else None
+
+        indicators = {}
+        for locator, state in zip(loading_indicators, raw['indicators']):
+            indicators[str(locator)] = {
+                'initially_visible': bool(state['initially_visible']),
+                'appeared': state['appeared_at_ms'] is not None,
+                'appeared_at_seconds': to_seconds(state['appeared_at_ms']),
+                'disappeared_at_seconds': to_seconds(state['disappeared_at_ms']),
+                'visible_at_end': state['visible'],
+                'error': state['error']
+            }
+
+        return {
+            'quiescent': raw['quiescent'],
+            'elapsed_seconds': raw['elapsed_ms'] / 1000,
+            'indicators': indicators
+        }
+
+    def monitor_loading_states(self, loading_indicators: List[Tuple[By, str]] = None,
+                               timeout: float = 10) -> Dict:
         """Monitor common loading indicators and document their behavior"""
         if loading_indicators is None:
-            # Common loading indicators across websites
-            loading_indicators = [
-                (By.CSS_SELECTOR, ".loading"),
-                (By.CSS_SELECTOR, ".spinner"),
-                (By.CSS_SELECTOR, ".loading-spinner"),
-                (By.CSS_SELECTOR, ".progress"),
-                (By.CSS_SELECTOR, "[data-loading='true']"),
-                (By.CSS_SELECTOR, ".wait"),
-                (By.CSS_SELECTOR, ".in-progress"),
-                (By.CSS_SELECTOR, ".processing")
-            ]
+            loading_indicators = self.DEFAULT_LOADING_INDICATORS
+
+        try:
+            watch = self.watch_loading_indicators(loading_indicators, timeout=timeout)
+        except Exception as e:
+            self.logger.error(f"Error monitoring loading indicators: {str(e)}")
+            return {
+                str(locator): {'error': str(e), 'locator': str(locator)}
+                for locator in loading_indicators
+            }
+
+        self.logger.info(
+            f"Loading indicators {'settled' if watch['quiescent'] else 'still visible'} "
+            f"after {watch['elapsed_seconds']:.2f}s"
+        )
 
         monitor_results = {}
+        for locator_key, state in watch['indicators'].items():
+            if state['error']:
+                self.logger.error(f"Error monitoring {locator_key}: {state['error']}")
+                monitor_results[locator_key] = {'error': state['error'], 'locator': locator_key}
+                continue
 
-        for locator in loading_indicators:
-            try:
-                # Use the context manager to avoid the "zombie loop" - check with zero implicit wait
-                initial_state = self.capture_element_state(locator)
-
-                if initial_state['exists'] and initial_state['is_displayed']:
-                    # Element is initially visible, monitor its disappearance
-                    result = self.monitor_element_disappearance(locator)
-                    monitor_results[str(locator)] = result
-                else:
-                    # Element is not initially visible, monitor for appearance then disappearance
-                    # (in case it appears during monitoring)
-                    result = self.monitor_element_appearance(locator)
-                    if result['appeared']:
-                        disappear_result = self.monitor_element_disappearance(locator)
-                        monitor_results[str(locator)] = {
-                            'appearance': result,
-                            'disappearance': disappear_result
-                        }
-                    else:
-                        monitor_results[str(locator)] = result
-            except Exception as e:
-                self.logger.error(f"Error monitoring {locator}: {str(e)}")
-                monitor_results[str(locator)] = {
-                    'error': str(e),
-                    'locator': str(locator)
-                }
+            disappeared = not state['visible_at_end']
+            if not state['appeared']:
+                reason = 'Indicator never appeared'
+            elif disappeared:
+                reason = 'Indicator disappeared as expected'
+            else:
+                reason = f'Indicator still visible after {watch["elapsed_seconds"]:.2f}s'
+
+            monitor_results[locator_key] = {
+                **state,
+                'success': disappeared,
+                'disappeared': disappeared,
+                'duration_seconds': watch['elapsed_seconds'],
+                'reason': reason
+            }
 
         return monitor_results
 
@@ -249,18 +630,51 @@ class UIStateMonitor:
                 'reason': "Image visible but failed to render (broken link)"
             }
 
-    def _take_screenshot(self, name_prefix: str) -> str:
-        """Helper to take a screenshot and return the path"""
-        import os
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
-        filename = f"reports/screenshots/{name_prefix}_{timestamp}.png"
+    def audit_images(self, wait_for_decode: bool = True, timeout: float = 2.0) -> Dict:
+        """
+        Report on every <img> of the page with a single execute_async_script call.
+        With wait_for_decode, all images are decoded in parallel until they finish or
+        timeout seconds pass overall. Each image report carries an XPath locator
+        addressing it by document order, whether it loaded (complete with a
+        natural width), is broken, and its load and decode timings.
+        """
+        raw = self.driver.execute_async_script(_IMAGE_AUDIT_JS, wait_for_decode, _script_deadline_ms(timeout))
 
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        def to_seconds(ms):
+            return ms / 1000 if ms is not None else None
 
-        self.driver.save_screenshot(filename)
-        return filename
+        images = []
+        for report in raw['images']:
+            final = report['final']
+            images.append({
+                'locator': (By.XPATH, f"(//img)[{report['index'] + 1}]"),
+                'src': report['src'],
+                'current_src': final['current_src'],
+                'alt': report['alt'],
+                'lazy': report['lazy'],
+                'displayed': final['displayed'],
+                'loaded': final['complete'] and final['natural_width'] > 0,
+                # A finished request without pixel data is a broken image
+                'broken': final['complete'] and final['natural_width'] == 0 and bool(final['current_src']),
+                'initial_state': report['initial'],
+                'final_state': final,
+                'load_seconds': to_seconds(report['load_ms']),
+                'decode_seconds': to_seconds(report['decode_ms']),
+                'decode_error': report['decode_error'],
+                'decode_pending': report['decode_pending']
+            })
+
+        return {
+            'elapsed_seconds': raw['elapsed_ms'] / 1000,
+            'timestamp': datetime.now().isoformat(),
+            'images': images
+        }
+
+    def _take_screenshot(self, name_prefix: str) -> str:
+        """Helper to take a screenshot and return the path (the file is written in the background)"""
+        from utils.screenshot_writer import get_screenshot_writer
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # Include milliseconds
+        return get_screenshot_writer().capture(self.driver, f"{name_prefix}_{timestamp}")
 
     def document_ui_changes(self, action_description: str, before_screenshot: str = None, after_screenshot: str = None):
         """Document a UI change with before/after state, automatically taking screenshots if needed"""
@@ -0,0 +1,166 @@
+"""
+Viewport Emulation
+Switches a loaded page between breakpoints without reloading it: Chromium
+drivers use the DevTools Emulation.setDeviceMetricsOverride command, other
+browsers fall back to resizing the window so the viewport (not the outer
+window) reaches the target size. ViewportMatrix runs one check per breakpoint
+against the same DOM and reports every failing breakpoint at once.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import WebDriverException
+from config import Config
+from utils.layout_probe import LayoutProbe, LayoutSnapshot
+
+# Browsers enforce a minimum window width (Chrome ~360-500px depending on the OS), so a
+# resized window may stay wider than a phone; device emulation has no such limit
+RESIZE_TOLERANCE = 150
+MIN_RESIZED_WIDTH = 360
+
+# Size of the visible viewport in CSS pixels of the device. Pages without a meta viewport
+# get a ~980px layout viewport under mobile emulation, so innerWidth alone would not match.
+_VIEWPORT_SIZE_JS = """
+const vv = window.visualViewport;
+return vv ? [Math.round(vv.width * vv.scale), Math.round(vv.height * vv.scale)]
+          : [window.innerWidth, window.innerHeight];
+"""
+
+# Resolves after two animation frames, i.e. once resize handlers and the relayout have run
+_NEXT_FRAME_JS = """
+const done = arguments[arguments.length - 1];
+const size = () => { %s };
+requestAnimationFrame(() => requestAnimationFrame(() => done(size())));
+""" % _VIEWPORT_SIZE_JS
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """A breakpoint: CSS pixel size plus whether it should be emulated as a touch device"""
+    name: str
+    width: int
+    height: int
+    mobile: bool = False
+    device_scale_factor: float = 1.0
+
+
+MOBILE = Viewport("mobile", 375, 812, mobile=True, device_scale_factor=3.0)
+TABLET = Viewport("tablet", 768, 1024, mobile=True, device_scale_factor=2.0)
+DESKTOP = Viewport("desktop", 1366, 768)
+STANDARD_VIEWPORTS = (MOBILE, TABLET, DESKTOP)
+
+
+def viewport_width_matches(actual_width: int, expected_width: int) -> bool:
+    """Whether a resized window reached the breakpoint, allowing for browser minimum widths"""
+    if expected_width <= 400 and MIN_RESIZED_WIDTH <= actual_width <= 520:
+        return True
+    return abs(actual_width - expected_width) <= RESIZE_TOLERANCE
+
+
+class ViewportEmulator:
+    """Applies viewports to one driver and restores the default window afterwards"""
+
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.uses_device_emulation = hasattr(driver, "execute_cdp_cmd")
+        self._window_chrome: Optional[Tuple[int, int]] = None
+        self.logger = logging.getLogger(__name__)
+
+    def apply(self, viewport: Viewport) -> Tuple[int, int]:
+        """Switch to the viewport and return the (width, height) of the viewport the page now shows"""
+        if self.uses_device_emulation:
+            try:
+                self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                    "width": viewport.width,
+                    "height": viewport.height,
+                    "deviceScaleFactor": viewport.device_scale_factor,
+                    "mobile": viewport.mobile,
+                })
+                self.driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": viewport.mobile})
+            except WebDriverException as e:
+                # e.g. a remote Chromium session without CDP access
+                self.logger.info(f"Device emulation unavailable, resizing the window instead: {e}")
+                self.uses_device_emulation = False
+
+        if not self.uses_device_emulation:
+            chrome_width, chrome_height = self._measure_window_chrome()
+            self.driver.set_window_size(viewport.width + chrome_width, viewport.height + chrome_height)
+
+        return self.wait_for_layout()
+
+    def wait_for_layout(self) -> Tuple[int, int]:
+        """Wait two animation frames so media queries and resize handlers have applied"""
+        try:
+            width, height = self.driver.execute_async_script(_NEXT_FRAME_JS)
+        except WebDriverException:
+            width, height = self.driver.execute_script(_VIEWPORT_SIZE_JS)
+        return int(width), int(height)
+
+    def reset(self):
+        """Drop any emulation and restore the configured window size"""
+        if self.uses_device_emulation:
+            try:
+                self.driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+                self.driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": False})
+                return
+            except WebDriverException:
+                pass
+        self.driver.set_window_size(Config.WINDOW_WIDTH, Config.WINDOW_HEIGHT)
+
+    def iterate(self, viewports: Iterable[Viewport] = STANDARD_VIEWPORTS) -> Iterator[Tuple[Viewport, Tuple[int, int]]]:
+        """Yield (viewport, size the page sees) after applying each viewport to the current page; resets when done"""
+        try:
+            for viewport in viewports:
+                yield viewport, self.apply(viewport)
+        finally:
+            self.reset()
+
+    def _measure_window_chrome(self) -> Tuple[int, int]:
+        """Width and height the window frame and toolbars take from the outer window size"""
+        if self._window_chrome is None:
+            outer_width, outer_height, inner_width, inner_height = self.driver.execute_script(
+                "return [window.outerWidth, window.outerHeight, window.innerWidth, window.innerHeight];"
+            )
+            self._window_chrome = (max(0, outer_width - inner_width), max(0, outer_height - inner_height))
+        return self._window_chrome
+
+
+class ViewportMatrix:
+    """
+    Runs a check for every breakpoint on the page that is already loaded and
+    collects the failures, so one page load covers the whole matrix. Each check
+    gets one LayoutSnapshot of the page at that breakpoint.
+    """
+
+    def __init__(self, driver: WebDriver, viewports: Iterable[Viewport] = STANDARD_VIEWPORTS):
+        self.emulator = ViewportEmulator(driver)
+        self.probe = LayoutProbe(driver)
+        self.viewports = tuple(viewports)
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, check: Callable[[Viewport, LayoutSnapshot], None],
+            locators: Dict[str, object] = None) -> Dict[str, Optional[str]]:
+        """
+        Call check(viewport, layout) under each viewport, where layout is a
+        snapshot of the given locators, and map breakpoint name to its failure
+        (None if it passed)
+        """
+        results: Dict[str, Optional[str]] = {}
+        for viewport, _ in self.emulator.iterate(self.viewports):
+            layout = self.probe.snapshot(locators)
+            self.logger.info(f"{viewport.name}: {layout.summary()}")
+            try:
+                check(viewport, layout)
+                results[viewport.name] = None
+            except AssertionError as e:
+                results[viewport.name] = str(e) or "assertion failed"
+        return results
+
+    def check_all(self, check: Callable[[Viewport, LayoutSnapshot], None], locators: Dict[str, object] = None):
+        """Run the matrix and fail with every breakpoint that did not pass"""
+        failures = {name: error for name, error in self.run(check, locators).items() if error}
+        assert not failures, "Responsive checks failed:\n" + "\n".join(
+            f"  {name}: {error}" for name, error in failures.items()
+        )